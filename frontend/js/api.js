@@ -7,20 +7,43 @@ const API_CONFIG = {
         projects: '/projects',
         experience: '/experience',
         contact: '/contact',
-        sendMessage: '/contact/send'
+        sendMessage: '/contact/send',
+        bootstrap: '/bootstrap/'
     }
 };
 
 // API Class for handling all backend communications
 class PortfolioAPI {
     constructor(config) {
-        this.baseURL = config.baseURL;
+        // A static export serves every response as a prebuilt JSON file
+        this.staticMode = Boolean(window.PORTFOLIO_STATIC_API);
+        this.baseURL = this.staticMode ? window.PORTFOLIO_STATIC_API : config.baseURL;
         this.endpoints = config.endpoints;
     }
 
+    // A static export has one file per query variant, named after its
+    // parameters (see portfolio/export.py); a limit applies to the full page
+    staticVariant(endpoint) {
+        const [path, query = ''] = endpoint.split('?');
+        const params = new URLSearchParams(query);
+        const limit = parseInt(params.get('limit'), 10) || null;
+        params.delete('limit');
+        params.sort();
+        const suffix = [...params].map(([name, value]) => `.${name}-${value}`).join('');
+        return { url: `${this.baseURL}${path.replace(/\/$/, '')}${suffix}.json`, limit };
+    }
+
+    // Resolve an endpoint to a URL
+    buildURL(endpoint) {
+        if (this.staticMode) {
+            return this.staticVariant(endpoint).url;
+        }
+        return `${this.baseURL}${endpoint}`;
+    }
+
     // Generic HTTP request method
     async request(endpoint, options = {}) {
-        const url = `${this.baseURL}${endpoint}`;
+        const url = this.buildURL(endpoint);
         const defaultOptions = {
             headers: {
                 'Content-Type': 'application/json',
@@ -35,6 +58,10 @@ class PortfolioAPI {
                 throw new Error(`HTTP error! status: ${response.status}`);
             }
             const data = await response.json();
+            const limit = this.staticMode ? this.staticVariant(endpoint).limit : null;
+            if (limit && data && Array.isArray(data.results)) {
+                data.results = data.results.slice(0, limit);
+            }
             console.log(`API response for ${endpoint}:`, data);
             return { success: true, data };
         } catch (error) {
@@ -56,6 +83,23 @@ class PortfolioAPI {
         });
     }
 
+    // GET every home page section in one request; null when the endpoint is unavailable
+    async getBootstrap() {
+        const embedded = document.getElementById('portfolio-data');
+        if (embedded) {
+            try {
+                return JSON.parse(embedded.textContent);
+            } catch (error) {
+                console.warn('Ignoring malformed embedded portfolio data:', error);
+            }
+        }
+        const result = await this.get(this.endpoints.bootstrap);
+        if (result.success && result.data && typeof result.data === 'object') {
+            return result.data;
+        }
+        return null;
+    }
+
     // GET profile information
     async getProfile() {
         const result = await this.get(this.endpoints.profile);
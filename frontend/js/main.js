@@ -1,5 +1,7 @@
 // Main Application Logic
 
+const LOADING_SECTIONS = ['technical-skills', 'projects-container', 'timeline', 'contact-info'];
+
 class PortfolioApp {
     constructor() {
         this.api = window.portfolioAPI;
@@ -153,18 +155,20 @@ class PortfolioApp {
 
     // Load all content
     async loadAllContent() {
-        const loadingPromises = [
-            this.loadProfile(),
-            this.loadSkills(),
-            this.loadFeaturedProjects(),
-            this.loadExperience(),
-            this.loadContactInfo()
-        ];
-
         // Show loading states
         this.showLoadingStates();
 
         try {
+            const bootstrap = await this.api.getBootstrap();
+            const loadingPromises = bootstrap
+                ? this.renderBootstrap(bootstrap)
+                : [
+                    this.loadProfile(),
+                    this.loadSkills(),
+                    this.loadFeaturedProjects(),
+                    this.loadExperience(),
+                    this.loadContactInfo()
+                ];
             await Promise.all(loadingPromises);
         } catch (error) {
             console.error('Failed to load some content:', error);
@@ -173,10 +177,30 @@ class PortfolioApp {
         }
     }
 
+    // Toggle loading indicators on the content sections
+    showLoadingStates() {
+        LOADING_SECTIONS.forEach(id => this.ui.showLoading(id));
+    }
+
+    hideLoadingStates() {
+        LOADING_SECTIONS.forEach(id => this.ui.hideLoading(id));
+    }
+
+    // Render sections from the bootstrap payload, falling back per missing section
+    renderBootstrap(data) {
+        return [
+            this.loadProfile(data.profile),
+            this.loadSkills(data.skills),
+            this.loadFeaturedProjects(data.projects),
+            this.loadExperience(data.experience),
+            this.loadContactInfo(data.contact)
+        ];
+    }
+
     // Load profile information
-    async loadProfile() {
+    async loadProfile(preloaded = null) {
         try {
-            const profile = await this.api.getProfile();
+            const profile = preloaded || await this.api.getProfile();
             // Normalize API shape (backend vs fallback may differ)
             const about = profile.about || {
                 journey: profile.about_journey,
@@ -195,19 +219,19 @@ class PortfolioApp {
     }
 
     // Load skills data
-    async loadSkills() {
+    async loadSkills(preloaded = null) {
         try {
-            const skills = await this.api.getSkills();
+            const skills = preloaded || await this.api.getSkills();
             this.ui.renderSkills(skills);
         } catch (error) {
             console.error('Failed to load skills:', error);
         }
     }
 
-    // Load featured projects
-    async loadFeaturedProjects() {
+    // Load the first projects; the bootstrap payload carries the same list
+    async loadFeaturedProjects(preloaded = null) {
         try {
-            const projects = await this.api.getProjects(6); // Featured projects, limit 6
+            const projects = preloaded || await this.api.getProjects(6); // First 6 active projects
             this.ui.renderProjects(projects);
         } catch (error) {
             console.error('Failed to load featured projects:', error);
@@ -239,9 +263,9 @@ class PortfolioApp {
     }
 
     // Load experience data
-    async loadExperience() {
+    async loadExperience(preloaded = null) {
         try {
-            const experiences = await this.api.getExperience();
+            const experiences = (preloaded && preloaded.length) ? preloaded : await this.api.getExperience();
             this.ui.renderExperience(experiences);
         } catch (error) {
             console.error('Failed to load experience:', error);
@@ -249,9 +273,9 @@ class PortfolioApp {
     }
 
     // Load contact information
-    async loadContactInfo() {
+    async loadContactInfo(preloaded = null) {
         try {
-            const contactInfo = await this.api.getContactInfo();
+            const contactInfo = (preloaded && preloaded.email) ? preloaded : await this.api.getContactInfo();
             this.ui.renderContactInfo(contactInfo);
         } catch (error) {
             console.error('Failed to load contact info:', error);
@@ -1,5 +1,8 @@
 // UI Component Functions
 
+// Rendered width of a project card image: one column on mobile, up to three on desktop
+const PROJECT_IMAGE_SIZES = '(min-width: 1024px) 400px, (min-width: 768px) 50vw, 100vw';
+
 class PortfolioUI {
     constructor() {
         this.elements = this.initializeElements();
@@ -14,6 +17,7 @@ class PortfolioUI {
             userTitle: document.getElementById('user-title'),
             userIntro: document.getElementById('user-intro'),
             profileImage: document.getElementById('profile-image'),
+            profileImageSource: document.getElementById('profile-image-source'),
             
             // Content containers
             aboutContent: document.getElementById('about-content'),
@@ -72,6 +76,14 @@ class PortfolioUI {
         if (this.elements.profileImage) {
             // Use backend field or fallback
             const imgUrl = profile.profile_image || profile.profileImage || "https://images.unsplash.com/photo-1507003211169-0a1dd7228f2d?w=400&h=400&fit=crop&crop=face";
+            const sources = profile.profile_image_variants || [];
+            const fallback = sources[sources.length - 1];
+            if (this.elements.profileImageSource) {
+                const preferred = sources.length > 1 ? sources[0] : null;
+                this.elements.profileImageSource.type = preferred ? preferred.type : '';
+                this.elements.profileImageSource.srcset = preferred ? this.buildSrcset(preferred.srcset) : '';
+            }
+            this.elements.profileImage.srcset = fallback ? this.buildSrcset(fallback.srcset) : '';
             this.elements.profileImage.src = imgUrl;
             this.elements.profileImage.alt = profile.name;
         }
@@ -195,7 +207,7 @@ class PortfolioUI {
             <div class="project-card bg-white rounded-xl shadow-md overflow-hidden transition duration-300" 
                  data-aos="fade-up" data-aos-delay="${(index + 1) * 100}">
                 <div class="h-48 overflow-hidden">
-                    <img src="${project.image}" alt="${project.title}" class="w-full h-full object-cover">
+                    ${this.renderPicture(project.image_variants, project.image, project.title, 'w-full h-full object-cover', PROJECT_IMAGE_SIZES)}
                 </div>
                 <div class="p-6">
                     <div class="flex justify-between items-start mb-2">
@@ -225,6 +237,24 @@ class PortfolioUI {
         `).join('');
     }
 
+    // "url 320w, url 640w" from a list of {url, width} variants
+    buildSrcset(srcset) {
+        return srcset.map(variant => `${variant.url} ${variant.width}w`).join(', ');
+    }
+
+    // <picture> offering each derivative format, falling back to the original image
+    renderPicture(sources, src, alt, className, sizes) {
+        if (!sources || !sources.length) {
+            return `<img src="${src}" alt="${alt}" class="${className}" loading="lazy">`;
+        }
+        const fallback = sources[sources.length - 1];
+        const preferred = sources.slice(0, -1).map(source => `
+                        <source type="${source.type}" srcset="${this.buildSrcset(source.srcset)}" sizes="${sizes}">`).join('');
+        return `<picture>${preferred}
+                        <img src="${src}" srcset="${this.buildSrcset(fallback.srcset)}" sizes="${sizes}" alt="${alt}" class="${className}" loading="lazy">
+                    </picture>`;
+    }
+
     // Render experience timeline
     renderExperience(experiences) {
         if (!this.elements.timeline) return;
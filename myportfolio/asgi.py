@@ -5,6 +5,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'myportfolio.settings')
+# The read endpoints stay on the DRF views unless PORTFOLIO_ASYNC_VIEWS=1
+# (portfolio/async_views.py); measure with benchmark_asgi before turning it on
 
 application = get_asgi_application()
 
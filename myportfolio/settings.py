@@ -34,8 +34,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'portfolio.timing.RequestTimingMiddleware',
+    'portfolio.database.ReadRoutingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'portfolio.compression.ApiCompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -67,9 +70,126 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Keep connections between requests; checked before reuse
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        # Take the write lock at BEGIN: a writer then waits out busy_timeout
+        # instead of failing to upgrade a read lock with "database is locked"
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
     }
 }
 
+# A query_only connection to the same file for GET/HEAD API requests
+# (portfolio/database.py)
+if os.environ.get('PORTFOLIO_READ_DATABASE') == '1':
+    DATABASES['read'] = {**DATABASES['default'], 'OPTIONS': {}, 'TEST': {'MIRROR': 'default'}}
+
+DATABASE_ROUTERS = ['portfolio.database.ReadRouter']
+
+# SQLite connection pragmas and the read alias (portfolio/database.py)
+PORTFOLIO_SQLITE = {
+    'READ_ALIAS': 'read',
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'portfolio',
+    },
+    # Throttle counters; MAX_ENTRIES bounds memory under a flood of new clients.
+    # Local memory is per process: with several workers use a shared backend
+    # to enforce the rates across them (portfolio/throttling.py)
+    'throttle': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'portfolio-throttle',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+PORTFOLIO_THROTTLE_CACHE = 'throttle'
+
+# Rendered API responses; any shared backend (file, database, redis) works
+# across worker processes.
+PORTFOLIO_RESPONSE_CACHE = {
+    'ALIAS': 'default',
+    'TIMEOUT': 60 * 60 * 24,
+}
+
+# Cache-Control for API responses, per endpoint name (see portfolio/urls.py)
+PORTFOLIO_CACHE_CONTROL = {
+    'default': {'max_age': 60, 'stale_while_revalidate': 600},
+    'profile': {'max_age': 300, 'stale_while_revalidate': 86400},
+    'skills': {'max_age': 300, 'stale_while_revalidate': 86400},
+    'contact': {'max_age': 300, 'stale_while_revalidate': 86400},
+}
+
+# Responsive derivatives of uploaded images (see portfolio/images.py).
+# Generated on a background thread pool after the upload commits; run
+# `generate_image_variants` to backfill existing media.
+PORTFOLIO_IMAGES = {
+    'WIDTHS': (160, 320, 640, 960, 1280),
+    'FORMATS': ('webp', 'jpeg'),
+    'WORKERS': 2,
+}
+
+# Uploaded files are served by portfolio.media.serve_media. Behind nginx set
+# SENDFILE_HEADER to 'X-Accel-Redirect' and alias an internal location
+# (SENDFILE_URL) to MEDIA_ROOT; use 'X-Sendfile' for Apache or lighttpd.
+PORTFOLIO_MEDIA = {
+    'SENDFILE_HEADER': None,
+    'SENDFILE_URL': '/protected-media/',
+}
+
+# gzip/deflate (and brotli when installed) for /api/ responses; compressed
+# bodies are kept in a per-process LRU so identical responses compress once.
+PORTFOLIO_COMPRESSION = {
+    'PREFIXES': ('/api/',),
+    'MIN_SIZE': 256,
+    'CACHE_ENTRIES': 512,
+    'CACHE_BYTES': 8 * 1024 * 1024,
+}
+
+# Per-request timings (portfolio/timing.py): a Server-Timing header for
+# browser devtools, and one JSON line per request in timing.log
+PORTFOLIO_TIMING = {
+    'SERVER_TIMING': DEBUG,
+    'LOG': True,
+}
+
+# Serve the read endpoints with the async views in portfolio/async_views.py.
+# Opt-in, and only worth trying under an ASGI server: benchmark_asgi measured
+# the WSGI views faster for uncached requests.
+PORTFOLIO_ASYNC_VIEWS = os.environ.get('PORTFOLIO_ASYNC_VIEWS') == '1'
+
+# Prometheus metrics at /metrics (portfolio/metrics.py), readable with
+# "Authorization: Bearer <TOKEN>" only: requests proxied by nginx all come
+# from 127.0.0.1, so no address is trusted on its own. With several worker
+# processes point DIRECTORY at a directory they share so the endpoint
+# reports all of them.
+PORTFOLIO_METRICS = {
+    'DIRECTORY': os.environ.get('PORTFOLIO_METRICS_DIR') or None,
+    'FLUSH_SECONDS': 1.0,
+    'TOKEN': os.environ.get('PORTFOLIO_METRICS_TOKEN') or None,
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'portfolio.timing.JsonFormatter'},
+    },
+    'handlers': {
+        'timing': {
+            'class': 'logging.handlers.WatchedFileHandler',
+            'filename': os.environ.get('PORTFOLIO_TIMING_LOG', BASE_DIR / 'timing.log'),
+            'formatter': 'json',
+        },
+    },
+    'loggers': {
+        'portfolio.timing': {'handlers': ['timing'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -115,6 +235,15 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    # Sliding-window limits applied by portfolio.throttling
+    'DEFAULT_THROTTLE_RATES': {
+        'contact_ip': '5/min',
+        'contact_email': '3/hour',
+        'write_ip': '30/min',
+    },
+    # Set to the number of reverse proxies in front of Django so client IPs
+    # are taken from X-Forwarded-For.
+    'NUM_PROXIES': None,
 }
 
 CORS_ALLOWED_ORIGINS = [
@@ -136,3 +265,24 @@ EMAIL_HOST_PASSWORD = 'jmaa emym kqeh thbj'
 DEFAULT_FROM_EMAIL = 'david.luhayi@strathmore.edu'
 CONTACT_EMAIL = 'david.luhayi@strathmore.edu'
 
+# Rendered responses of the public endpoints in the PortfolioSnapshot table,
+# rebuilt by a background thread once a burst of content writes settles;
+# set WORKER to False when running `rebuild_snapshot` from cron instead.
+# ORIGINS lists the canonical origins to render for, e.g.
+# PORTFOLIO_SNAPSHOT_ORIGINS=https://example.com,https://www.example.com
+PORTFOLIO_SNAPSHOT = {
+    'ORIGINS': [origin for origin in os.environ.get('PORTFOLIO_SNAPSHOT_ORIGINS', '').split(',') if origin],
+    'WORKER': True,
+    'DEBOUNCE_SECONDS': 0.5,
+    'MAX_DELAY_SECONDS': 5.0,
+}
+
+# Contact notifications are queued in the outbox and delivered by a
+# background thread; set WORKER to False when running `process_outbox`
+# from cron or a separate service instead.
+PORTFOLIO_OUTBOX = {
+    'WORKER': True,
+    'BATCH_SIZE': 50,
+    'MAX_ATTEMPTS': 5,
+    'BACKOFF_SECONDS': 30,
+}
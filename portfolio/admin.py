@@ -1,7 +1,8 @@
 from django.contrib import admin
+from django.utils import timezone
 from .models import (
     Profile, TechnicalSkill, ProfessionalSkill, Technology,
-    Project, Experience, SocialLink, ContactMessage
+    Project, Experience, SocialLink, ContactMessage, OutboxEmail
 )
 
 @admin.register(Profile)
@@ -94,11 +95,33 @@ class SocialLinkAdmin(admin.ModelAdmin):
 
 @admin.register(ContactMessage)
 class ContactMessageAdmin(admin.ModelAdmin):
-    list_display = ['name', 'email', 'subject', 'is_read', 'is_replied', 'created_at']
-    list_filter = ['is_read', 'is_replied', 'created_at']
+    list_display = ['name', 'email', 'subject', 'is_read', 'is_replied', 'notification_status', 'created_at']
+    list_filter = ['is_read', 'is_replied', 'notification_status', 'created_at']
     list_editable = ['is_read', 'is_replied']
-    readonly_fields = ['name', 'email', 'subject', 'message', 'created_at']
+    readonly_fields = ['name', 'email', 'subject', 'message', 'notification_status', 'created_at']
     ordering = ['-created_at']
     
     def has_add_permission(self, request):
-        return False  # Don't allow adding messages through admin
\ No newline at end of file
+        return False  # Don't allow adding messages through admin
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'status', 'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['status']
+    readonly_fields = [
+        'contact_message', 'subject', 'body', 'from_email', 'recipients',
+        'attempts', 'last_error', 'sent_at', 'created_at',
+    ]
+    actions = ['retry_now']
+    ordering = ['next_attempt_at']
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description='Retry selected emails now')
+    def retry_now(self, request, queryset):
+        queryset = queryset.exclude(status='sent')
+        messages = list(queryset.exclude(contact_message=None).values_list('contact_message', flat=True))
+        updated = queryset.update(status='pending', next_attempt_at=timezone.now())
+        ContactMessage.objects.filter(pk__in=messages).update(notification_status='pending')
+        self.message_user(request, f"{updated} email(s) queued for delivery.")
@@ -0,0 +1,142 @@
+"""
+Async implementations of the read endpoints for ASGI servers.
+
+Under ASGI a sync view costs a hop onto the thread that runs sync code,
+and every concurrent request queues for that thread.  These views query
+with the async ORM instead and share everything else with the DRF views:
+the querysets (``views.*_queryset``), the row serializers and sections,
+the keyset pagination and DRF's JSON renderer, so the two paths return
+the same bytes for the requests the async views answer.
+
+``read_view`` serves GET and HEAD from the async view once the DRF view's
+content negotiation, permission checks and throttles have accepted the
+request, and leaves to the DRF view every other method, every request
+those checks refuse and every one that negotiates anything but plain JSON
+(an ``indent``, another renderer).  The async path does not authenticate:
+the read endpoints are public, and a view with permissions beyond
+``AllowAny``, which may need the user, is served by DRF alone.
+``urls.py`` uses them when ``PORTFOLIO_ASYNC_VIEWS`` is on.
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.permissions import AllowAny
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from . import facets
+from .models import Profile, Project
+from .pagination import ExperiencePagination, ProjectPagination
+from .rows import EXPERIENCE_ROWS, PROFILE_ROWS, PROJECT_LIST_ROWS, PROJECT_ROWS
+from .sections import acontact_section, askills_section
+from .timing import measure
+from .views import experience_list_queryset, project_list_queryset
+
+
+renderer = JSONRenderer()
+
+
+def json_response(data, status=200):
+    """The bytes and content type DRF's JSONRenderer produces for ``data``"""
+    with measure('render'):
+        content = renderer.render(data)
+    return HttpResponse(content, status=status, content_type=renderer.media_type)
+
+
+def not_found(detail):
+    # DRF's exception handler turns Http404 into this body
+    return json_response({'detail': str(detail)}, status=404)
+
+
+async def paginated(request, queryset, row_serializer, pagination_class, extra=None):
+    """The list response of a DRF list view, paged with the async ORM, plus ``extra`` keys"""
+    pagination = pagination_class()
+    try:
+        page = pagination.page_queryset(row_serializer.rows(queryset), Request(request))
+    except NotFound as exc:
+        return not_found(exc.detail)
+    rows = pagination.get_page([row async for row in page])
+    data = await row_serializer.ato_data(rows, request)
+    return json_response({**pagination.get_paginated_response(data).data, **(extra or {})})
+
+
+async def profile(request):
+    data = await PROFILE_ROWS.ato_data(PROFILE_ROWS.rows(Profile.objects.order_by('pk'))[:1], request)
+    if not data:
+        return not_found("No Profile matches the given query.")
+    return json_response(data[0])
+
+
+async def skills(request):
+    return json_response(await askills_section())
+
+
+async def projects(request):
+    index = await facets.aget_index()
+    return await paginated(
+        request, project_list_queryset(request.GET, index), PROJECT_LIST_ROWS, ProjectPagination,
+        extra={'facets': facets.facet_block(index, request.GET)},
+    )
+
+
+async def project_detail(request, pk):
+    queryset = Project.objects.filter(is_active=True, pk=pk)
+    data = await PROJECT_ROWS.ato_data(PROJECT_ROWS.rows(queryset)[:1], request)
+    if not data:
+        return not_found("No Project matches the given query.")
+    return json_response(data[0])
+
+
+async def experience(request):
+    return await paginated(request, experience_list_queryset(request.GET), EXPERIENCE_ROWS, ExperiencePagination)
+
+
+async def contact_info(request):
+    return json_response(await acontact_section(await Profile.objects.afirst()))
+
+
+def drf_accepts(view, request, args, kwargs):
+    """
+    True when the checks the DRF ``view`` runs before its handler pass and
+    it would answer with the plain JSON the async views render
+    """
+    instance = view.cls(**view.initkwargs)
+    instance.setup(request, *args, **kwargs)
+    drf_request = instance.initialize_request(request, *args, **kwargs)
+    instance.format_kwarg = instance.get_format_suffix(**kwargs)
+    try:
+        accepted, media_type = instance.perform_content_negotiation(drf_request)
+        instance.check_permissions(drf_request)
+        instance.check_throttles(drf_request)
+    except APIException:
+        return False
+    return isinstance(accepted, JSONRenderer) and media_type == accepted.media_type
+
+
+def read_view(async_view, view):
+    """Serve GET and HEAD with ``async_view`` where the DRF ``view`` would serve JSON, the rest with ``view``"""
+    instance = view.cls(**view.initkwargs)
+    instance.setup(None)
+    allow = ', '.join(instance.allowed_methods)
+    # HEAD too only where the DRF view allows it, so the rest still get its 405
+    methods = {'GET', 'HEAD'} & set(instance.allowed_methods)
+    public = all(permission is AllowAny for permission in instance.permission_classes)
+
+    def rendered_view(request, *args, **kwargs):
+        # Rendered on the sync thread, as the cache in front reads the content
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+    sync_view = sync_to_async(rendered_view)
+
+    @csrf_exempt
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in methods or not public or not drf_accepts(view, request, args, kwargs):
+            return await sync_view(request, *args, **kwargs)
+        response = await async_view(request, *args, **kwargs)
+        # DRF's APIView adds it to every response
+        response['Allow'] = allow
+        return response
+    return wrapper
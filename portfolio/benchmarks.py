@@ -0,0 +1,80 @@
+"""
+Shared helpers for the ``benchmark_*`` management commands.
+
+Benchmarks never touch the configured database: they run against a
+throwaway copy of the schema created the same way the test runner does.
+"""
+import os
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+
+
+@contextmanager
+def scratch_database(on_disk=True):
+    """
+    Create a disposable database with the current schema for the duration of
+    the block. ``on_disk`` keeps SQLite on a real file so that timings include
+    journal and fsync costs, as they would in production.
+    """
+    settings_dict = connection.settings_dict
+    test_settings = settings_dict.setdefault('TEST', {})
+    old_name = settings_dict['NAME']
+    old_test_name = test_settings.get('NAME')
+    directory = None
+    if on_disk and connection.vendor == 'sqlite':
+        directory = tempfile.mkdtemp(prefix='portfolio-bench-')
+        test_settings['NAME'] = os.path.join(directory, 'bench.sqlite3')
+    try:
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        test_settings['NAME'] = old_test_name
+        if directory:
+            for name in os.listdir(directory):
+                os.remove(os.path.join(directory, name))
+            os.rmdir(directory)
+
+
+@contextmanager
+def timer(results, key):
+    """Add the elapsed wall time of the block, in milliseconds, to ``results[key]``"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        results[key] = results.get(key, 0.0) + (time.perf_counter() - start) * 1000
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of ``values`` (``fraction`` between 0 and 1)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(fraction * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    """Latency summary of a list of millisecond samples"""
+    return {
+        'count': len(samples),
+        'mean_ms': statistics.fmean(samples) if samples else 0.0,
+        'p50_ms': percentile(samples, 0.50),
+        'p95_ms': percentile(samples, 0.95),
+        'p99_ms': percentile(samples, 0.99),
+        'max_ms': max(samples) if samples else 0.0,
+    }
+
+
+def format_table(headers, rows):
+    """Plain-text table for command output"""
+    rows = [[f'{cell:.2f}' if isinstance(cell, float) else str(cell) for cell in row] for row in rows]
+    widths = [max(len(str(header)), *(len(row[i]) for row in rows)) for i, header in enumerate(headers)]
+    lines = ['  '.join(str(header).rjust(width) for header, width in zip(headers, widths))]
+    lines += ['  '.join(cell.rjust(width) for cell, width in zip(row, widths)) for row in rows]
+    return '\n'.join(lines)
@@ -0,0 +1,177 @@
+"""
+Diff-based bulk synchronisation used by the PUT endpoints.
+
+Instead of deleting a whole table and re-creating it row by row, the
+submitted items are matched against the existing rows (by ``id`` when
+given, otherwise by a natural key) and the difference is applied with one
+``bulk_create``, one ``bulk_update`` and one targeted delete.  Callers run
+it inside ``transaction.atomic()`` so readers never observe a half-applied
+update.
+"""
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import models, transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from . import cache, search
+
+
+def editable_fields(model):
+    """Concrete, non-automatic fields that clients may set"""
+    fields = {}
+    for field in model._meta.concrete_fields:
+        if field.primary_key or getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+            continue
+        fields[field.name] = field
+    return fields
+
+
+def clean_item(model, fields, item):
+    """Validate and convert a submitted item into model field values"""
+    unknown = set(item) - set(fields) - {'id'}
+    if unknown:
+        raise serializers.ValidationError(
+            {model.__name__: f"Unknown field(s): {', '.join(sorted(unknown))}"}
+        )
+    values = {}
+    for name, raw in item.items():
+        if name == 'id':
+            continue
+        try:
+            values[name] = fields[name].to_python(raw)
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError({model.__name__: {name: exc.messages}})
+    return values
+
+
+def validate_objects(model, objs):
+    """Run field validation on the rows about to be written"""
+    for obj in objs:
+        try:
+            obj.clean_fields()
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError({model.__name__: exc.message_dict})
+
+
+def resolve_related(model, values, name_field='name'):
+    """Map related names (or primary keys) to primary keys with one query"""
+    wanted = {value for group in values for value in group}
+    names = {value for value in wanted if isinstance(value, str)}
+    rows = model.objects.filter(
+        models.Q(**{f'{name_field}__in': names}) | models.Q(pk__in=wanted - names)
+    ).values_list('pk', name_field)
+    lookup = {}
+    for pk, name in rows:
+        lookup[pk] = pk
+        lookup.setdefault(name, pk)
+    missing = wanted - lookup.keys()
+    if missing:
+        raise serializers.ValidationError(
+            {model._meta.verbose_name_plural: f"Unknown: {', '.join(sorted(map(str, missing)))}"}
+        )
+    return lookup
+
+
+def sync_rows(model, items, key_fields, m2m=None):
+    """
+    Make the rows of ``model`` match ``items`` and return
+    ``{'created': n, 'updated': n, 'deleted': n}``.
+
+    ``key_fields`` is the natural key used to match items that carry no
+    ``id``.  ``m2m`` optionally names a many-to-many field whose value in each
+    item is a list of related names or primary keys; only the changed rows of
+    the through table are inserted or deleted.
+    """
+    fields = editable_fields(model)
+    existing = {obj.pk: obj for obj in model.objects.all()}
+    by_key = {tuple(getattr(obj, name) for name in key_fields): obj for obj in existing.values()}
+
+    m2m_values = []
+    cleaned = []
+    for item in items:
+        item = dict(item)
+        if m2m is not None:
+            m2m_values.append(item.pop(m2m, None))
+        cleaned.append((item.get('id'), clean_item(model, fields, item)))
+
+    now = timezone.now()
+    to_create, to_update, changed_fields = [], [], set()
+    kept, targets = set(), []
+    for pk, values in cleaned:
+        obj = existing.get(pk) if pk is not None else None
+        if obj is None:
+            obj = by_key.get(tuple(values.get(name) for name in key_fields))
+        if obj is None or obj.pk in kept:
+            obj = model(**values)
+            to_create.append(obj)
+        else:
+            kept.add(obj.pk)
+            changed = [name for name, value in values.items() if getattr(obj, name) != value]
+            for name in changed:
+                setattr(obj, name, values[name])
+            if changed:
+                to_update.append(obj)
+                changed_fields.update(changed)
+        targets.append(obj)
+
+    validate_objects(model, to_create + to_update)
+    deleted = [pk for pk in existing if pk not in kept]
+    if deleted:
+        model.objects.filter(pk__in=deleted).delete()
+    if to_create:
+        model.objects.bulk_create(to_create)
+
+    if m2m is not None:
+        touched = sync_m2m(model, m2m, targets, m2m_values, created=to_create)
+        pending = {obj.pk for obj in to_update} | {obj.pk for obj in to_create}
+        to_update += [obj for obj in targets if obj.pk in touched and obj.pk not in pending]
+
+    if to_update:
+        # bulk_update skips auto_now, so stamp updated_at explicitly
+        update_fields = sorted(changed_fields)
+        if 'updated_at' in {field.name for field in model._meta.concrete_fields}:
+            for obj in to_update:
+                obj.updated_at = now
+            update_fields.append('updated_at')
+        if update_fields:
+            model.objects.bulk_update(to_update, update_fields)
+
+    # Bulk operations send no model signals
+    search.index_objects(model, [obj.pk for obj in to_create + to_update])
+    names = [model.__name__]
+    transaction.on_commit(lambda: cache.invalidate(*names))
+    return {'created': len(to_create), 'updated': len(to_update), 'deleted': len(deleted)}
+
+
+def sync_m2m(model, field_name, objs, values, created=()):
+    """
+    Apply the many-to-many ``values`` to ``objs`` through the through table.
+    ``None`` leaves an object's relations untouched. Returns the primary keys
+    of the objects whose relations changed.
+    """
+    field = model._meta.get_field(field_name)
+    through = field.remote_field.through
+    source = field.m2m_field_name()
+    target = field.m2m_reverse_field_name()
+
+    pairs = {obj.pk: value for obj, value in zip(objs, values) if value is not None}
+    if not pairs:
+        return set()
+    lookup = resolve_related(field.related_model, pairs.values())
+    wanted = {(pk, lookup[value]) for pk, related in pairs.items() for value in related}
+
+    current = {}
+    created_pks = {obj.pk for obj in created}
+    rows = through.objects.filter(**{f'{source}__in': pairs.keys() - created_pks})
+    for row_pk, obj_pk, target_pk in rows.values_list('pk', source, target):
+        current[(obj_pk, target_pk)] = row_pk
+
+    stale = [row_pk for pair, row_pk in current.items() if pair not in wanted]
+    fresh = [pair for pair in wanted if pair not in current]
+    if stale:
+        through.objects.filter(pk__in=stale).delete()
+    if fresh:
+        through.objects.bulk_create(
+            through(**{f'{source}_id': obj_pk, f'{target}_id': target_pk}) for obj_pk, target_pk in fresh
+        )
+    return {pair[0] for pair in fresh} | {pair[0] for pair in current if pair not in wanted}
@@ -0,0 +1,364 @@
+"""
+Offline build of the frontend into one stylesheet and one script.
+
+``build_frontend`` concatenates the page's scripts in load order and strips
+comments and indentation, purges every style rule whose classes or ids
+never appear in the page or the scripts, and writes both under
+content-hashed names with ``.gz`` siblings.  ``manifest.json`` maps the
+bundle to those names; the ``frontend_bundle`` template tag reads it so
+``index.html`` links the bundle when one has been built and falls back to
+the individual source files otherwise.
+
+The Tailwind utilities come from the Play CDN, which generates them in the
+browser. Python cannot run the Tailwind compiler, so the build accepts a
+prebuilt Tailwind stylesheet (``--tailwind-css``, e.g. the output of the
+Tailwind CLI), purges it with everything else and then lets the template
+drop the CDN runtime.
+"""
+import hashlib
+import json
+import re
+from pathlib import Path
+
+from django.conf import settings
+
+from .export import write_file
+
+
+JS_SOURCES = ['js/utils.js', 'js/api.js', 'js/ui.js', 'js/interactions.js', 'js/main.js']
+CSS_SOURCES = ['css/styles.css']
+# Markup and scripts scanned for class names and ids that must survive purging
+CONTENT_SOURCES = ['index.html'] + JS_SOURCES
+
+OUTPUT_DIR = 'dist'
+MANIFEST = 'manifest.json'
+
+CONDITIONAL_AT_RULES = ('@media', '@supports', '@layer', '@container')
+KEYFRAMES_RE = re.compile(r'^@(?:-[a-z]+-)?keyframes\s+(\S+)')
+CLASS_RE = re.compile(r'\.((?:\\.|[\w-])+)')
+ID_RE = re.compile(r'#((?:\\.|[\w-])+)')
+NOT_RE = re.compile(r':not\([^)]*\)')
+TOKEN_RE = re.compile(r'[\w\-:/.\[\]%#!@]+')
+
+
+def frontend_dir():
+    return Path(settings.BASE_DIR) / 'frontend'
+
+
+def strip_css_comments(css):
+    out = []
+    i, n = 0, len(css)
+    while i < n:
+        char = css[i]
+        if char in '"\'':
+            end = skip_string(css, i)
+            out.append(css[i:end])
+            i = end
+        elif css.startswith('/*', i):
+            end = css.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+        else:
+            out.append(char)
+            i += 1
+    return ''.join(out)
+
+
+def skip_string(text, start):
+    """Index just past the string literal opening at ``start``"""
+    quote = text[start]
+    i = start + 1
+    while i < len(text):
+        if text[i] == '\\':
+            i += 2
+            continue
+        if text[i] == quote:
+            return i + 1
+        i += 1
+    return i
+
+
+def parse_css(css):
+    """
+    Split a stylesheet into ``(prelude, body)`` nodes. ``body`` is None for
+    statements such as ``@import``, a list of child nodes for conditional
+    at-rules and the raw declaration text otherwise.
+    """
+    nodes = []
+    i, n = 0, len(css)
+    while i < n:
+        start = i
+        while i < n and css[i] not in '{;}':
+            i = skip_string(css, i) if css[i] in '"\'' else i + 1
+        prelude = css[start:i].strip()
+        if i >= n or css[i] == '}':
+            i += 1
+            continue
+        if css[i] == ';':
+            if prelude:
+                nodes.append((prelude, None))
+            i += 1
+            continue
+        depth, j = 1, i + 1
+        while j < n and depth:
+            if css[j] in '"\'':
+                j = skip_string(css, j)
+                continue
+            depth += {'{': 1, '}': -1}.get(css[j], 0)
+            j += 1
+        body = css[i + 1:j - 1]
+        if prelude.startswith(CONDITIONAL_AT_RULES):
+            nodes.append((prelude, parse_css(body)))
+        else:
+            nodes.append((prelude, body))
+        i = j
+    return nodes
+
+
+def split_selectors(selector):
+    """Split a selector list on top-level commas"""
+    parts, depth, current = [], 0, []
+    for char in selector:
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        if char == ',' and depth == 0:
+            parts.append(''.join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append(''.join(current))
+    return [part.strip() for part in parts if part.strip()]
+
+
+def unescape(name):
+    return re.sub(r'\\(.)', r'\1', name)
+
+
+def selector_is_used(selector, used):
+    selector = NOT_RE.sub('', selector)
+    names = CLASS_RE.findall(selector) + ID_RE.findall(selector)
+    return all(unescape(name) in used for name in names)
+
+
+def minify_declarations(body):
+    declarations = []
+    for declaration in body.split(';'):
+        declaration = ' '.join(declaration.split())
+        if not declaration:
+            continue
+        name, colon, value = declaration.partition(':')
+        declarations.append(f'{name.strip()}{colon}{value.strip()}' if colon else declaration)
+    return ';'.join(declarations)
+
+
+def minify_selector(selector):
+    selector = ' '.join(selector.split())
+    return re.sub(r'\s*([>+~])\s*', r'\1', selector)
+
+
+def purge_nodes(nodes, used):
+    """Serialize ``nodes`` minified, dropping rules that match nothing in ``used``"""
+    out = []
+    keyframes = []
+    for prelude, body in nodes:
+        if body is None:
+            out.append(prelude + ';')
+        elif isinstance(body, list):
+            inner, inner_keyframes = purge_nodes(body, used)
+            keyframes += inner_keyframes
+            if inner:
+                out.append(f'{" ".join(prelude.split())}{{{inner}}}')
+        elif KEYFRAMES_RE.match(prelude):
+            keyframes.append((KEYFRAMES_RE.match(prelude).group(1), prelude, body))
+        elif prelude.startswith('@'):
+            out.append(f'{" ".join(prelude.split())}{{{minify_declarations(body)}}}')
+        else:
+            selectors = [s for s in split_selectors(prelude) if selector_is_used(s, used)]
+            if selectors:
+                out.append(f'{",".join(map(minify_selector, selectors))}{{{minify_declarations(body)}}}')
+    return ''.join(out), keyframes
+
+
+def purge_css(css, used):
+    """Minified ``css`` keeping only rules (and animations) the content can use"""
+    rules, keyframes = purge_nodes(parse_css(strip_css_comments(css)), used)
+    animations = []
+    for name, prelude, body in keyframes:
+        # Keep an animation only if a surviving rule refers to it
+        if re.search(rf'(?<![\w-]){re.escape(name)}(?![\w-])', rules):
+            frames = ''.join(
+                f'{minify_selector(step)}{{{minify_declarations(decls)}}}' for step, decls in parse_css(body)
+            )
+            animations.append(f'{" ".join(prelude.split())}{{{frames}}}')
+    return rules + ''.join(animations)
+
+
+def used_tokens(texts):
+    """Every word that could be a class name or id in the given markup and scripts"""
+    used = set()
+    for text in texts:
+        for token in TOKEN_RE.findall(text):
+            used.add(token)
+            used.update(part.lstrip('#') for part in token.split('.') if part)
+            used.add(token.lstrip('.#'))
+    return used
+
+
+REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+REGEX_KEYWORDS = ('return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete', 'void', 'throw')
+
+
+def minify_js(source):
+    """
+    Drop comments, indentation, blank lines and runs of spaces. Line breaks
+    are kept so automatic semicolon insertion behaves exactly as before.
+    String, template and regular expression literals are copied verbatim.
+    """
+    out = []
+    i, n = 0, len(source)
+    # Brace depth of each open template literal substitution
+    template_stack = []
+    brace_depth = 0
+
+    def last_significant():
+        return ''.join(out[-8:]).rstrip()
+
+    while i < n:
+        char = source[i]
+        if char in '"\'':
+            end = skip_string(source, i)
+            out.append(source[i:end])
+            i = end
+        elif char == '`' or (char == '}' and template_stack and template_stack[-1] == brace_depth):
+            if char == '}':
+                template_stack.pop()
+            i = copy_template(source, i + 1, out, '`' if char == '`' else '}')
+            if source[i - 2:i] == '${':
+                template_stack.append(brace_depth)
+        elif source.startswith('//', i):
+            end = source.find('\n', i)
+            i = n if end == -1 else end
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+            out.append(' ')
+        elif char == '/' and is_regex_start(last_significant()):
+            end = skip_regex(source, i)
+            out.append(source[i:end])
+            i = end
+        elif char in ' \t':
+            while i < n and source[i] in ' \t':
+                i += 1
+            out.append(' ')
+        elif char in '\r\n':
+            while i < n and source[i] in ' \t\r\n':
+                i += 1
+            out.append('\n')
+        else:
+            if char == '{':
+                brace_depth += 1
+            elif char == '}':
+                brace_depth -= 1
+            out.append(char)
+            i += 1
+
+    lines = (line.strip() for line in ''.join(out).split('\n'))
+    return '\n'.join(line for line in lines if line) + '\n'
+
+
+def copy_template(source, i, out, opener):
+    """Copy template literal text up to the closing backtick or the next ``${``"""
+    start = i
+    while i < len(source):
+        if source[i] == '\\':
+            i += 2
+            continue
+        if source[i] == '`':
+            i += 1
+            break
+        if source.startswith('${', i):
+            i += 2
+            break
+        i += 1
+    out.append(opener + source[start:i])
+    return i
+
+
+def is_regex_start(preceding):
+    """Whether a '/' after ``preceding`` starts a regular expression rather than a division"""
+    if not preceding or preceding[-1] in REGEX_PRECEDERS:
+        return True
+    word = re.search(r'[\w$]+$', preceding)
+    return bool(word) and word.group() in REGEX_KEYWORDS
+
+
+def skip_regex(source, start):
+    i, in_class = start + 1, False
+    while i < len(source):
+        char = source[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == '[':
+            in_class = True
+        elif char == ']':
+            in_class = False
+        elif char == '/' and not in_class:
+            i += 1
+            while i < len(source) and (source[i].isalnum() or source[i] == '_'):
+                i += 1
+            return i
+        elif char == '\n':
+            break
+        i += 1
+    return i
+
+
+def content_name(name, data):
+    stem, _, suffix = name.rpartition('.')
+    return f'{stem}.{hashlib.sha256(data).hexdigest()[:12]}.{suffix}'
+
+
+def build(tailwind_css=None, compress=True):
+    """Write the bundle into ``frontend/dist`` and return the manifest"""
+    root = frontend_dir()
+    output = root / OUTPUT_DIR
+    used = used_tokens((root / name).read_text() for name in CONTENT_SOURCES)
+
+    stylesheets = [Path(tailwind_css).read_text()] if tailwind_css else []
+    stylesheets += [(root / name).read_text() for name in CSS_SOURCES]
+    css = ''.join(purge_css(sheet, used) for sheet in stylesheets).encode()
+    # Each script was a separate classic <script>; ';' guards against a
+    # file that ends without one
+    js = ';\n'.join(minify_js((root / name).read_text()) for name in JS_SOURCES).encode()
+
+    previous = read_manifest(output / MANIFEST)
+    manifest = {
+        'css': f'/frontend/{OUTPUT_DIR}/{content_name("app.css", css)}',
+        'js': f'/frontend/{OUTPUT_DIR}/{content_name("app.js", js)}',
+        'tailwind': bool(tailwind_css),
+        'sizes': {},
+    }
+    for key, data in (('css', css), ('js', js)):
+        path = root / manifest[key].removeprefix('/frontend/')
+        write_file(path, data, compress=compress)
+        manifest['sizes'][key] = len(data)
+
+    # Remove the files of the previous build
+    for key in ('css', 'js'):
+        old = previous.get(key)
+        if old and old != manifest[key]:
+            for suffix in ('', '.gz'):
+                stale = root / (old.removeprefix('/frontend/') + suffix)
+                if stale.exists():
+                    stale.unlink()
+    write_file(output / MANIFEST, json.dumps(manifest, indent=2).encode(), compress=False)
+    return manifest
+
+
+def read_manifest(path=None):
+    try:
+        return json.loads((path or frontend_dir() / OUTPUT_DIR / MANIFEST).read_text())
+    except (OSError, ValueError):
+        return {}
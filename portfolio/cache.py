@@ -0,0 +1,218 @@
+"""
+Read-through cache for the rendered portfolio API responses.
+
+Every cached response is keyed on the endpoint, its query parameters and
+the current version of each content model the endpoint reads.  Saving or
+deleting one of those models bumps its version once the write commits
+(see ``signals.py``), so stale entries simply stop being addressed and age
+out of the backend.
+Versions live in the cache itself, which keeps invalidation consistent
+across worker processes for any shared Django cache backend.
+"""
+import hashlib
+import threading
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.dispatch import Signal
+from django.http import HttpResponse
+
+from .timing import measure
+
+
+KEY_PREFIX = 'portfolio'
+
+# Sent with ``model_names`` whenever the versions of those models are bumped
+content_changed = Signal()
+
+CONTENT_MODELS = [
+    'Profile', 'TechnicalSkill', 'ProfessionalSkill', 'Technology',
+    'Project', 'Experience', 'SocialLink',
+]
+
+# Content models each endpoint reads from
+ENDPOINT_MODELS = {
+    'profile': ['Profile'],
+    'skills': ['TechnicalSkill', 'ProfessionalSkill', 'Technology'],
+    'projects': ['Project', 'Technology'],
+    'project-detail': ['Project', 'Technology'],
+    'experience': ['Experience'],
+    'contact': ['Profile', 'SocialLink'],
+    'search': ['Project', 'Experience', 'TechnicalSkill', 'ProfessionalSkill', 'Technology'],
+    'bootstrap': CONTENT_MODELS,
+}
+
+# Backends whose operations never wait on I/O
+IN_PROCESS_BACKENDS = (DummyCache, LocMemCache)
+
+DEFAULTS = {
+    'ALIAS': 'default',
+    'TIMEOUT': 60 * 60 * 24,
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'PORTFOLIO_RESPONSE_CACHE', {}).get(name, DEFAULTS[name])
+
+
+def get_cache():
+    return caches[get_setting('ALIAS')]
+
+
+class CacheStats:
+    """Process-local hit/miss counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def as_dict(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else 0.0,
+        }
+
+
+stats = CacheStats()
+
+
+def version_key(model_name):
+    return f'{KEY_PREFIX}:version:{model_name}'
+
+
+def get_versions(model_names):
+    """Current version of each model, seeding missing ones"""
+    cache = get_cache()
+    keys = {version_key(name): name for name in model_names}
+    found = cache.get_many(keys)
+    for key in keys.keys() - found.keys():
+        # Seed with a timestamp rather than zero so an evicted version never
+        # rolls back onto responses that were cached under an older value.
+        cache.add(key, time.time_ns(), timeout=None)
+        found[key] = cache.get(key)
+    return {keys[key]: value for key, value in found.items()}
+
+
+async def call_async(cache, method, *args, **kwargs):
+    """
+    ``await cache.a<method>(...)``, except that in-process backends are called
+    directly: they never block, and Django's default async cache methods
+    would cost a thread hop per call.
+    """
+    if isinstance(cache, IN_PROCESS_BACKENDS):
+        return getattr(cache, method)(*args, **kwargs)
+    return await getattr(cache, f'a{method}')(*args, **kwargs)
+
+
+async def aget_versions(model_names):
+    """``get_versions`` for async views"""
+    cache = get_cache()
+    keys = {version_key(name): name for name in model_names}
+    found = await call_async(cache, 'get_many', keys)
+    for key in keys.keys() - found.keys():
+        await call_async(cache, 'add', key, time.time_ns(), timeout=None)
+        found[key] = await call_async(cache, 'get', key)
+    return {keys[key]: value for key, value in found.items()}
+
+
+def invalidate(*model_names):
+    """Bump the version of the given content models and send ``content_changed``"""
+    cache = get_cache()
+    for name in model_names:
+        try:
+            cache.incr(version_key(name))
+        except ValueError:
+            cache.set(version_key(name), time.time_ns(), timeout=None)
+    content_changed.send(sender=None, model_names=model_names)
+
+
+def response_key(endpoint, request, params=(), view_kwargs=None, versions=None):
+    if versions is None:
+        versions = get_versions(ENDPOINT_MODELS[endpoint])
+    parts = [request.get_host(), endpoint]
+    parts += [f'{name}={versions[name]}' for name in sorted(versions)]
+    parts += [f'{name}={request.GET.get(name, "")}' for name in params]
+    parts += [f'{name}={value}' for name, value in sorted((view_kwargs or {}).items())]
+    digest = hashlib.md5('|'.join(map(str, parts)).encode()).hexdigest()
+    return f'{KEY_PREFIX}:response:{endpoint}:{digest}'
+
+
+def cached_response(cached):
+    stats.record(hit=True)
+    content_type, content = cached
+    response = HttpResponse(content, content_type=content_type)
+    response['X-Cache'] = 'HIT'
+    return response
+
+
+def cache_response(endpoint, params=()):
+    """
+    Serve successful GET responses of ``endpoint`` from the cache.
+
+    ``params`` lists the query parameters that change the response body.
+    Async views get an async wrapper.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method != 'GET':
+                    return await view(request, *args, **kwargs)
+
+                cache = get_cache()
+                versions = await aget_versions(ENDPOINT_MODELS[endpoint])
+                key = response_key(endpoint, request, params, kwargs, versions)
+                cached = await call_async(cache, 'get', key)
+                if cached is not None:
+                    return cached_response(cached)
+
+                stats.record(hit=False)
+                response = await view(request, *args, **kwargs)
+                if response.status_code == 200:
+                    await call_async(cache, 'set', key, (response['Content-Type'], response.content), get_setting('TIMEOUT'))
+                response['X-Cache'] = 'MISS'
+                return response
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return view(request, *args, **kwargs)
+
+            cache = get_cache()
+            key = response_key(endpoint, request, params, kwargs)
+            cached = cache.get(key)
+            if cached is not None:
+                return cached_response(cached)
+
+            stats.record(hit=False)
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200:
+                if hasattr(response, 'render'):
+                    with measure('render'):
+                        response.render()
+                cache.set(key, (response['Content-Type'], response.content), get_setting('TIMEOUT'))
+            response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,190 @@
+"""
+Response compression for the API with a cache of compressed bodies.
+
+Most API responses are served again and again with the same bytes (the
+response cache returns identical bodies until content changes), so
+``ApiCompressionMiddleware`` keeps a bounded LRU of compressed bodies
+keyed on the SHA-1 of the uncompressed body and the encoding.  A repeated
+response then costs one hash instead of a full deflate.  Brotli is used
+when the ``brotli`` package is installed and the client asks for it.
+"""
+import gzip
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+DEFAULTS = {
+    'PREFIXES': ('/api/',),
+    'MIN_SIZE': 256,
+    'LEVEL': 6,
+    'BROTLI_QUALITY': 5,
+    # Preference when the client accepts several with the same q-value
+    'ENCODINGS': ('br', 'gzip', 'deflate'),
+    'CACHE_ENTRIES': 512,
+    'CACHE_BYTES': 8 * 1024 * 1024,
+}
+
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/javascript', 'application/xml', 'image/svg+xml',
+)
+
+
+def get_setting(name):
+    return getattr(settings, 'PORTFOLIO_COMPRESSION', {}).get(name, DEFAULTS[name])
+
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=get_setting('BROTLI_QUALITY'))
+    if encoding == 'gzip':
+        # mtime=0 keeps the output, and therefore the cache key's value, deterministic
+        return gzip.compress(body, compresslevel=get_setting('LEVEL'), mtime=0)
+    return zlib.compress(body, get_setting('LEVEL'))
+
+
+def available_encodings():
+    return [encoding for encoding in get_setting('ENCODINGS') if encoding != 'br' or brotli is not None]
+
+
+def negotiate(accept_encoding):
+    """The best supported encoding allowed by an Accept-Encoding header, or None"""
+    accepted = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name] = q
+    best, best_q = None, 0.0
+    for encoding in available_encodings():
+        q = accepted.get(encoding, accepted.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class CompressedBodyCache:
+    """Thread-safe LRU of compressed bodies bounded by entry count and total bytes"""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compress(self, body, encoding):
+        max_entries = get_setting('CACHE_ENTRIES')
+        if not max_entries:
+            return compress(body, encoding)
+        key = (hashlib.sha1(body).digest(), encoding)
+        with self._lock:
+            compressed = self._entries.get(key)
+            if compressed is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return compressed
+            self.misses += 1
+        compressed = compress(body, encoding)
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = compressed
+                self.size += len(compressed)
+            while self._entries and (len(self._entries) > max_entries or self.size > get_setting('CACHE_BYTES')):
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+        return compressed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+            self.hits = 0
+            self.misses = 0
+
+    def as_dict(self):
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else 0.0,
+        }
+
+
+body_cache = CompressedBodyCache()
+
+
+class ApiCompressionMiddleware:
+    """
+    Compress responses under ``PORTFOLIO_COMPRESSION['PREFIXES']``. Place it
+    above anything that reads the body, like Django's GZipMiddleware would be.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if not request.path.startswith(tuple(get_setting('PREFIXES'))):
+            return response
+        if not self.is_compressible(response):
+            return response
+
+        # The representation depends on Accept-Encoding even when we end up not compressing
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        compressed = body_cache.get_or_compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        # The compressed bytes differ from the identity ones; weak comparison still matches
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
+
+    def is_compressible(self, response):
+        if response.streaming or response.status_code != 200 or response.has_header('Content-Encoding'):
+            return False
+        if len(response.content) < get_setting('MIN_SIZE'):
+            return False
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        return content_type.startswith(COMPRESSIBLE_TYPES)
@@ -0,0 +1,160 @@
+"""
+Conditional GET support for the portfolio API.
+
+The validators of a resource are derived from the content models it reads
+(latest ``updated_at`` plus a row count per model, so deletions change the
+ETag too) and never from the response body.  They are memoised in the
+response cache under the current model versions, which means a revalidation
+in steady state costs no database queries and no serialization.
+"""
+import datetime
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.apps import apps
+from django.conf import settings
+from django.db import connections, router
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date
+
+from .cache import ENDPOINT_MODELS, KEY_PREFIX, aget_versions, call_async, get_cache, get_setting, get_versions
+
+
+DEFAULT_CACHE_CONTROL = {
+    'max_age': 60,
+    'stale_while_revalidate': 600,
+}
+
+
+def cache_control_policy(endpoint):
+    policies = getattr(settings, 'PORTFOLIO_CACHE_CONTROL', {})
+    return policies.get(endpoint, policies.get('default', DEFAULT_CACHE_CONTROL))
+
+
+def model_states(model_names):
+    """{model name: (last modified, row count)} fetched in a single query"""
+    models = [apps.get_model('portfolio', name) for name in model_names]
+    # The routers' choice, as the queries of the view itself
+    connection = connections[router.db_for_read(models[0])]
+    selects = []
+    for index, model in enumerate(models):
+        table = connection.ops.quote_name(model._meta.db_table)
+        selects.append(f'SELECT {index}, MAX(updated_at), COUNT(*) FROM {table}')
+    with connection.cursor() as cursor:
+        cursor.execute(' UNION ALL '.join(selects))
+        rows = cursor.fetchall()
+    states = {}
+    for index, modified, count in rows:
+        # Aggregates over raw SQL come back untyped on SQLite
+        if isinstance(modified, str):
+            modified = parse_datetime(modified)
+        if modified is not None and timezone.is_naive(modified):
+            modified = timezone.make_aware(modified, datetime.timezone.utc)
+        states[model_names[index]] = (modified, count)
+    return states
+
+
+def state_key(endpoint, versions):
+    return '{}:state:{}:{}'.format(
+        KEY_PREFIX, endpoint, '-'.join(str(versions[name]) for name in ENDPOINT_MODELS[endpoint])
+    )
+
+
+def fingerprint_states(model_names, states):
+    """(fingerprint, last modified timestamp) from ``model_states``"""
+    fingerprint = hashlib.sha1()
+    last_modified = None
+    for name in model_names:
+        modified, count = states[name]
+        fingerprint.update(f'{name}:{modified.isoformat() if modified else ""}:{count};'.encode())
+        if modified and (last_modified is None or modified > last_modified):
+            last_modified = modified
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return (fingerprint.hexdigest(), timestamp)
+
+
+def content_state(endpoint):
+    """
+    (fingerprint, last modified) of the content behind ``endpoint``.
+
+    Memoised per set of model versions, so it is recomputed only after a
+    write to one of the models the endpoint reads.
+    """
+    model_names = ENDPOINT_MODELS[endpoint]
+    cache = get_cache()
+    key = state_key(endpoint, get_versions(model_names))
+    state = cache.get(key)
+    if state is None:
+        state = fingerprint_states(model_names, model_states(model_names))
+        cache.set(key, state, get_setting('TIMEOUT'))
+    return state
+
+
+async def acontent_state(endpoint):
+    """``content_state`` for async views"""
+    model_names = ENDPOINT_MODELS[endpoint]
+    cache = get_cache()
+    key = state_key(endpoint, await aget_versions(model_names))
+    state = await call_async(cache, 'get', key)
+    if state is None:
+        # Raw cursors have no async API
+        state = fingerprint_states(model_names, await sync_to_async(model_states)(model_names))
+        await call_async(cache, 'set', key, state, get_setting('TIMEOUT'))
+    return state
+
+
+def resource_etag(endpoint, fingerprint, request, params=(), view_kwargs=None):
+    parts = [fingerprint, request.get_host(), endpoint]
+    parts += [f'{name}={request.GET.get(name, "")}' for name in params]
+    parts += [f'{name}={value}' for name, value in sorted((view_kwargs or {}).items())]
+    return '"{}"'.format(hashlib.sha1('|'.join(map(str, parts)).encode()).hexdigest())
+
+
+def conditional_response(endpoint, params=()):
+    """
+    Answer ``If-None-Match``/``If-Modified-Since`` with 304 before calling the
+    view, and attach ETag, Last-Modified and Cache-Control to 200 responses.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return await view(request, *args, **kwargs)
+
+                fingerprint, last_modified = await acontent_state(endpoint)
+                etag = resource_etag(endpoint, fingerprint, request, params, kwargs)
+                response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                    if response.status_code != 200:
+                        return response
+                return add_validators(response, endpoint, etag, last_modified)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+
+            fingerprint, last_modified = content_state(endpoint)
+            etag = resource_etag(endpoint, fingerprint, request, params, kwargs)
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            return add_validators(response, endpoint, etag, last_modified)
+        return wrapper
+    return decorator
+
+
+def add_validators(response, endpoint, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, public=True, **cache_control_policy(endpoint))
+    return response
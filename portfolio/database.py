@@ -0,0 +1,115 @@
+"""
+SQLite connection setup and read routing.
+
+The database file is switched to WAL once, by migration 0010 (the journal
+mode is stored in the file), so readers never block the writer.  Every new
+SQLite connection gets the per-connection pragmas in ``PORTFOLIO_SQLITE``
+(``connection_created`` in ``signals.py``): ``synchronous=NORMAL``
+(durable at checkpoints, safe with WAL), a larger page cache and memory
+map, and a ``busy_timeout`` so a writer waits for the lock instead of
+failing with ``database is locked``.  Connections are kept between
+requests through ``CONN_MAX_AGE``/``CONN_HEALTH_CHECKS`` in ``DATABASES``.
+
+When ``DATABASES`` has a ``READ_ALIAS`` entry (the same file), ``ReadRouter``
+sends the reads of GET and HEAD API requests to it; that connection is
+``query_only`` and all writes still go to ``default``.
+"""
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    'PRAGMAS': {
+        'synchronous': 'normal',
+        'busy_timeout': 5000,
+        # Negative sizes are KiB
+        'cache_size': -20000,
+        'mmap_size': 128 * 1024 * 1024,
+        'temp_store': 'memory',
+    },
+    'READ_ALIAS': 'read',
+    'READ_PREFIXES': ('/api/',),
+}
+
+READ_METHODS = ('GET', 'HEAD')
+
+_reading = ContextVar('portfolio_read_request', default=False)
+
+
+def get_setting(name):
+    return getattr(settings, 'PORTFOLIO_SQLITE', {}).get(name, DEFAULTS[name])
+
+
+def read_alias():
+    """The read-only alias, or None when it is not configured"""
+    alias = get_setting('READ_ALIAS')
+    return alias if alias and alias in settings.DATABASES and alias != DEFAULT_DB_ALIAS else None
+
+
+def configure_connection(connection):
+    if connection.vendor != 'sqlite' or not get_setting('ENABLED'):
+        return
+    with connection.cursor() as cursor:
+        for name, value in get_setting('PRAGMAS').items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+        if connection.alias == read_alias():
+            cursor.execute('PRAGMA query_only = ON')
+
+
+class ReadRouter:
+    """Reads of GET/HEAD API requests go to the read alias, everything else to default"""
+
+    def db_for_read(self, model, **hints):
+        if _reading.get():
+            return read_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Instances loaded from the read alias are saved to default
+        return DEFAULT_DB_ALIAS if read_alias() else None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, read_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db == read_alias():
+            return False
+        return None
+
+
+def is_read_request(request):
+    return request.method in READ_METHODS and request.path.startswith(tuple(get_setting('READ_PREFIXES')))
+
+
+class ReadRoutingMiddleware:
+    """Marks GET/HEAD API requests so ``ReadRouter`` sends their reads to the read alias"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _reading.set(is_read_request(request))
+        try:
+            return self.get_response(request)
+        finally:
+            _reading.reset(token)
+
+    async def __acall__(self, request):
+        token = _reading.set(is_read_request(request))
+        try:
+            return await self.get_response(request)
+        finally:
+            _reading.reset(token)
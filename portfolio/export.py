@@ -0,0 +1,235 @@
+"""
+Prerender the portfolio into a directory of static files.
+
+The export contains the home page with every section embedded, each API
+response as a JSON file (query variants named after their parameters, see
+``variant_name``), and the frontend and media files under content-hashed
+names; copies of files that changed since the last export are removed.
+Every text artifact also gets a precompressed ``.gz`` sibling.  The state
+file records the content fingerprint (see ``conditional.content_state``)
+behind each artifact, so an incremental export rewrites only the artifacts
+whose source models changed.
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+
+from django.conf import settings
+from django.template.loader import render_to_string
+
+from . import facets
+from .conditional import content_state
+from .models import Profile, Project
+from .sections import (
+    bootstrap_payload, contact_section, experience_section, profile_section,
+    projects_section, skills_section
+)
+from .serializers import ProjectSerializer
+
+
+STATE_FILE = '.export-state.json'
+
+QUOTED_URL_RE = re.compile(r'"(/[^"?\s<>]+)(?:\?v=[0-9a-f]+)?"')
+
+TEXT_EXTENSIONS = {'.html', '.css', '.js', '.json', '.svg', '.txt', '.xml', '.webmanifest'}
+
+
+def content_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def hashed_name(relative_path, digest):
+    path = Path(relative_path)
+    return str(path.with_name(f'{path.stem}.{digest}{path.suffix}'))
+
+
+def write_file(path, data, compress=True):
+    """Atomically write ``data`` (bytes) and, for text types, a .gz sibling"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    if compress and path.suffix in TEXT_EXTENSIONS:
+        write_gzip(path, data)
+
+
+def write_gzip(path, data):
+    gz_path = path.with_name(path.name + '.gz')
+    tmp = gz_path.with_name(gz_path.name + '.tmp')
+    # mtime=0 keeps the output byte-identical between runs
+    with open(tmp, 'wb') as raw, gzip.GzipFile(filename='', mode='wb', fileobj=raw, compresslevel=9, mtime=0) as f:
+        f.write(data)
+    os.replace(tmp, gz_path)
+
+
+def variant_name(name, params):
+    """
+    The file of an API response variant: ``api/projects.json`` with
+    ``featured=true`` is ``api/projects.featured-true.json``, as the
+    frontend's static mode (``frontend/js/api.js``) names it
+    """
+    path = Path(name)
+    suffix = ''.join(f'.{key}-{value}' for key, value in sorted(params.items()))
+    return str(path.with_name(f'{path.stem}{suffix}{path.suffix}'))
+
+
+def json_bytes(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def paginated(results):
+    """The shape of a single-page KeysetPagination response"""
+    return {'next': None, 'previous': None, 'results': results}
+
+
+class StaticSiteExporter:
+    def __init__(self, output_dir, incremental=False, compress=True):
+        self.output_dir = Path(output_dir)
+        self.incremental = incremental
+        self.compress = compress
+        self.url_map = {}
+        # Output directories of the hashed copies
+        self.copy_dirs = []
+        self.written = []
+        self.skipped = []
+        self.state = self.load_state()
+
+    def load_state(self):
+        try:
+            return json.loads((self.output_dir / STATE_FILE).read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def export(self):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        new_state = {}
+
+        # Hashed names only change with content, so copies are naturally incremental
+        frontend_dir = Path(settings.BASE_DIR) / 'frontend'
+        self.copy_tree(frontend_dir, '/frontend/', exclude={'index.html'})
+        for url, hashed in list(self.url_map.items()):
+            if url.startswith('/frontend/assets/'):
+                self.url_map['/assets/' + url[len('/frontend/assets/'):]] = hashed
+        self.copy_tree(Path(settings.MEDIA_ROOT), '/' + settings.MEDIA_URL.strip('/') + '/')
+        assets_key = hashlib.sha256(json_bytes(sorted(self.url_map.items()))).hexdigest()
+
+        for name, endpoint, build in self.api_artifacts():
+            fingerprint = f'{content_state(endpoint)[0]}:{assets_key}'
+            new_state[name] = fingerprint
+            if self.is_current(name, fingerprint):
+                self.skipped.append(name)
+                continue
+            self.write(name, self.rewrite_urls(json_bytes(build())))
+
+        fingerprint = f'{content_state("bootstrap")[0]}:{assets_key}:{content_hash(frontend_dir / "index.html")}'
+        new_state['index.html'] = fingerprint
+        if self.is_current('index.html', fingerprint):
+            self.skipped.append('index.html')
+        else:
+            self.write('index.html', self.render_index())
+
+        self.remove_stale(new_state)
+        (self.output_dir / STATE_FILE).write_text(json.dumps(new_state, indent=2, sort_keys=True))
+        self.remove_unreferenced_copies()
+        return {'written': self.written, 'skipped': self.skipped}
+
+    def is_current(self, name, fingerprint):
+        return (
+            self.incremental
+            and self.state.get(name) == fingerprint
+            and (self.output_dir / name).exists()
+        )
+
+    def api_artifacts(self):
+        """(path, endpoint, builder) for every exported API response"""
+        artifacts = [
+            ('api/bootstrap.json', 'bootstrap', bootstrap_payload),
+            ('api/profile.json', 'profile', lambda: profile_section(self.profile())),
+            ('api/skills.json', 'skills', skills_section),
+            ('api/projects.json', 'projects', self.projects_page),
+            (variant_name('api/projects.json', {'featured': 'true'}), 'projects', lambda: self.projects_page(featured=True)),
+            ('api/experience.json', 'experience', lambda: paginated(experience_section())),
+            ('api/contact.json', 'contact', lambda: contact_section(self.profile())),
+        ]
+        for pk in Project.objects.filter(is_active=True).values_list('pk', flat=True):
+            artifacts.append((f'api/projects/{pk}.json', 'project-detail', lambda pk=pk: self.project_detail(pk)))
+        return artifacts
+
+    def projects_page(self, featured=False):
+        # The whole list, facets included, as /api/projects/ serves it
+        params = {'featured': 'true'} if featured else {}
+        # From the database, like the rest of the export, rather than the
+        # index this process keeps
+        index = facets.build(content_state('projects')[0])
+        return dict(
+            paginated(projects_section(featured=featured, limit=None)),
+            facets=facets.facet_block(index, params),
+        )
+
+    def profile(self):
+        return Profile.objects.first()
+
+    def project_detail(self, pk):
+        project = Project.objects.prefetch_related('technologies').get(pk=pk)
+        return ProjectSerializer(project).data
+
+    def render_index(self):
+        html = render_to_string('index.html', {
+            'portfolio_data': bootstrap_payload(),
+            'static_site': True,
+        })
+        return self.rewrite_urls(html.encode())
+
+    def copy_tree(self, source_dir, url_prefix, exclude=()):
+        if not source_dir.is_dir():
+            return
+        self.copy_dirs.append(self.output_dir / url_prefix.strip('/'))
+        for path in sorted(source_dir.rglob('*')):
+            if not path.is_file() or path.name in exclude or path.name.startswith('.'):
+                continue
+            relative = path.relative_to(source_dir).as_posix()
+            target_relative = hashed_name(relative, content_hash(path))
+            target = self.output_dir / url_prefix.strip('/') / target_relative
+            if not target.exists():
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(path, target)
+                if self.compress and target.suffix in TEXT_EXTENSIONS:
+                    write_gzip(target, path.read_bytes())
+                self.written.append(target.relative_to(self.output_dir).as_posix())
+            self.url_map[url_prefix + relative] = url_prefix + target_relative
+
+    def rewrite_urls(self, data):
+        """Point quoted references to source files at their hashed copies"""
+        def replace(match):
+            # The hashed name supersedes a ?v= version from media_url()
+            hashed = self.url_map.get(match.group(1))
+            return f'"{hashed}"' if hashed else match.group(0)
+        return QUOTED_URL_RE.sub(replace, data.decode()).encode()
+
+    def write(self, name, data):
+        write_file(self.output_dir / name, data, compress=self.compress)
+        self.written.append(name)
+
+    def remove_stale(self, new_state):
+        for name in set(self.state) - set(new_state):
+            for suffix in ('', '.gz'):
+                path = self.output_dir / (name + suffix)
+                if path.exists():
+                    path.unlink()
+
+    def remove_unreferenced_copies(self):
+        """Delete the hashed copies of earlier exports that no file refers to any more"""
+        current = {self.output_dir / url.lstrip('/') for url in self.url_map.values()}
+        for directory in self.copy_dirs:
+            for path in sorted(directory.rglob('*')):
+                source = path.with_suffix('') if path.suffix == '.gz' else path
+                if path.is_file() and source not in current:
+                    path.unlink()
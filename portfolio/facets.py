@@ -0,0 +1,203 @@
+"""
+Technology facets of the project list.
+
+``FacetIndex`` holds bitmaps of active project primary keys (Python ints
+with bit ``pk`` set): one per technology name, one for all active projects
+and one for the featured ones.  Filtering by technologies is an AND or an
+OR of a few ints and every facet count the ``bit_count()`` of an AND, where
+SQL would need a join per technology on every request.
+
+Each process builds the index from three queries and keeps it, tagged with
+the cache versions of the projects endpoint's models.  Writes rebuild it
+once they commit and bump those versions (``cache.content_changed`` in
+``signals.py``), never from rows a rollback could still discard, so reads
+only compare versions; a read builds it only on a process's first request
+or after another process sharing the cache changed the content.  A bump
+that leaves the content fingerprint (``conditional.content_state``) as it
+was only retags it.
+"""
+import json
+import threading
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+
+from .cache import ENDPOINT_MODELS, aget_versions, get_versions
+from .conditional import content_state
+from .models import Project, Technology
+
+
+MATCH_MODES = ('all', 'any')
+# Up to this many matches a page is sorted out of the matches looked up by
+# key; above it the list's ordering index is walked, testing membership,
+# which stops at the page instead of sorting every match
+LOOKUP_LIMIT = 500
+
+# The set bits of every byte value
+BYTE_BITS = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+
+_lock = threading.Lock()
+_index = None
+
+
+def bitmap(pks):
+    """An int with the bits of ``pks`` set"""
+    pks = list(pks)
+    bits = bytearray(max(pks, default=0) // 8 + 1)
+    for pk in pks:
+        bits[pk >> 3] |= 1 << (pk & 7)
+    return int.from_bytes(bits, 'little')
+
+
+def bitmap_pks(value):
+    """The primary keys in a bitmap, ascending"""
+    data = value.to_bytes((value.bit_length() + 7) // 8, 'little')
+    return [index << 3 | bit for index, byte in enumerate(data) if byte for bit in BYTE_BITS[byte]]
+
+
+class FacetIndex:
+    def __init__(self, fingerprint, technologies, active, featured):
+        self.fingerprint = fingerprint
+        # The cache versions it was last found current for
+        self.versions = None
+        # [(name, bitmap)] in Technology ordering, one entry per name
+        self.technologies = technologies
+        self.by_name = {name.casefold(): value for name, value in technologies}
+        self.active = active
+        self.featured = featured
+
+    def base(self, featured=False):
+        return self.featured if featured else self.active
+
+    def select(self, names, match='all', featured=False):
+        """The projects with all (or any) of the technologies ``names``"""
+        base = self.base(featured)
+        if not names:
+            return base
+        values = [self.by_name.get(name.casefold(), 0) for name in names]
+        selected = 0 if match == 'any' else base
+        for value in values:
+            selected = selected | value if match == 'any' else selected & value
+        return selected & base
+
+
+def build(fingerprint):
+    projects = list(Project.objects.filter(is_active=True).order_by().values_list('pk', 'is_featured'))
+    active = bitmap(pk for pk, is_featured in projects)
+    # Whole tables in storage order; inactive projects are masked out below
+    members = {}
+    for technology_pk, project_pk in Project.technologies.through.objects.values_list('technology_id', 'project_id'):
+        members.setdefault(technology_pk, []).append(project_pk)
+    # Technologies that share a name are one facet
+    groups = {}
+    for pk, name in Technology.objects.filter(is_active=True).values_list('pk', 'name'):
+        if pk in members:
+            name, value = groups.get(name.casefold(), (name, 0))
+            groups[name.casefold()] = (name, value | bitmap(members[pk]))
+    return FacetIndex(
+        fingerprint,
+        technologies=[(name, value & active) for name, value in groups.values() if value & active],
+        active=active,
+        featured=bitmap(pk for pk, is_featured in projects if is_featured),
+    )
+
+
+def index_for(versions):
+    """The index of the content under ``versions``, rebuilt if the content changed"""
+    global _index
+    with _lock:
+        if _index is None or _index.versions != versions:
+            fingerprint = content_state('projects')[0]
+            if _index is None or _index.fingerprint != fingerprint:
+                _index = build(fingerprint)
+            _index.versions = versions
+        return _index
+
+
+def get_index():
+    """The index of the current content"""
+    versions = get_versions(ENDPOINT_MODELS['projects'])
+    index = _index
+    if index is not None and index.versions == versions:
+        return index
+    return index_for(versions)
+
+
+async def aget_index():
+    """``get_index`` for async views"""
+    versions = await aget_versions(ENDPOINT_MODELS['projects'])
+    index = _index
+    if index is not None and index.versions == versions:
+        return index
+    return await sync_to_async(index_for)(versions)
+
+
+def refresh():
+    """Rebuild now rather than on the next read"""
+    get_index()
+
+
+def tech_filter(params):
+    """(technology names, match mode) from the ``tech`` and ``match`` query parameters"""
+    names = [name.strip() for name in params.get('tech', '').split(',') if name.strip()]
+    match = params.get('match')
+    return names, match if match in MATCH_MODES else 'all'
+
+
+def has_json_each(connection):
+    """Whether key lists can be one ``json_each`` parameter (SQLite's JSON1)"""
+    return connection.vendor == 'sqlite'
+
+
+def key_list(value):
+    """The primary keys of a bitmap as one SQLite parameter, however many; see ``has_json_each``"""
+    return RawSQL('SELECT value FROM json_each(%s)', [json.dumps(bitmap_pks(value))])
+
+
+def filter_projects(queryset, index, params):
+    """``queryset`` narrowed to the projects the ``tech`` parameter selects"""
+    names, match = tech_filter(params)
+    if not names:
+        return queryset
+    selected = index.select(names, match)
+    if not has_json_each(connections[queryset.db]):
+        return queryset.filter(pk__in=bitmap_pks(selected))
+    if selected.bit_count() <= LOOKUP_LIMIT:
+        return queryset.filter(pk__in=key_list(selected))
+    # The shorter list of the matches or the active projects that do not
+    # match; the unary plus keeps SQLite from looking the keys up by rowid
+    excluded = index.active & ~selected
+    if excluded.bit_count() < selected.bit_count():
+        operator, keys = 'NOT IN', key_list(excluded)
+    else:
+        operator, keys = 'IN', key_list(selected)
+    condition = f'+"{Project._meta.db_table}"."id" {operator} ({keys.sql})'
+    return queryset.filter(RawSQL(condition, keys.params, output_field=BooleanField()))
+
+
+def facet_block(index, params):
+    """
+    The number of matching projects and, per technology, how many projects
+    it counts: within the results when every technology has to match (the
+    results choosing it would narrow to), within the unfiltered list when
+    any may (choosing it widens the results by them).
+    """
+    names, match = tech_filter(params)
+    featured = params.get('featured') == 'true'
+    selected = index.select(names, match, featured)
+    scope = selected if match == 'all' else index.base(featured)
+    chosen = {name.casefold() for name in names}
+    technologies = []
+    for name, value in index.technologies:
+        count = (scope & value).bit_count()
+        if count or name.casefold() in chosen:
+            technologies.append({'name': name, 'count': count, 'selected': name.casefold() in chosen})
+    # Chosen names no active project uses
+    unknown = {}
+    for name in names:
+        if name.casefold() not in index.by_name:
+            unknown.setdefault(name.casefold(), name)
+    technologies += [{'name': name, 'count': 0, 'selected': True} for name in unknown.values()]
+    return {'total': selected.bit_count(), 'technologies': technologies}
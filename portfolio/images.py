@@ -0,0 +1,211 @@
+"""
+Responsive derivatives for uploaded images.
+
+For every image field listed in ``IMAGE_FIELDS`` a resized copy is written
+for each configured width (never upscaling) in each configured format, next
+to the original under ``derivatives/``.  The variant list is stored on the
+model together with the source name it was generated from, so a new upload
+is detected by comparing the two.
+
+Generation happens off the request: saving a model schedules the work on a
+small thread pool once the transaction commits, and the
+``generate_image_variants`` command backfills existing media across
+processes.
+"""
+import logging
+import posixpath
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from . import cache
+
+
+logger = logging.getLogger(__name__)
+
+# model label -> (image field, variants field)
+IMAGE_FIELDS = {
+    'portfolio.Profile': ('profile_image', 'profile_image_variants'),
+    'portfolio.Project': ('image', 'image_variants'),
+}
+
+DEFAULTS = {
+    'WORKER': True,
+    'WORKERS': 2,
+    'WIDTHS': (160, 320, 640, 960, 1280),
+    # Listed in order of preference; the last one is the fallback <img> format
+    'FORMATS': ('webp', 'jpeg'),
+    'QUALITY': {'webp': 80, 'jpeg': 82},
+}
+
+CONTENT_TYPES = {'webp': 'image/webp', 'jpeg': 'image/jpeg', 'avif': 'image/avif', 'png': 'image/png'}
+EXTENSIONS = {'jpeg': 'jpg'}
+
+
+def get_setting(name):
+    return getattr(settings, 'PORTFOLIO_IMAGES', {}).get(name, DEFAULTS[name])
+
+
+def derivative_name(source_name, width, image_format):
+    stem, _ = posixpath.splitext(source_name)
+    extension = EXTENSIONS.get(image_format, image_format)
+    return f'derivatives/{stem}.{width}w.{extension}'
+
+
+def target_widths(original_width):
+    """Configured widths smaller than the original, plus the original capped at the largest bucket"""
+    widths = sorted(get_setting('WIDTHS'))
+    chosen = [width for width in widths if width < original_width]
+    chosen.append(min(original_width, widths[-1]))
+    return sorted(set(chosen))
+
+
+def generate_variants(source_name, storage=None):
+    """
+    Write the derivatives of ``source_name`` and return their descriptions,
+    ``[{'name', 'width', 'height', 'format'}, ...]``. Touches storage only,
+    never the database, so it is safe to call from worker processes.
+    """
+    storage = storage or default_storage
+    with storage.open(source_name, 'rb') as f:
+        image = Image.open(f)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    if image.mode != 'RGB':
+        # Flatten transparency onto white; JPEG has no alpha channel
+        rgba = image.convert('RGBA')
+        image = Image.new('RGB', image.size, 'white')
+        image.paste(rgba, mask=rgba.getchannel('A'))
+
+    variants = []
+    for width in target_widths(image.width):
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.Resampling.LANCZOS)
+        for image_format in get_setting('FORMATS'):
+            buffer = BytesIO()
+            quality = get_setting('QUALITY').get(image_format, 80)
+            options = {'quality': quality, 'optimize': True}
+            if image_format == 'jpeg':
+                options['progressive'] = True
+            elif image_format == 'webp':
+                options = {'quality': quality, 'method': 6}
+            resized.save(buffer, format=image_format.upper(), **options)
+            name = derivative_name(source_name, width, image_format)
+            if storage.exists(name):
+                storage.delete(name)
+            storage.save(name, ContentFile(buffer.getvalue()))
+            variants.append({'name': name, 'width': width, 'height': height, 'format': image_format})
+    return variants
+
+
+def delete_variants(variants, keep=(), storage=None):
+    storage = storage or default_storage
+    for variant in variants or []:
+        if variant['name'] not in keep and storage.exists(variant['name']):
+            storage.delete(variant['name'])
+
+
+def needs_variants(instance):
+    image_field, variants_field = IMAGE_FIELDS[instance._meta.label]
+    source = getattr(instance, image_field).name or None
+    return (getattr(instance, variants_field) or {}).get('source') != source
+
+
+def store_variants(model, pk, source, variants):
+    """
+    Save ``variants`` for ``source`` unless the image was replaced in the
+    meantime, and bump ``updated_at`` so cached responses and validators
+    pick up the new URLs. Returns True when the row was updated.
+    """
+    image_field, variants_field = IMAGE_FIELDS[model._meta.label]
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None or (getattr(instance, image_field).name or None) != source:
+        return False
+    previous = (getattr(instance, variants_field) or {}).get('variants', [])
+    value = {'source': source, 'variants': variants} if source else {}
+    # Compare-and-set on the image name so a stale job never wins over a newer upload
+    if source:
+        current = Q(**{image_field: source})
+    else:
+        current = Q(**{image_field: ''}) | Q(**{f'{image_field}__isnull': True})
+    updated = model.objects.filter(current, pk=pk).update(
+        **{variants_field: value, 'updated_at': timezone.now()}
+    )
+    if updated:
+        delete_variants(previous, keep={variant['name'] for variant in variants})
+        cache.invalidate(model.__name__)
+    return bool(updated)
+
+
+def process_instance(label, pk):
+    """Generate and store the derivatives for one row"""
+    model = apps.get_model(label)
+    image_field, _ = IMAGE_FIELDS[label]
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return False
+    source = getattr(instance, image_field).name or None
+    variants = generate_variants(source) if source else []
+    return store_variants(model, pk, source, variants)
+
+
+def variant_sources(variants, url=None):
+    """
+    Group stored variants by format for ``<picture>``/``srcset``:
+    ``[{'type', 'srcset': [{'url', 'width'}]}]`` in preference order.
+    """
+    url = url or default_storage.url
+    groups = {}
+    for variant in (variants or {}).get('variants', []):
+        groups.setdefault(variant['format'], []).append({'url': url(variant['name']), 'width': variant['width']})
+    order = list(get_setting('FORMATS'))
+    return [
+        {'type': CONTENT_TYPES.get(image_format, f'image/{image_format}'), 'srcset': groups[image_format]}
+        for image_format in sorted(groups, key=lambda f: order.index(f) if f in order else len(order))
+    ]
+
+
+class ImageWorker:
+    """Thread pool that generates derivatives after the saving transaction commits"""
+
+    def __init__(self):
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def schedule(self, label, pk):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=get_setting('WORKERS'), thread_name_prefix='portfolio-images'
+                )
+            return self._executor.submit(self._run, label, pk)
+
+    def _run(self, label, pk):
+        try:
+            return process_instance(label, pk)
+        except Exception:
+            logger.exception("Generating image variants for %s %s failed", label, pk)
+            return False
+        finally:
+            connections.close_all()
+
+
+worker = ImageWorker()
+
+
+def schedule_variants(instance):
+    """Queue derivative generation for ``instance`` once the current transaction commits"""
+    label, pk = instance._meta.label, instance.pk
+    if get_setting('WORKER'):
+        transaction.on_commit(lambda: worker.schedule(label, pk))
+    else:
+        transaction.on_commit(lambda: process_instance(label, pk))
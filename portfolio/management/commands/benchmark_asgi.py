@@ -0,0 +1,233 @@
+import asyncio
+import json
+import sys
+import threading
+import time
+from importlib import import_module
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from django.test import override_settings
+from django.urls import include, path, reverse
+from django.utils import timezone
+
+from portfolio.benchmarks import format_table, scratch_database, summarize
+from portfolio.urls import api_urlpatterns
+
+from .benchmark_endpoints import SCALES, clear_caches, seed_dataset
+
+
+def site_urlpatterns(asynchronous):
+    """The project's URLconf with the API built for the given kind of views"""
+    others = [pattern for pattern in import_module(settings.ROOT_URLCONF).urlpatterns if str(pattern.pattern) != 'api/']
+    return [path('api/', include(api_urlpatterns(asynchronous))), *others]
+
+
+class SyncUrls:
+    """The site with the DRF views, as under WSGI"""
+    urlpatterns = site_urlpatterns(asynchronous=False)
+
+
+class AsyncUrls:
+    """The site with the async read views, as ``myportfolio/asgi.py`` serves it"""
+    urlpatterns = site_urlpatterns(asynchronous=True)
+
+
+# server interface, URLconf
+VARIANTS = {
+    'wsgi': ('wsgi', SyncUrls),
+    'asgi-sync': ('asgi', SyncUrls),
+    'asgi-async': ('asgi', AsyncUrls),
+}
+
+# A response cache that never hits, so every request reaches the views
+UNCACHED = {
+    'CACHES': {
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'portfolio'},
+        'throttle': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'portfolio-throttle'},
+        'benchmark-dummy': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+    },
+    'PORTFOLIO_RESPONSE_CACHE': {'ALIAS': 'benchmark-dummy'},
+}
+
+
+def read_urls(project_pk):
+    return [
+        reverse('profile'), reverse('skills'), reverse('projects') + '?featured=true&limit=6',
+        reverse('project-detail', args=[project_pk]), reverse('experience'), reverse('contact-info'),
+    ]
+
+
+def wsgi_environ(url, method='GET', body=b'', content_type=None):
+    url = urlsplit(url)
+    environ = {
+        'REQUEST_METHOD': method, 'PATH_INFO': url.path, 'QUERY_STRING': url.query, 'SCRIPT_NAME': '',
+        'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost', 'REMOTE_ADDR': '127.0.0.1', 'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0), 'wsgi.url_scheme': 'http', 'wsgi.input': BytesIO(body), 'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True, 'wsgi.multiprocess': False, 'wsgi.run_once': False,
+    }
+    if content_type:
+        environ['CONTENT_TYPE'] = content_type
+    return environ
+
+
+def run_wsgi(application, urls, concurrency):
+    """Latency samples (ms), elapsed seconds and errors with a threaded WSGI server's concurrency"""
+    samples = []
+    errors = []
+
+    def send(url):
+        statuses = []
+        start = time.perf_counter()
+        body = application(wsgi_environ(url), lambda status, headers: statuses.append(status))
+        try:
+            b''.join(body)
+        finally:
+            # Fires request_finished, as a WSGI server would
+            body.close()
+        samples.append((time.perf_counter() - start) * 1000)
+        if not statuses[0].startswith('200'):
+            errors.append(f'{url}: {statuses[0]}')
+
+    # Every close task waits at the barrier, so each worker thread runs one
+    barrier = threading.Barrier(concurrency)
+
+    def close_connections():
+        barrier.wait()
+        connections.close_all()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(send, url) for url in urls]:
+            future.result()
+        elapsed = time.perf_counter() - start
+        for future in [executor.submit(close_connections) for _ in range(concurrency)]:
+            future.result()
+    return samples, elapsed, errors
+
+
+async def asgi_request(application, url):
+    url = urlsplit(url)
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': url.path, 'raw_path': url.path.encode(), 'query_string': url.query.encode(), 'root_path': '',
+        'headers': [(b'host', b'localhost')], 'client': ('127.0.0.1', 50000), 'server': ('localhost', 80),
+    }
+    disconnected = asyncio.Event()
+    received = []
+    status = []
+
+    async def receive():
+        if not received:
+            received.append(True)
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # The client stays connected until the response is complete
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+
+    try:
+        await application(scope, receive, send)
+    finally:
+        disconnected.set()
+    return status[0]
+
+
+def run_asgi(application, urls, concurrency):
+    """Latency samples (ms), elapsed seconds and errors with ``concurrency`` requests in flight"""
+    samples = []
+    errors = []
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def send(url):
+            async with semaphore:
+                start = time.perf_counter()
+                status = await asgi_request(application, url)
+                samples.append((time.perf_counter() - start) * 1000)
+                if status != 200:
+                    errors.append(f'{url}: {status}')
+
+        start = time.perf_counter()
+        await asyncio.gather(*(send(url) for url in urls))
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(main())
+    return samples, elapsed, errors
+
+
+def run_benchmarks(scale, variants, requests, concurrency):
+    """{variant: {cache state: result}} and a list of failed requests"""
+    project_pk = seed_dataset(scale)
+    urls = read_urls(project_pk)
+    urls = [urls[i % len(urls)] for i in range(requests)]
+    report = {}
+    errors = []
+    for name in variants:
+        interface, urlconf = VARIANTS[name]
+        results = report[name] = {}
+        for state, overrides in (('uncached', UNCACHED), ('cached', {})):
+            with override_settings(ROOT_URLCONF=urlconf, **overrides):
+                clear_caches()
+                if interface == 'wsgi':
+                    application = get_wsgi_application()
+                    samples, elapsed, failed = run_wsgi(application, urls, concurrency)
+                else:
+                    application = get_asgi_application()
+                    samples, elapsed, failed = run_asgi(application, urls, concurrency)
+            results[state] = dict(summarize(samples), throughput_rps=len(samples) / elapsed)
+            errors += [f'{name} {state} {error}' for error in failed]
+    clear_caches()
+    return report, errors
+
+
+class Command(BaseCommand):
+    help = "Compare concurrent throughput of the read endpoints under WSGI, ASGI with sync views and ASGI with async views"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', default='small', choices=list(SCALES))
+        parser.add_argument('--variants', default=','.join(VARIANTS), help=f"Comma-separated subset of {', '.join(VARIANTS)}")
+        parser.add_argument('--requests', type=int, default=600, help="Requests per variant and cache state")
+        parser.add_argument('--concurrency', type=int, default=16, help="Requests in flight (WSGI worker threads)")
+        parser.add_argument('--output', help="Write the JSON report to this path")
+
+    def handle(self, *args, **options):
+        variants = [variant.strip() for variant in options['variants'].split(',') if variant.strip()]
+        unknown = set(variants) - set(VARIANTS)
+        if unknown:
+            raise CommandError(f"Unknown variant(s): {', '.join(sorted(unknown))}")
+
+        # The outbox worker and the per-request log would only add noise
+        with scratch_database(), override_settings(PORTFOLIO_OUTBOX={'WORKER': False}, PORTFOLIO_TIMING={'LOG': False}):
+            report, errors = run_benchmarks(options['scale'], variants, options['requests'], options['concurrency'])
+        if errors:
+            raise CommandError("Requests failed:\n" + '\n'.join(errors[:20]))
+
+        rows = [
+            [variant, state, data['count'], data['throughput_rps'], data['p50_ms'], data['p95_ms'], data['p99_ms']]
+            for variant, states in report.items() for state, data in states.items()
+        ]
+        self.stdout.write(format_table(['variant', 'cache', 'requests', 'req/s', 'p50', 'p95', 'p99'], rows))
+
+        if options['output']:
+            data = {
+                'generated_at': timezone.now().isoformat(),
+                'scale': options['scale'],
+                'requests': options['requests'],
+                'concurrency': options['concurrency'],
+                'results': report,
+            }
+            with open(options['output'], 'w') as f:
+                json.dump(data, f, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
@@ -0,0 +1,89 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from portfolio.benchmarks import format_table, scratch_database, timer
+from portfolio.bulk import sync_rows
+from portfolio.models import Project, Technology
+
+
+class WriteRecorder:
+    """execute_wrapper that counts write statements and the time spent in them"""
+
+    def __init__(self):
+        self.statements = 0
+        self.write_ms = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith('SELECT'):
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.statements += 1
+            self.write_ms += (time.perf_counter() - start) * 1000
+
+
+def project_items(count, technologies, revision=0):
+    """Payload for a projects PUT; ``revision`` edits every tenth project"""
+    items = []
+    for i in range(count):
+        suffix = f' (rev {revision})' if revision and i % 10 == 0 else ''
+        items.append({
+            'title': f'Project {i}',
+            'description': f'Generated project {i}{suffix}',
+            'is_featured': i < 6,
+            'order': i,
+            'technologies': [technologies[(i + j) % len(technologies)] for j in range(3)],
+        })
+    return items
+
+
+def legacy_put(items):
+    """The previous implementation: delete everything, then one create per item"""
+    Project.objects.all().delete()
+    for item in items:
+        item = dict(item)
+        names = item.pop('technologies')
+        project = Project.objects.create(**item)
+        project.technologies.set(Technology.objects.filter(name__in=names))
+
+
+def diff_put(items):
+    with transaction.atomic():
+        sync_rows(Project, items, key_fields=('title',), m2m='technologies')
+
+
+class Command(BaseCommand):
+    help = "Compare write time and lock hold time of the projects PUT before and after diff-based sync"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10,100,500,2000', help="Comma-separated item counts")
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        rows = []
+        with scratch_database():
+            technologies = [f'Tech {i}' for i in range(12)]
+            Technology.objects.bulk_create(
+                Technology(name=name, icon_url=f'https://example.com/{i}.svg') for i, name in enumerate(technologies)
+            )
+            for size in sizes:
+                for label, put in (('delete+create', legacy_put), ('diff sync', diff_put)):
+                    Project.objects.all().delete()
+                    diff_put(project_items(size, technologies))
+                    recorder = WriteRecorder()
+                    results = {}
+                    with connection.execute_wrapper(recorder), timer(results, 'total'):
+                        put(project_items(size, technologies, revision=1))
+                    # Autocommit holds the write lock once per statement; the
+                    # atomic sync holds it for the whole transaction.
+                    lock_ms = recorder.write_ms if put is legacy_put else results['total']
+                    inconsistent_ms = results['total'] if put is legacy_put else 0.0
+                    rows.append([size, label, recorder.statements, results['total'], lock_ms, inconsistent_ms])
+
+        self.stdout.write(format_table(
+            ['items', 'strategy', 'writes', 'total_ms', 'lock_ms', 'partial_view_ms'], rows
+        ))
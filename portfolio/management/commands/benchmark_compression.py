@@ -0,0 +1,47 @@
+import time
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, override_settings
+from django.urls import reverse
+
+from portfolio.benchmarks import format_table, scratch_database
+from portfolio.compression import ApiCompressionMiddleware, available_encodings, body_cache
+
+
+ENDPOINTS = ['bootstrap', 'profile', 'skills', 'projects', 'experience', 'contact-info']
+
+
+class Command(BaseCommand):
+    help = "Compare CPU time per API response compressed with and without the compressed body cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help="Requests per endpoint and mode")
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            call_command('seed_portfolio', stdout=StringIO())
+            client = Client()
+            bodies = {name: client.get(reverse(name)).content for name in ENDPOINTS}
+
+        factory = RequestFactory()
+        rows = []
+        for encoding in available_encodings():
+            for name, body in bodies.items():
+                request = factory.get(reverse(name), HTTP_ACCEPT_ENCODING=encoding)
+                middleware = ApiCompressionMiddleware(lambda request: HttpResponse(body, content_type='application/json'))
+                row = [name, encoding, len(body), len(middleware(request).content)]
+                for cache_entries in (0, 512):
+                    body_cache.clear()
+                    with override_settings(PORTFOLIO_COMPRESSION={'CACHE_ENTRIES': cache_entries}):
+                        start = time.process_time()
+                        for _ in range(options['requests']):
+                            middleware(request)
+                        row.append((time.process_time() - start) / options['requests'] * 1e6)
+                rows.append(row)
+        body_cache.clear()
+        self.stdout.write(format_table(
+            ['endpoint', 'encoding', 'bytes', 'compressed', 'cpu_us_uncached', 'cpu_us_cached'], rows
+        ))
@@ -0,0 +1,213 @@
+import json
+import platform
+import subprocess
+import time
+from datetime import date
+
+import django
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from portfolio.benchmarks import scratch_database, summarize, format_table
+from portfolio.models import (
+    Profile, TechnicalSkill, ProfessionalSkill, Technology,
+    Project, Experience, SocialLink, ContactMessage, OutboxEmail
+)
+
+
+# Synthetic dataset sizes; technologies are shared, so large scales also
+# exercise projects with many technologies each
+SCALES = {
+    'small': {'projects': 10, 'technologies': 12, 'technologies_per_project': 3, 'experience': 20, 'messages': 50},
+    'medium': {'projects': 200, 'technologies': 60, 'technologies_per_project': 10, 'experience': 1000, 'messages': 5000},
+    'large': {'projects': 2000, 'technologies': 200, 'technologies_per_project': 25, 'experience': 5000, 'messages': 50000},
+}
+
+# Maximum queries for a request that misses every cache. They must not
+# depend on the scale; the validator query and the BEGIN/COMMIT around
+# writes are included.
+QUERY_BUDGETS = {
+    'profile': 2,
+    'skills': 4,
+    'projects': 4,
+    'project-detail': 3,
+    'experience': 3,
+    'contact-info': 3,
+    'bootstrap': 9,
+    'send-message': 4,
+}
+
+
+def seed_dataset(scale):
+    """Replace all portfolio content with a synthetic dataset of the given scale"""
+    sizes = SCALES[scale]
+    for model in (OutboxEmail, ContactMessage, Project, Technology, Experience, TechnicalSkill, ProfessionalSkill, SocialLink, Profile):
+        model.objects.all().delete()
+
+    Profile.objects.create(
+        name='Benchmark User', title='Developer', intro='Intro', about_journey='Journey',
+        about_interests='Interests', email='bench@example.com', location='Nairobi',
+        experience_years='5+ Years', resume_file='resume/My_Resume.pdf',
+    )
+    TechnicalSkill.objects.bulk_create(TechnicalSkill(name=f'Skill {i}', level=50 + i % 50, order=i) for i in range(20))
+    ProfessionalSkill.objects.bulk_create(ProfessionalSkill(name=f'Soft skill {i}', icon='users', order=i) for i in range(6))
+    SocialLink.objects.bulk_create(SocialLink(name=f'Link {i}', url=f'https://example.com/{i}', icon='github', order=i) for i in range(5))
+    technologies = Technology.objects.bulk_create(
+        Technology(name=f'Tech {i}', icon_url=f'https://example.com/{i}.svg', order=i)
+        for i in range(sizes['technologies'])
+    )
+    projects = Project.objects.bulk_create(
+        (Project(title=f'Project {i}', description=f'Generated project {i}', is_featured=i % 3 == 0, order=i)
+         for i in range(sizes['projects'])),
+        batch_size=2000,
+    )
+    Through = Project.technologies.through
+    Through.objects.bulk_create(
+        (Through(project_id=project.pk, technology_id=technologies[(n + j) % len(technologies)].pk)
+         for n, project in enumerate(projects) for j in range(sizes['technologies_per_project'])),
+        batch_size=5000,
+    )
+    Experience.objects.bulk_create(
+        (Experience(title=f'Role {i}', company=f'Company {i}', start_date=date(2000 + i % 20, 1, 1),
+                    is_current=i == 0, description=f'Generated role {i}', order=i,
+                    experience_type=('work', 'education', 'certification')[i % 3])
+         for i in range(sizes['experience'])),
+        batch_size=2000,
+    )
+    ContactMessage.objects.bulk_create(
+        (ContactMessage(name=f'Sender {i}', email=f'sender{i}@example.com', subject='Hello', message='Body')
+         for i in range(sizes['messages'])),
+        batch_size=5000,
+    )
+    return projects[len(projects) // 2].pk
+
+
+def endpoint_requests(project_pk):
+    """(name, method, url, data) for every benchmarked endpoint"""
+    return [
+        ('profile', 'get', reverse('profile'), None),
+        ('skills', 'get', reverse('skills'), None),
+        ('projects', 'get', reverse('projects'), None),
+        ('project-detail', 'get', reverse('project-detail', args=[project_pk]), None),
+        ('experience', 'get', reverse('experience'), None),
+        ('contact-info', 'get', reverse('contact-info'), None),
+        ('bootstrap', 'get', reverse('bootstrap'), None),
+        ('send-message', 'post', reverse('send-message'), {'name': 'Bench', 'subject': 'Benchmark', 'message': 'Hello'}),
+    ]
+
+
+def clear_caches():
+    for alias in settings.CACHES:
+        caches[alias].clear()
+
+
+def measure(client, method, url, data, requests, cold):
+    """Latency samples (ms) and the query count of the last request"""
+    samples = []
+    queries = 0
+    for i in range(requests):
+        if cold:
+            clear_caches()
+        kwargs = {}
+        if data is not None:
+            # A fresh client address and sender per request keeps the contact throttles out of the way
+            kwargs = {'data': dict(data, email=f'bench{i}@example.com'), 'REMOTE_ADDR': f'10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}'}
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            response = getattr(client, method)(url, **kwargs)
+            samples.append((time.perf_counter() - start) * 1000)
+        if response.status_code not in (200, 201):
+            raise CommandError(f'{method.upper()} {url} returned {response.status_code}')
+        queries = len(captured)
+    return samples, queries
+
+
+def run_benchmarks(scales, requests):
+    """
+    Benchmark every endpoint at each scale on the current database.
+    Returns the report and a list of query budget violations.
+    """
+    client = Client()
+    report = {}
+    violations = []
+    # The outbox worker would try to deliver the benchmark's contact messages
+    with override_settings(PORTFOLIO_OUTBOX={'WORKER': False}):
+        for scale in scales:
+            project_pk = seed_dataset(scale)
+            results = report[scale] = {}
+            for name, method, url, data in endpoint_requests(project_pk):
+                cold_samples, queries = measure(client, method, url, data, requests, cold=True)
+                warm_samples, warm_queries = measure(client, method, url, data, requests, cold=False)
+                results[name] = {
+                    'url': url,
+                    'queries': queries,
+                    'warm_queries': warm_queries,
+                    'query_budget': QUERY_BUDGETS[name],
+                    'cold': summarize(cold_samples),
+                    'warm': summarize(warm_samples),
+                }
+                if queries > QUERY_BUDGETS[name]:
+                    violations.append(f'{scale} {name}: {queries} queries (budget {QUERY_BUDGETS[name]})')
+    clear_caches()
+    return report, violations
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = "Benchmark every API endpoint on synthetic datasets and check query budgets"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', default='small,medium,large', help=f"Comma-separated subset of {', '.join(SCALES)}")
+        parser.add_argument('--requests', type=int, default=50, help="Requests per endpoint, scale and cache state")
+        parser.add_argument('--output', help="Write the JSON report to this path")
+
+    def handle(self, *args, **options):
+        scales = [scale.strip() for scale in options['scales'].split(',') if scale.strip()]
+        unknown = set(scales) - set(SCALES)
+        if unknown:
+            raise CommandError(f"Unknown scale(s): {', '.join(sorted(unknown))}")
+
+        with scratch_database():
+            results, violations = run_benchmarks(scales, options['requests'])
+
+        rows = [
+            [scale, name, data['queries'], data['query_budget'], data['cold']['p50_ms'], data['cold']['p95_ms'],
+             data['cold']['p99_ms'], data['warm']['p50_ms'], data['warm']['p99_ms']]
+            for scale, endpoints in results.items() for name, data in endpoints.items()
+        ]
+        self.stdout.write(format_table(
+            ['scale', 'endpoint', 'queries', 'budget', 'cold_p50', 'cold_p95', 'cold_p99', 'warm_p50', 'warm_p99'], rows
+        ))
+
+        if options['output']:
+            report = {
+                'generated_at': timezone.now().isoformat(),
+                'git_revision': git_revision(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'requests': options['requests'],
+                'scales': {scale: SCALES[scale] for scale in scales},
+                'results': results,
+                'violations': violations,
+            }
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
+
+        if violations:
+            raise CommandError("Query budget exceeded:\n" + '\n'.join(violations))
@@ -0,0 +1,129 @@
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.utils import timezone
+from rest_framework.settings import api_settings
+
+from portfolio import facets
+from portfolio.benchmarks import format_table, scratch_database, summarize
+from portfolio.models import Project, Technology
+from portfolio.rows import PROJECT_LIST_ROWS
+
+
+TECHNOLOGIES = 50
+PER_PROJECT = (2, 6)
+
+
+def seed_projects(total, seed=0):
+    """Bulk-create ``total`` projects tagged with technologies of Zipf-like popularity"""
+    rng = random.Random(seed)
+    technologies = Technology.objects.bulk_create(
+        Technology(name=f'Tech {i}', icon_url=f'https://example.com/{i}.svg', order=i) for i in range(TECHNOLOGIES)
+    )
+    weights = [1 / rank for rank in range(1, TECHNOLOGIES + 1)]
+    projects = Project.objects.bulk_create(
+        (Project(title=f'Project {i}', description='Generated', is_featured=i % 10 == 0, is_active=i % 20 != 0, order=i)
+         for i in range(total)),
+        batch_size=5000,
+    )
+    Through = Project.technologies.through
+    Through.objects.bulk_create(
+        (Through(project_id=project.pk, technology_id=technology.pk)
+         for project in projects
+         for technology in set(rng.choices(technologies, weights, k=rng.randint(*PER_PROJECT)))),
+        batch_size=5000,
+    )
+
+
+def filters():
+    """{name: query parameters}, from wide to narrow selections"""
+    return {
+        'one popular': {'tech': 'Tech 0'},
+        'two, all': {'tech': 'Tech 0,Tech 1'},
+        'two, any': {'tech': 'Tech 0,Tech 1', 'match': 'any'},
+        'three, all': {'tech': 'Tech 0,Tech 2,Tech 5'},
+        'rare, any': {'tech': 'Tech 40,Tech 45', 'match': 'any'},
+    }
+
+
+def page(queryset):
+    return list(PROJECT_LIST_ROWS.rows(queryset)[:api_settings.PAGE_SIZE + 1])
+
+
+def bitmap_request(params):
+    """What the list endpoint does per request: the index is already built"""
+    index = facets.get_index()
+    queryset = Project.objects.filter(is_active=True)
+    rows = page(facets.filter_projects(queryset, index, params))
+    return rows, facets.facet_block(index, params)
+
+
+def join_request(params):
+    """The same page and facets with a join per technology and a GROUP BY"""
+    names, match = facets.tech_filter(params)
+    queryset = Project.objects.filter(is_active=True)
+    if match == 'all':
+        for name in names:
+            queryset = queryset.filter(technologies__name__iexact=name)
+    else:
+        queryset = queryset.filter(pk__in=Project.technologies.through.objects.filter(
+            technology__name__in=names).values('project_id'))
+    rows = page(queryset)
+    selected = queryset.values('pk')
+    counts = list(
+        Technology.objects.filter(project__in=selected).values('name').annotate(count=Count('project')).order_by('order')
+    )
+    return rows, {'total': queryset.count(), 'technologies': counts}
+
+
+def run(function, params, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows, block = function(params)
+        samples.append((time.perf_counter() - start) * 1000)
+    return dict(summarize(samples), total=block['total'])
+
+
+class Command(BaseCommand):
+    help = "Measure technology filtering and facet counts from the bitmap index against SQL joins"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--projects', type=int, default=5000, help="Projects to seed")
+        parser.add_argument('--repeat', type=int, default=200, help="Requests per filter")
+        parser.add_argument('--output', help="Write the JSON report to this path")
+
+    def handle(self, *args, **options):
+        report = {}
+        with scratch_database():
+            seed_projects(options['projects'])
+            start = time.perf_counter()
+            index = facets.get_index()
+            build_ms = (time.perf_counter() - start) * 1000
+            for name, params in filters().items():
+                report[name] = {
+                    'select + facets': run(lambda params: (None, facets.facet_block(index, params)), params, options['repeat']),
+                    'bitmap request': run(bitmap_request, params, options['repeat']),
+                    'join request': run(join_request, params, max(1, options['repeat'] // 10)),
+                }
+
+        rows = [
+            [name, method, data['total'], data['p50_ms'], data['p95_ms'], data['p99_ms']]
+            for name, methods in report.items() for method, data in methods.items()
+        ]
+        self.stdout.write(f"Index of {options['projects']} projects built in {build_ms:.2f} ms")
+        self.stdout.write(format_table(['filter', 'method', 'matches', 'p50', 'p95', 'p99'], rows))
+
+        if options['output']:
+            data = {
+                'generated_at': timezone.now().isoformat(),
+                'projects': options['projects'],
+                'build_ms': build_ms,
+                'results': report,
+            }
+            with open(options['output'], 'w') as f:
+                json.dump(data, f, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
@@ -0,0 +1,146 @@
+import json
+import random
+import string
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from portfolio import search
+from portfolio.benchmarks import format_table, scratch_database, summarize
+from portfolio.models import Experience, Project, TechnicalSkill, Technology
+
+
+# Share of the documents per kind
+MIX = {'project': 0.7, 'experience': 0.2, 'technical_skill': 0.1}
+VOCABULARY = 20000
+TITLE_WORDS = 3
+BODY_WORDS = 40
+
+
+class Corpus:
+    """Synthetic words with Zipf-like frequencies, as in natural text"""
+
+    def __init__(self, seed=0):
+        self.rng = random.Random(seed)
+        words = set()
+        while len(words) < VOCABULARY:
+            words.add(''.join(self.rng.choices(string.ascii_lowercase, k=self.rng.randint(4, 9))))
+        self.words = sorted(words)
+        self.rng.shuffle(self.words)
+        self.weights = [1 / rank for rank in range(1, VOCABULARY + 1)]
+
+    def text(self, count):
+        return ' '.join(self.rng.choices(self.words, self.weights, k=count))
+
+
+def seed_documents(total, corpus):
+    """Bulk-create ``total`` searchable rows in the proportions of ``MIX``"""
+    technologies = Technology.objects.bulk_create(
+        Technology(name=f'Tech {corpus.text(1)}', icon_url=f'https://example.com/{i}.svg', order=i) for i in range(50)
+    )
+    projects = Project.objects.bulk_create(
+        (Project(title=corpus.text(TITLE_WORDS), description=corpus.text(BODY_WORDS), order=i)
+         for i in range(int(total * MIX['project']))),
+        batch_size=2000,
+    )
+    Through = Project.technologies.through
+    Through.objects.bulk_create(
+        (Through(project_id=project.pk, technology_id=technologies[(n + j) % len(technologies)].pk)
+         for n, project in enumerate(projects) for j in range(3)),
+        batch_size=5000,
+    )
+    Experience.objects.bulk_create(
+        (Experience(title=corpus.text(TITLE_WORDS), company=corpus.text(1), start_date=date(2000 + i % 20, 1, 1),
+                    description=corpus.text(BODY_WORDS), order=i)
+         for i in range(int(total * MIX['experience']))),
+        batch_size=2000,
+    )
+    TechnicalSkill.objects.bulk_create(
+        (TechnicalSkill(name=corpus.text(2), level=i % 100, category=corpus.text(1), order=i)
+         for i in range(total - len(technologies) - int(total * MIX['project']) - int(total * MIX['experience']))),
+        batch_size=2000,
+    )
+
+
+def query_classes(corpus, count):
+    """{name: [query, ...]}, from the most frequent words to ones that match nothing"""
+    rng = random.Random(1)
+    common = corpus.words[:20]
+    middle = corpus.words[200:2000]
+    rare = corpus.words[-2000:]
+    return {
+        'common word': [rng.choice(common) for _ in range(count)],
+        'rare word': [rng.choice(rare) for _ in range(count)],
+        'prefix': [rng.choice(middle)[:3] for _ in range(count)],
+        'two words': [f'{rng.choice(common)} {rng.choice(middle)}' for _ in range(count)],
+        'no match': [f'zz{rng.choice(middle)}' for _ in range(count)],
+    }
+
+
+def naive_search(query, limit):
+    """The ``icontains`` scan search replaces"""
+    condition = Q(title__icontains=query) | Q(description__icontains=query)
+    return (
+        list(Project.objects.filter(condition, is_active=True).values_list('pk', flat=True)[:limit])
+        + list(Experience.objects.filter(condition, is_active=True).values_list('pk', flat=True)[:limit])
+    )
+
+
+def run_queries(function, queries):
+    samples = []
+    results = 0
+    for query in queries:
+        start = time.perf_counter()
+        results += len(function(query))
+        samples.append((time.perf_counter() - start) * 1000)
+    return dict(summarize(samples), mean_results=results / len(queries))
+
+
+class Command(BaseCommand):
+    help = "Measure full-text search latency against a synthetic index, and the icontains scan it replaces"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--documents', type=int, default=100000, help="Indexed documents")
+        parser.add_argument('--queries', type=int, default=200, help="Queries per query class")
+        parser.add_argument('--baseline-queries', type=int, default=10, help="icontains queries per class; 0 skips them")
+        parser.add_argument('--output', help="Write the JSON report to this path")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("This benchmark needs the SQLite backend")
+        limit = search.get_setting('LIMIT')
+        corpus = Corpus()
+        report = {}
+        with scratch_database():
+            # bulk_create sends no signals, so the index is built in one pass
+            seed_documents(options['documents'], corpus)
+            start = time.perf_counter()
+            counts = search.rebuild()
+            rebuild_seconds = time.perf_counter() - start
+            for name, queries in query_classes(corpus, options['queries']).items():
+                report[name] = {'fts5': run_queries(lambda query: search.search(query, limit=limit), queries)}
+                if options['baseline_queries']:
+                    queries = queries[:options['baseline_queries']]
+                    report[name]['icontains'] = run_queries(lambda query: naive_search(query, limit), queries)
+
+        rows = [
+            [name, engine, data['count'], data['mean_results'], data['p50_ms'], data['p95_ms'], data['p99_ms']]
+            for name, engines in report.items() for engine, data in engines.items()
+        ]
+        self.stdout.write(f"Indexed {sum(counts.values())} documents in {rebuild_seconds:.2f}s")
+        self.stdout.write(format_table(['query', 'engine', 'queries', 'results', 'p50', 'p95', 'p99'], rows))
+
+        if options['output']:
+            data = {
+                'generated_at': timezone.now().isoformat(),
+                'documents': counts,
+                'rebuild_seconds': rebuild_seconds,
+                'results': report,
+            }
+            with open(options['output'], 'w') as f:
+                json.dump(data, f, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
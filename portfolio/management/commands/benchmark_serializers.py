@@ -0,0 +1,81 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from portfolio.benchmarks import format_table, scratch_database
+from portfolio.models import Experience, Project, Technology
+from portfolio.rows import EXPERIENCE_ROWS, PROJECT_LIST_ROWS
+from portfolio.serializers import ExperienceSerializer, ProjectListSerializer
+
+
+def populate(count, technologies):
+    """Grow the projects and experience tables to ``count`` rows each"""
+    Through = Project.technologies.through
+    existing = Project.objects.count()
+    projects = Project.objects.bulk_create(
+        (Project(title=f'Project {i}', description=f'Generated project {i}', is_featured=i % 3 == 0, order=i)
+         for i in range(existing, count)),
+        batch_size=5000,
+    )
+    Through.objects.bulk_create(
+        (Through(project_id=project.pk, technology_id=technologies[(project.pk + j) % len(technologies)].pk)
+         for project in projects for j in range(3)),
+        batch_size=5000,
+    )
+    Experience.objects.bulk_create(
+        (Experience(title=f'Role {i}', company=f'Company {i}', start_date=date(2000 + i % 20, 1, 1),
+                    end_date=None if i % 4 == 0 else date(2001 + i % 20, 1, 1), is_current=i % 4 == 0,
+                    description=f'Generated role {i}', order=i)
+         for i in range(Experience.objects.count(), count)),
+        batch_size=5000,
+    )
+
+
+def drf_projects():
+    queryset = Project.objects.filter(is_active=True).prefetch_related('technologies')
+    return ProjectListSerializer(queryset, many=True).data
+
+
+def row_projects():
+    return PROJECT_LIST_ROWS.to_data(PROJECT_LIST_ROWS.rows(Project.objects.filter(is_active=True)))
+
+
+def drf_experience():
+    return ExperienceSerializer(Experience.objects.filter(is_active=True), many=True).data
+
+
+def row_experience():
+    return EXPERIENCE_ROWS.to_data(EXPERIENCE_ROWS.rows(Experience.objects.filter(is_active=True)))
+
+
+class Command(BaseCommand):
+    help = "Compare serialization throughput of the DRF serializers and the values()-based row serializers"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10,1000,100000', help="Comma-separated row counts")
+        parser.add_argument('--repeat', type=int, default=3, help="Runs per measurement; the best one is reported")
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options['sizes'].split(','))
+        rows = []
+        with scratch_database():
+            technologies = Technology.objects.bulk_create(
+                Technology(name=f'Tech {i}', icon_url=f'https://example.com/{i}.svg', order=i) for i in range(12)
+            )
+            for size in sizes:
+                populate(size, technologies)
+                for endpoint, drf, fast in (('projects', drf_projects, row_projects), ('experience', drf_experience, row_experience)):
+                    drf_rate = self.rate(drf, size, options['repeat'])
+                    fast_rate = self.rate(fast, size, options['repeat'])
+                    rows.append([endpoint, size, round(drf_rate), round(fast_rate), fast_rate / drf_rate])
+        self.stdout.write(format_table(['endpoint', 'rows', 'drf_rows_per_s', 'values_rows_per_s', 'speedup'], rows))
+
+    def rate(self, serialize, size, repeat):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            data = serialize()
+            best = min(best, time.perf_counter() - start)
+        assert len(data) == size
+        return size / best
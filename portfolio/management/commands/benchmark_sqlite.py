@@ -0,0 +1,190 @@
+import json
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import connection, connections
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from portfolio.benchmarks import format_table, scratch_database, summarize
+
+from .benchmark_asgi import UNCACHED, read_urls, wsgi_environ
+from .benchmark_endpoints import SCALES, clear_caches, seed_dataset
+
+
+# Connection settings replaced for the "before" run: Django's SQLite defaults
+BASELINE = {
+    'CONN_MAX_AGE': 0,
+    'CONN_HEALTH_CHECKS': False,
+    'OPTIONS': {},
+}
+
+# name -> (DATABASES['default'] overrides, PORTFOLIO_SQLITE overrides)
+VARIANTS = {
+    'baseline': (BASELINE, {'ENABLED': False}),
+    'tuned': ({}, {}),
+}
+
+
+@contextmanager
+def database_variant(name):
+    """Apply a variant to the default connection's settings, which new connections read"""
+    overrides, sqlite = VARIANTS[name]
+    settings_dict = connection.settings_dict
+    saved = {key: settings_dict[key] for key in overrides}
+    settings_dict.update(overrides)
+    try:
+        with override_settings(PORTFOLIO_SQLITE={**getattr(settings, 'PORTFOLIO_SQLITE', {}), **sqlite}):
+            yield
+    finally:
+        settings_dict.update(saved)
+
+
+def write_requests(count, seed=0):
+    """
+    Contact form submissions and skills edits, the two kinds of write that
+    overlap in practice.  The edit reads before it writes, as admin saves do.
+    """
+    rng = random.Random(seed)
+    requests = []
+    for i in range(count):
+        if i % 2:
+            body = {'name': 'Load', 'email': f'load{i}@example.com', 'subject': f'Load {i}', 'message': 'Benchmark message'}
+            requests.append(('POST', reverse('send-message'), body))
+        else:
+            technical = [{'name': f'Skill {n}', 'level': rng.randint(1, 100), 'order': n} for n in range(20)]
+            requests.append(('PUT', reverse('skills'), {'technical': technical}))
+    return requests
+
+
+def run_mixed(application, operations, concurrency):
+    """Latency samples (ms) per kind, elapsed seconds and failed requests, on a threaded WSGI server"""
+    samples = {'read': [], 'write': []}
+    errors = []
+
+    def send(method, url, data):
+        body = json.dumps(data).encode() if data is not None else b''
+        environ = wsgi_environ(url, method, body, 'application/json' if data is not None else None)
+        statuses = []
+        start = time.perf_counter()
+        response = application(environ, lambda status, headers: statuses.append(status))
+        try:
+            b''.join(response)
+        finally:
+            response.close()
+        samples['read' if method == 'GET' else 'write'].append((time.perf_counter() - start) * 1000)
+        if int(statuses[0].split()[0]) >= 400:
+            errors.append(f'{method} {url}: {statuses[0]}')
+
+    barrier = threading.Barrier(concurrency)
+
+    def close_connections():
+        barrier.wait()
+        connections.close_all()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(send, *operation) for operation in operations]:
+            future.result()
+        elapsed = time.perf_counter() - start
+        for future in [executor.submit(close_connections) for _ in range(concurrency)]:
+            future.result()
+    return samples, elapsed, errors
+
+
+def run_benchmarks(scale, variants, requests, concurrency, write_ratio):
+    """{variant: result}; every variant gets a fresh database file, since the journal mode persists in it"""
+    report = {}
+    # Before silencing the request logger: django.setup() reconfigures logging
+    application = get_wsgi_application()
+    # Failures are counted in the report; their tracebacks would bury it
+    request_logger = logging.getLogger('django.request')
+    level = request_logger.level
+    request_logger.setLevel(logging.CRITICAL)
+    try:
+        for name in variants:
+            with database_variant(name), scratch_database():
+                project_pk = seed_dataset(scale)
+                # Writes spread evenly through the reads
+                every = max(1, round(1 / write_ratio))
+                writes = iter(write_requests(requests // every))
+                reads = [('GET', url, None) for url in read_urls(project_pk)]
+                operations = [
+                    next(writes) if i % every == every - 1 else reads[i % len(reads)] for i in range(requests)
+                ]
+                with override_settings(
+                    REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}}, **UNCACHED,
+                ):
+                    clear_caches()
+                    samples, elapsed, errors = run_mixed(application, operations, concurrency)
+                journal_mode = connection.cursor().execute('PRAGMA journal_mode').fetchone()[0]
+            count = len(samples['read']) + len(samples['write'])
+            report[name] = {
+                'journal_mode': journal_mode,
+                'throughput_rps': count / elapsed,
+                'errors': len(errors),
+                'error_samples': errors[:5],
+                'read': summarize(samples['read']),
+                'write': summarize(samples['write']),
+            }
+    finally:
+        request_logger.setLevel(level)
+        clear_caches()
+    return report
+
+
+class Command(BaseCommand):
+    help = "Compare mixed read/write throughput with Django's SQLite defaults and the tuned connection layer"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', default='small', choices=list(SCALES))
+        parser.add_argument('--variants', default=','.join(VARIANTS), help=f"Comma-separated subset of {', '.join(VARIANTS)}")
+        parser.add_argument('--requests', type=int, default=600, help="Requests per variant")
+        parser.add_argument('--concurrency', type=int, default=8, help="WSGI worker threads")
+        parser.add_argument('--write-ratio', type=float, default=0.2, help="Fraction of requests that write")
+        parser.add_argument('--output', help="Write the JSON report to this path")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("This benchmark needs the SQLite backend")
+        variants = [variant.strip() for variant in options['variants'].split(',') if variant.strip()]
+        unknown = set(variants) - set(VARIANTS)
+        if unknown:
+            raise CommandError(f"Unknown variant(s): {', '.join(sorted(unknown))}")
+        if not 0 < options['write_ratio'] < 1:
+            raise CommandError("--write-ratio must be between 0 and 1")
+
+        with override_settings(PORTFOLIO_OUTBOX={'WORKER': False}, PORTFOLIO_TIMING={'LOG': False}):
+            report = run_benchmarks(
+                options['scale'], variants, options['requests'], options['concurrency'], options['write_ratio'],
+            )
+
+        rows = [
+            [variant, data['journal_mode'], data['throughput_rps'], data['read']['p50_ms'], data['read']['p95_ms'],
+             data['write']['p50_ms'], data['write']['p95_ms'], data['errors']]
+            for variant, data in report.items()
+        ]
+        self.stdout.write(format_table(
+            ['variant', 'journal', 'req/s', 'read p50', 'read p95', 'write p50', 'write p95', 'errors'], rows,
+        ))
+
+        if options['output']:
+            data = {
+                'generated_at': timezone.now().isoformat(),
+                'scale': options['scale'],
+                'requests': options['requests'],
+                'concurrency': options['concurrency'],
+                'write_ratio': options['write_ratio'],
+                'results': report,
+            }
+            with open(options['output'], 'w') as f:
+                json.dump(data, f, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
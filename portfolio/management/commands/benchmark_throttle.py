@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from portfolio.benchmarks import format_table, summarize
+from portfolio.throttling import ContactIPThrottle
+
+
+class Command(BaseCommand):
+    help = "Measure the per-request cost of the sliding-window contact throttle"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20000)
+        parser.add_argument('--clients', default='1,100,10000', help="Comma-separated numbers of distinct client keys")
+
+    def handle(self, *args, **options):
+        throttle = ContactIPThrottle()
+        rows = []
+        for clients in (int(value) for value in options['clients'].split(',')):
+            throttle.get_cache().clear()
+            samples = []
+            rejected = 0
+            for i in range(options['requests']):
+                start = time.perf_counter()
+                allowed, _ = throttle.hit(f'bench-{i % clients}', time.time())
+                samples.append((time.perf_counter() - start) * 1000)
+                rejected += not allowed
+            summary = summarize(samples)
+            rows.append([
+                clients, options['requests'], rejected,
+                summary['mean_ms'] * 1000, summary['p50_ms'] * 1000, summary['p99_ms'] * 1000,
+            ])
+        throttle.get_cache().clear()
+        self.stdout.write(format_table(['clients', 'requests', 'rejected', 'mean_us', 'p50_us', 'p99_us'], rows))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from portfolio.bundle import CSS_SOURCES, JS_SOURCES, build, frontend_dir
+
+
+class Command(BaseCommand):
+    help = "Bundle, purge and minify the frontend into content-hashed files with a manifest"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tailwind-css', help="Prebuilt Tailwind stylesheet to purge into the bundle instead of loading the CDN runtime")
+        parser.add_argument('--no-compress', action='store_true', help="Skip the .gz variants")
+
+    def handle(self, *args, **options):
+        root = frontend_dir()
+        manifest = build(tailwind_css=options['tailwind_css'], compress=not options['no_compress'])
+        for key, sources in (('css', CSS_SOURCES), ('js', JS_SOURCES)):
+            before = sum((root / name).stat().st_size for name in sources)
+            self.stdout.write(f"{manifest[key]}: {before} -> {manifest['sizes'][key]} bytes")
+        if not manifest['tailwind']:
+            self.stdout.write("Tailwind is still loaded from the CDN; pass --tailwind-css to bundle it")
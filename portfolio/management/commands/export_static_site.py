@@ -0,0 +1,32 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from portfolio.export import StaticSiteExporter
+
+
+class Command(BaseCommand):
+    help = "Prerender the portfolio and its API responses into a directory of static files"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default=str(Path(settings.BASE_DIR) / 'static_site'),
+            help="Output directory (default: BASE_DIR/static_site)",
+        )
+        parser.add_argument(
+            '--incremental', action='store_true',
+            help="Only rewrite artifacts whose source content changed since the last export",
+        )
+        parser.add_argument('--no-gzip', action='store_true', help="Skip the precompressed .gz siblings")
+
+    def handle(self, *args, **options):
+        exporter = StaticSiteExporter(
+            options['output'], incremental=options['incremental'], compress=not options['no_gzip']
+        )
+        result = exporter.export()
+        for name in result['written']:
+            self.stdout.write(f"  wrote {name}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Exported to {options['output']}: {len(result['written'])} written, {len(result['skipped'])} unchanged"
+        ))
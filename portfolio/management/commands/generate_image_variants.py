@@ -0,0 +1,47 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from portfolio.images import IMAGE_FIELDS, generate_variants, needs_variants, store_variants
+
+
+class Command(BaseCommand):
+    help = "Generate responsive derivatives for existing profile and project images"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Worker processes (default: one per core)")
+        parser.add_argument('--force', action='store_true', help="Regenerate even when the derivatives are up to date")
+
+    def handle(self, *args, **options):
+        jobs = []
+        for label, (image_field, _) in IMAGE_FIELDS.items():
+            model = apps.get_model(label)
+            for instance in model.objects.exclude(**{image_field: ''}).exclude(**{f'{image_field}__isnull': True}):
+                if options['force'] or needs_variants(instance):
+                    jobs.append((model, instance.pk, getattr(instance, image_field).name))
+
+        if not jobs:
+            self.stdout.write("All image variants are up to date")
+            return
+
+        # Workers only resize and write files; the database is updated here
+        connections.close_all()
+        generated = failed = 0
+        with ProcessPoolExecutor(max_workers=max(1, options['workers']), initializer=django.setup) as executor:
+            futures = {executor.submit(generate_variants, source): (model, pk, source) for model, pk, source in jobs}
+            for future in as_completed(futures):
+                model, pk, source = futures[future]
+                try:
+                    variants = future.result()
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f"{source}: {exc}")
+                    continue
+                if store_variants(model, pk, source, variants):
+                    generated += 1
+                    self.stdout.write(f"{source}: {len(variants)} variant(s)")
+        self.stdout.write(f"Processed {generated} image(s), {failed} failed")
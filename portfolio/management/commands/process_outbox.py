@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from portfolio.outbox import deliver_batch, get_setting
+
+
+class Command(BaseCommand):
+    help = "Deliver queued contact notification emails"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help="Emails per SMTP connection")
+        parser.add_argument('--loop', action='store_true', help="Keep polling instead of exiting when the outbox is empty")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds between polls with --loop")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size'] or get_setting('BATCH_SIZE')
+        totals = {'sent': 0, 'failed': 0}
+        while True:
+            result = deliver_batch(batch_size)
+            for key in totals:
+                totals[key] += result[key]
+            if result['sent'] or result['failed']:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(f"Sent {totals['sent']} email(s), {totals['failed']} failed")
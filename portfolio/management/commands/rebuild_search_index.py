@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router
+
+from portfolio import cache, search
+from portfolio.models import Project
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index from the active portfolio content"
+
+    def handle(self, *args, **options):
+        if not search.is_available(connections[router.db_for_write(Project)]):
+            raise CommandError("Search needs the SQLite backend and PORTFOLIO_SEARCH['ENABLED']")
+        start = time.perf_counter()
+        counts = search.rebuild()
+        elapsed = time.perf_counter() - start
+        # Cached search responses are keyed on the Project version among others
+        cache.invalidate('Project')
+        for kind, count in counts.items():
+            self.stdout.write(f"{kind}: {count} document(s)")
+        self.stdout.write(f"Indexed {sum(counts.values())} document(s) in {elapsed:.2f}s")
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from portfolio import snapshot
+
+
+class Command(BaseCommand):
+    help = "Render every public API response variant into the portfolio snapshot"
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        result = snapshot.rebuild()
+        elapsed = time.perf_counter() - start
+        if not result['origins']:
+            raise CommandError("No origins to render for: set PORTFOLIO_SNAPSHOT['ORIGINS']")
+        if result['version'] is None:
+            raise CommandError(f"The content kept changing during {result['attempts']} render(s); nothing was published")
+        self.stdout.write(
+            f"Published version {result['version']}: {result['rows']} response(s) for "
+            f"{', '.join(result['origins'])} in {elapsed:.2f}s"
+        )
@@ -0,0 +1,287 @@
+import asyncio
+import json
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from asgiref.sync import sync_to_async
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import AsyncClient, Client
+from django.urls import Resolver404, resolve
+from django.utils import timezone
+
+from portfolio.benchmarks import format_table, summarize
+
+
+# runserver's access lines:
+# INFO 2025-09-22 17:07:58,149 basehttp 23572 19496 "GET /api/profile/ HTTP/1.1" 200 1156
+ACCESS_LINE_RE = re.compile(
+    r'^\w+ (?P<time>\d{4}-\d\d-\d\d \d\d:\d\d:\d\d,\d{3}) basehttp .*?'
+    r'"(?P<method>[A-Z]+) (?P<path>\S+) HTTP/[\d.]+" (?P<status>\d{3}) '
+)
+
+# The log has no request bodies, so only these can be replayed faithfully
+REPLAYABLE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def parse_access_log(lines, prefixes=('/api/',)):
+    """[(offset_seconds, method, path)] for the replayable access lines, in log order"""
+    entries = []
+    start = None
+    for line in lines:
+        match = ACCESS_LINE_RE.match(line)
+        if not match or match['method'] not in REPLAYABLE_METHODS or not match['path'].startswith(tuple(prefixes)):
+            continue
+        moment = datetime.strptime(match['time'], '%Y-%m-%d %H:%M:%S,%f')
+        if start is None:
+            start = moment
+        entries.append(((moment - start).total_seconds(), match['method'], match['path']))
+    return entries
+
+
+def schedule(entries, rate, max_gap, repeat=1):
+    """
+    Send times relative to the start of the replay: the log's own spacing
+    divided by ``rate``, with idle gaps longer than ``max_gap`` seconds
+    shortened to it.  A rate of 0 sends everything at once.
+    """
+    scheduled = []
+    clock = 0.0
+    for _ in range(repeat):
+        previous = None
+        for offset, method, path in entries:
+            if previous is not None and rate:
+                clock += min(offset - previous, max_gap) / rate
+            previous = offset
+            scheduled.append((clock, method, path))
+    return scheduled
+
+
+def request_headers(method, origin):
+    """Logged OPTIONS requests are the browser's CORS preflights, so send them as such"""
+    if method == 'OPTIONS':
+        return {'Origin': origin, 'Access-Control-Request-Method': 'GET'}
+    return {}
+
+
+def route_name(path):
+    path = urlsplit(path).path
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return path
+    return match.url_name or path
+
+
+class Results:
+    """Thread-safe collection of (route, method, status, latency_ms) samples"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = []
+
+    def add(self, method, path, status, latency_ms):
+        with self._lock:
+            self.samples.append((route_name(path), method, status, latency_ms))
+
+    def report(self, elapsed):
+        routes = {}
+        for route, method, status, latency_ms in self.samples:
+            routes.setdefault(f'{method} {route}', []).append((status, latency_ms))
+        report = {}
+        for name, samples in sorted(routes.items()):
+            # A status of None is a request that never got a response
+            errors = sum(1 for status, _ in samples if status is None or status >= 400)
+            report[name] = dict(
+                summarize([latency for _, latency in samples]),
+                throughput_rps=len(samples) / elapsed if elapsed else 0.0,
+                errors=errors,
+                error_rate=errors / len(samples),
+            )
+        return report
+
+
+def http_send(base_url, method, path, headers):
+    request = urllib.request.Request(base_url + path, headers=headers, method=method)
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as exc:
+        return exc.code
+
+
+async def http_send_async(base_url, method, path, headers):
+    url = urlsplit(base_url)
+    reader, writer = await asyncio.open_connection(url.hostname, url.port or 80)
+    try:
+        lines = [f'{method} {path} HTTP/1.1', f'Host: {url.netloc}', 'Connection: close']
+        lines += [f'{name}: {value}' for name, value in headers.items()]
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode())
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+def replay_threads(scheduled, target, concurrency, origin, results):
+    """Replay on a thread pool; each request waits for its send time"""
+    local = threading.local()
+
+    def send(at, method, path, started):
+        delay = started + at - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        headers = request_headers(method, origin)
+        start = time.perf_counter()
+        try:
+            if target == 'client':
+                if not hasattr(local, 'client'):
+                    local.client = Client(raise_request_exception=False)
+                status = local.client.generic(method, path, headers=headers).status_code
+            else:
+                status = http_send(target, method, path, headers)
+        except OSError:
+            status = None
+        results.add(method, path, status, (time.perf_counter() - start) * 1000)
+
+    # Each worker thread opens its own database connections. Every close task
+    # waits at the barrier, so each of the ``concurrency`` threads runs one.
+    barrier = threading.Barrier(concurrency)
+
+    def close_connections():
+        barrier.wait()
+        connections.close_all()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(send, at, method, path, started) for at, method, path in scheduled]
+        for future in futures:
+            future.result()
+        for future in [executor.submit(close_connections) for _ in range(concurrency)]:
+            future.result()
+    return time.perf_counter() - started
+
+
+async def replay_asyncio(scheduled, target, concurrency, origin, results):
+    """Replay on one event loop with at most ``concurrency`` requests in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+    client = AsyncClient(raise_request_exception=False) if target == 'client' else None
+    started = time.perf_counter()
+
+    async def send(at, method, path):
+        delay = started + at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        headers = request_headers(method, origin)
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                if client is not None:
+                    status = (await client.generic(method, path, headers=headers)).status_code
+                else:
+                    status = await http_send_async(target, method, path, headers)
+            except (OSError, ValueError, IndexError):
+                status = None
+            results.add(method, path, status, (time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(send(at, method, path) for at, method, path in scheduled))
+    elapsed = time.perf_counter() - started
+    if client is not None:
+        # Sync views ran on asgiref's shared thread, which kept its connections
+        await sync_to_async(connections.close_all)()
+    return elapsed
+
+
+def replay(entries, target='client', concurrency=4, mode='threads', rate=1.0, max_gap=5.0, repeat=1,
+           origin='http://localhost:3000'):
+    """Replay parsed log entries and return ``(report, totals)``"""
+    scheduled = schedule(entries, rate, max_gap, repeat)
+    results = Results()
+    if mode == 'asyncio':
+        elapsed = asyncio.run(replay_asyncio(scheduled, target, concurrency, origin, results))
+    else:
+        elapsed = replay_threads(scheduled, target, concurrency, origin, results)
+    report = results.report(elapsed)
+    requests = len(results.samples)
+    errors = sum(route['errors'] for route in report.values())
+    totals = {
+        'requests': requests,
+        'elapsed_s': elapsed,
+        'throughput_rps': requests / elapsed if elapsed else 0.0,
+        'errors': errors,
+        'error_rate': errors / requests if requests else 0.0,
+    }
+    return report, totals
+
+
+class Command(BaseCommand):
+    help = "Replay the API access lines of a runserver log against this project or a running server"
+
+    def add_arguments(self, parser):
+        parser.add_argument('log', nargs='?', default='django.log', help="Access log to replay (default: django.log)")
+        parser.add_argument(
+            '--target', default='client',
+            help="'client' for the in-process test client, or a base URL such as http://127.0.0.1:8000",
+        )
+        parser.add_argument('--concurrency', type=int, default=4, help="Requests in flight at once")
+        parser.add_argument('--mode', choices=('threads', 'asyncio'), default='threads')
+        parser.add_argument('--rate', type=float, default=1.0, help="Speed-up over the logged timing; 0 sends as fast as possible")
+        parser.add_argument('--max-gap', type=float, default=5.0, help="Longest idle gap in seconds before the rate is applied")
+        parser.add_argument('--repeat', type=int, default=1, help="Replay the log this many times")
+        parser.add_argument('--prefix', action='append', help="Only replay paths under this prefix (default: /api/)")
+        parser.add_argument('--origin', default='http://localhost:3000', help="Origin sent with CORS preflights")
+        parser.add_argument('--output', help="Write the JSON report to this path")
+
+    def handle(self, *args, **options):
+        target = options['target'].rstrip('/')
+        if target != 'client' and urlsplit(target).scheme != 'http':
+            raise CommandError("--target must be 'client' or an http:// URL")
+        if options['concurrency'] < 1 or options['rate'] < 0 or options['repeat'] < 1:
+            raise CommandError("--concurrency and --repeat must be positive and --rate not negative")
+        try:
+            with open(options['log'], encoding='utf-8', errors='replace') as f:
+                entries = parse_access_log(f, options['prefix'] or ('/api/',))
+        except OSError as exc:
+            raise CommandError(f"Cannot read {options['log']}: {exc}")
+        if not entries:
+            raise CommandError(f"No replayable requests in {options['log']}")
+
+        report, totals = replay(
+            entries, target, options['concurrency'], options['mode'], options['rate'], options['max_gap'], options['repeat'],
+            options['origin'],
+        )
+
+        rows = [
+            [name, data['count'], data['throughput_rps'], data['p50_ms'], data['p95_ms'], data['p99_ms'], f"{data['error_rate']:.1%}"]
+            for name, data in report.items()
+        ]
+        self.stdout.write(format_table(['route', 'requests', 'req/s', 'p50', 'p95', 'p99', 'errors'], rows))
+        self.stdout.write(
+            f"{totals['requests']} requests in {totals['elapsed_s']:.2f}s "
+            f"({totals['throughput_rps']:.1f} req/s, {totals['error_rate']:.1%} errors)"
+        )
+
+        if options['output']:
+            data = {
+                'generated_at': timezone.now().isoformat(),
+                'log': options['log'],
+                'target': target,
+                'mode': options['mode'],
+                'concurrency': options['concurrency'],
+                'rate': options['rate'],
+                'repeat': options['repeat'],
+                'totals': totals,
+                'routes': report,
+            }
+            with open(options['output'], 'w') as f:
+                json.dump(data, f, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
@@ -0,0 +1,130 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from portfolio import cache, search
+from portfolio.models import (
+    Profile, TechnicalSkill, ProfessionalSkill, Technology,
+    Project, Experience
+)
+
+
+DEFAULT_PROFILE = [
+    {
+        'name': "Your Name",
+        'title': "Full Stack Developer",
+        'intro': "Building digital experiences that matter. Passionate about solving problems through code.",
+        'about_journey': "I began my coding journey when I discovered my passion for building things with code.",
+        'about_interests': "When I'm not coding, you'll find me exploring new technologies.",
+        'email': "your.email@example.com",
+        'location': "City, Country",
+        'experience_years': "3+ Years",
+    },
+]
+
+DEFAULT_TECHNICAL_SKILLS = [
+    {'name': 'JavaScript', 'level': 90, 'category': 'Programming'},
+    {'name': 'React', 'level': 85, 'category': 'Frontend'},
+    {'name': 'Python', 'level': 80, 'category': 'Programming'},
+    {'name': 'Django', 'level': 75, 'category': 'Backend'},
+    {'name': 'PostgreSQL', 'level': 70, 'category': 'Database'},
+]
+
+DEFAULT_PROFESSIONAL_SKILLS = [
+    {'name': 'Communication', 'icon': 'message-square', 'description': 'Effective verbal and written communication skills'},
+    {'name': 'Teamwork', 'icon': 'users', 'description': 'Collaborative team player with strong interpersonal skills'},
+    {'name': 'Problem Solving', 'icon': 'brain', 'description': 'Analytical thinking and creative problem resolution'},
+    {'name': 'Time Management', 'icon': 'clock', 'description': 'Efficient task prioritization and deadline management'},
+]
+
+DEFAULT_TECHNOLOGIES = [
+    {'name': 'React', 'icon_url': 'https://cdn.jsdelivr.net/gh/devicons/devicon/icons/react/react-original.svg', 'category': 'Frontend'},
+    {'name': 'Django', 'icon_url': 'https://cdn.jsdelivr.net/gh/devicons/devicon/icons/django/django-plain.svg', 'category': 'Backend'},
+    {'name': 'Python', 'icon_url': 'https://cdn.jsdelivr.net/gh/devicons/devicon/icons/python/python-original.svg', 'category': 'Programming'},
+    {'name': 'JavaScript', 'icon_url': 'https://cdn.jsdelivr.net/gh/devicons/devicon/icons/javascript/javascript-original.svg', 'category': 'Programming'},
+    {'name': 'PostgreSQL', 'icon_url': 'https://cdn.jsdelivr.net/gh/devicons/devicon/icons/postgresql/postgresql-original.svg', 'category': 'Database'},
+    {'name': 'Git', 'icon_url': 'https://cdn.jsdelivr.net/gh/devicons/devicon/icons/git/git-original.svg', 'category': 'Tools'},
+]
+
+DEFAULT_PROJECTS = [
+    {
+        'title': 'E-commerce Platform',
+        'description': 'A full-featured e-commerce platform with payment integration and admin dashboard.',
+        'github_url': 'https://github.com/yourusername/ecommerce-platform',
+        'live_url': 'https://your-ecommerce-demo.com',
+        'is_featured': True,
+    },
+    {
+        'title': 'Task Management App',
+        'description': 'A collaborative task management application with real-time updates.',
+        'github_url': 'https://github.com/yourusername/task-manager',
+        'live_url': 'https://your-task-app.com',
+        'is_featured': True,
+    },
+    {
+        'title': 'Portfolio Website',
+        'description': 'A responsive portfolio website showcasing my work and skills.',
+        'github_url': 'https://github.com/yourusername/portfolio',
+        'live_url': 'https://your-portfolio.com',
+        'is_featured': True,
+    },
+]
+
+DEFAULT_EXPERIENCE = [
+    {
+        'title': 'Senior Developer',
+        'company': 'Tech Company Inc.',
+        'start_date': date(2020, 1, 1),
+        'is_current': True,
+        'description': 'Led a team of developers in building scalable web applications. Implemented CI/CD pipelines and mentored junior developers.',
+        'experience_type': 'work',
+    },
+    {
+        'title': 'Frontend Developer',
+        'company': 'Digital Agency',
+        'start_date': date(2018, 1, 1),
+        'end_date': date(2020, 12, 31),
+        'description': 'Developed responsive web applications using React and Vue.js. Collaborated with designers to implement UI/UX best practices.',
+        'experience_type': 'work',
+    },
+    {
+        'title': 'Computer Science Degree',
+        'company': 'University Name',
+        'start_date': date(2014, 9, 1),
+        'end_date': date(2018, 6, 30),
+        'description': 'Specialized in software engineering and web development. Completed coursework in algorithms, databases, and human-computer interaction.',
+        'experience_type': 'education',
+    },
+]
+
+DEFAULTS = [
+    (Profile, DEFAULT_PROFILE),
+    (TechnicalSkill, DEFAULT_TECHNICAL_SKILLS),
+    (ProfessionalSkill, DEFAULT_PROFESSIONAL_SKILLS),
+    (Technology, DEFAULT_TECHNOLOGIES),
+    (Project, DEFAULT_PROJECTS),
+    (Experience, DEFAULT_EXPERIENCE),
+]
+
+
+class Command(BaseCommand):
+    help = "Create the default portfolio content for every section that is still empty"
+
+    def handle(self, *args, **options):
+        seeded = []
+        with transaction.atomic():
+            for model, rows in DEFAULTS:
+                if model.objects.exists():
+                    continue
+                created = model.objects.bulk_create(model(**row) for row in rows)
+                seeded.append(model)
+                # bulk_create sends no signals, so index the new rows explicitly
+                search.index_objects(model, [obj.pk for obj in created])
+            # and drop cached responses
+            transaction.on_commit(lambda: cache.invalidate(*(model.__name__ for model in seeded)))
+
+        for model in seeded:
+            self.stdout.write(f"Seeded {model._meta.verbose_name_plural}")
+        if not seeded:
+            self.stdout.write("Nothing to seed, every section already has content")
@@ -0,0 +1,181 @@
+"""
+Serve uploaded files from ``MEDIA_ROOT``.
+
+Responses carry an ETag and Last-Modified derived from the file's stat (so
+no file content is read to validate), answer conditional requests with 304
+and single byte ranges with 206.  When a front proxy is configured through
+``PORTFOLIO_MEDIA['SENDFILE_HEADER']`` the body is left to the proxy
+(``X-Accel-Redirect`` for nginx, ``X-Sendfile`` for Apache/lighttpd), which
+then also handles ranges.  URLs built with ``media_url`` carry a ``?v=``
+version and are cached as immutable while it names the file as it is;
+any other ``v`` gets the revalidating headers.
+"""
+import mimetypes
+import os
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotAllowed
+from django.urls import reverse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+
+
+DEFAULTS = {
+    # 'X-Accel-Redirect' or 'X-Sendfile'; None streams from Django
+    'SENDFILE_HEADER': None,
+    # X-Accel-Redirect only: the internal nginx location aliased to MEDIA_ROOT
+    'SENDFILE_URL': '/protected-media/',
+    'MAX_AGE': 60 * 60,
+    'IMMUTABLE_MAX_AGE': 365 * 24 * 60 * 60,
+}
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+# Responses that carry (or confirm) the file itself
+IMMUTABLE_STATUSES = (200, 206, 304)
+
+
+def get_setting(name):
+    return getattr(settings, 'PORTFOLIO_MEDIA', {}).get(name, DEFAULTS[name])
+
+
+def file_etag(st):
+    return f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+
+def file_version(st):
+    return f'{st.st_mtime_ns:x}{st.st_size:x}'
+
+
+def media_url(name):
+    """URL of a stored file with a version that changes whenever the file does"""
+    url = reverse('media', kwargs={'path': name})
+    try:
+        st = os.stat(safe_join(settings.MEDIA_ROOT, name))
+    except (OSError, SuspiciousFileOperation):
+        return url
+    return f'{url}?v={file_version(st)}'
+
+
+def parse_range(header, size):
+    """
+    ``(start, end)`` (inclusive) for a single satisfiable byte range, None to
+    ignore the header, or False when it cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        # Multiple ranges and other units are allowed to fall back to 200
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if last and int(last) < start:
+            return None
+    else:
+        start, end = max(size - int(last), 0), size - 1
+        if int(last) == 0:
+            return False
+    if start >= size:
+        return False
+    return start, end
+
+
+def if_range_matches(request, etag, mtime):
+    """True when the If-Range validator still identifies the current file"""
+    validator = request.META.get('HTTP_IF_RANGE')
+    if validator is None:
+        return True
+    if validator.startswith('"') or validator.startswith('W/'):
+        return validator == etag
+    return parse_http_date_safe(validator) == int(mtime)
+
+
+class RangeFile:
+    """Read at most ``length`` bytes of ``file`` starting at ``start``"""
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.file.seek(start)
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def serve_media(request, path):
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponseNotAllowed(['GET', 'HEAD'])
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+        st = os.stat(fullpath)
+    except (OSError, SuspiciousFileOperation):
+        raise Http404("File not found")
+    if not stat.S_ISREG(st.st_mode):
+        raise Http404("File not found")
+
+    etag = file_etag(st)
+    response = get_conditional_response(request, etag=etag, last_modified=int(st.st_mtime))
+    if response is None:
+        response = file_response(request, path, fullpath, st, etag)
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(st.st_mtime)
+    # A stale or made-up version must not pin the current file in caches,
+    # nor a failed range request the error
+    if response.status_code in IMMUTABLE_STATUSES and request.GET.get('v') == file_version(st):
+        patch_cache_control(response, public=True, max_age=get_setting('IMMUTABLE_MAX_AGE'), immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=get_setting('MAX_AGE'))
+    return response
+
+
+def file_response(request, path, fullpath, st, etag):
+    content_type, encoding = mimetypes.guess_type(fullpath)
+    if content_type is None or encoding:
+        # Never let a client transparently decompress an uploaded archive
+        content_type = 'application/octet-stream'
+
+    header = get_setting('SENDFILE_HEADER')
+    if header:
+        response = HttpResponse(content_type=content_type)
+        if header.lower() == 'x-accel-redirect':
+            response[header] = get_setting('SENDFILE_URL').rstrip('/') + '/' + quote(path)
+        else:
+            response[header] = fullpath
+        return response
+
+    size = st.st_size
+    byte_range = None
+    if 'HTTP_RANGE' in request.META and if_range_matches(request, etag, st.st_mtime):
+        byte_range = parse_range(request.META['HTTP_RANGE'], size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    file = open(fullpath, 'rb')
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+        response['Content-Length'] = str(size)
+    else:
+        start, end = byte_range
+        response = FileResponse(RangeFile(file, start, end - start + 1), content_type=content_type, status=206)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+    response['Accept-Ranges'] = 'bytes'
+    return response
@@ -0,0 +1,343 @@
+"""
+Aggregate metrics for the portfolio API in the Prometheus text format.
+
+Each process keeps its counters and histograms in memory; an update is a
+dictionary increment under one short lock.  With several worker processes
+set ``PORTFOLIO_METRICS['DIRECTORY']`` to a directory shared by them: every
+process then snapshots its values to its own file there (atomically, at
+most once per ``FLUSH_SECONDS``, and once more that long after the last
+update, so an idle worker's file is current too) and the metrics view sums
+the files there, so whichever worker answers the scrape reports the whole
+server.  The file of a process that has exited is folded into one
+aggregate file, as prometheus_client's multiprocess mode does, so the
+counters never go backwards when a worker is recycled; the directory has
+to be local to the workers' host.
+
+Scrapers authenticate with ``Authorization: Bearer <TOKEN>``.  Addresses
+in ``ALLOWED_NETWORKS`` are let in without it, which is only safe when
+``REMOTE_ADDR`` is the client's own: behind a proxy on the same host every
+request comes from the loopback address.
+"""
+import atexit
+import hmac
+import ipaddress
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+
+try:
+    import fcntl
+except ImportError:
+    # Windows, where no process is ever found dead (see process_alive)
+    fcntl = None
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    'DIRECTORY': None,
+    'FLUSH_SECONDS': 1.0,
+    # Bearer token that lets a scraper read /metrics; None lets nobody in by token
+    'TOKEN': None,
+    # Networks allowed to read /metrics without the token; REMOTE_ADDR is used as is
+    'ALLOWED_NETWORKS': (),
+}
+
+PROCESS_FILE_RE = re.compile(r'metrics-(\d+)\.json')
+# The summed values of the processes that have exited
+AGGREGATE_FILE = 'metrics-aggregate.json'
+LOCK_FILE = 'metrics.lock'
+
+# name -> (type, help, histogram buckets)
+METRICS = {
+    'portfolio_http_requests_total': ('counter', "API requests by endpoint, method and status", None),
+    'portfolio_http_errors_total': ('counter', "API responses with a 5xx status", None),
+    'portfolio_http_request_duration_seconds': (
+        'histogram', "API request latency", (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+    ),
+    'portfolio_db_queries_per_request': (
+        'histogram', "Database queries per API request", (0, 1, 2, 3, 5, 8, 13, 21, 34),
+    ),
+    'portfolio_contact_messages_total': ('counter', "Contact form submissions by outcome", None),
+    'portfolio_throttled_requests_total': ('counter', "Requests rejected by a throttle, by scope", None),
+    'portfolio_outbox_emails_total': ('counter', "Outbox delivery attempts by outcome", None),
+    'portfolio_snapshot_rebuilds_total': ('counter', "Snapshot rebuilds by outcome", None),
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'PORTFOLIO_METRICS', {}).get(name, DEFAULTS[name])
+
+
+def label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def process_alive(pid):
+    if pid == os.getpid() or os.name != 'posix':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Alive, under another user
+        pass
+    return True
+
+
+def read_snapshot(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_snapshot(path, data):
+    """Replace ``path`` atomically, so readers never see half a file"""
+    tmp = f'{path}.{threading.get_ident()}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+@contextmanager
+def directory_lock(directory):
+    """Serialise folding files into the aggregate with reading them"""
+    with open(os.path.join(directory, LOCK_FILE), 'a') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        # (name, labels) -> [bucket counts..., +Inf count, sum]
+        self._histograms = {}
+        self._last_flush = 0.0
+        self._dirty = False
+        self._timer = None
+        # The process whose file this registry has written to
+        self._file_pid = None
+
+    def inc(self, name, amount=1, **labels):
+        if not get_setting('ENABLED'):
+            return
+        key = (name, label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+            self._dirty = True
+        self.maybe_flush()
+
+    def observe(self, name, value, **labels):
+        if not get_setting('ENABLED'):
+            return
+        buckets = METRICS[name][2]
+        index = bisect_left(buckets, value)
+        key = (name, label_key(labels))
+        with self._lock:
+            values = self._histograms.get(key)
+            if values is None:
+                values = self._histograms[key] = [0] * (len(buckets) + 1) + [0.0]
+            values[index] += 1
+            values[-1] += value
+            self._dirty = True
+        self.maybe_flush()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'counters': [[name, labels, value] for (name, labels), value in self._counters.items()],
+                'histograms': [[name, labels, list(values)] for (name, labels), values in self._histograms.items()],
+            }
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self._dirty = False
+
+    def process_file(self):
+        directory = get_setting('DIRECTORY')
+        return os.path.join(directory, f'metrics-{os.getpid()}.json') if directory else None
+
+    def maybe_flush(self):
+        if not get_setting('DIRECTORY'):
+            return
+        delay = self._last_flush + get_setting('FLUSH_SECONDS') - time.monotonic()
+        if delay <= 0:
+            self.flush()
+            return
+        # The updates until then are written even if no other one follows
+        with self._lock:
+            if self._timer is None:
+                self._timer = threading.Timer(delay, self.timed_flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def timed_flush(self):
+        with self._lock:
+            self._timer = None
+        self.flush()
+
+    def flush(self):
+        path = self.process_file()
+        if path is None or not self._dirty:
+            return
+        self._last_flush = time.monotonic()
+        self._dirty = False
+        if self._file_pid != os.getpid():
+            # The file of an exited process that had this process id
+            directory = os.path.dirname(path)
+            with directory_lock(directory):
+                if os.path.exists(path):
+                    fold(os.path.join(directory, AGGREGATE_FILE), path)
+            self._file_pid = os.getpid()
+        write_snapshot(path, self.snapshot())
+
+    def collect(self):
+        """Snapshots of every process sharing the directory, or of this one"""
+        directory = get_setting('DIRECTORY')
+        if not directory:
+            return [self.snapshot()]
+        self.flush()
+        aggregate = os.path.join(directory, AGGREGATE_FILE)
+        with directory_lock(directory):
+            paths = [aggregate]
+            for name in os.listdir(directory):
+                match = PROCESS_FILE_RE.fullmatch(name)
+                if not match:
+                    continue
+                path = os.path.join(directory, name)
+                if process_alive(int(match[1])):
+                    paths.append(path)
+                    continue
+                try:
+                    fold(aggregate, path)
+                except (OSError, ValueError):
+                    continue
+            snapshots = []
+            for path in paths:
+                try:
+                    snapshots.append(read_snapshot(path))
+                except (OSError, ValueError):
+                    continue
+        return snapshots
+
+
+def fold(aggregate, path):
+    """Add the values of an exited process's file to the aggregate file and remove it"""
+    snapshots = [read_snapshot(path)]
+    if os.path.exists(aggregate):
+        snapshots.append(read_snapshot(aggregate))
+    write_snapshot(aggregate, as_snapshot(*merge(snapshots)))
+    os.remove(path)
+
+
+registry = Registry()
+atexit.register(registry.flush)
+
+
+def inc(name, amount=1, **labels):
+    registry.inc(name, amount, **labels)
+
+
+def observe(name, value, **labels):
+    registry.observe(name, value, **labels)
+
+
+def observe_request(metrics):
+    """Record one API request from the timing middleware's measurements"""
+    labels = {'endpoint': metrics['endpoint'] or 'unknown'}
+    inc('portfolio_http_requests_total', method=metrics['method'], status=str(metrics['status']), **labels)
+    if metrics['status'] >= 500:
+        inc('portfolio_http_errors_total', **labels)
+    observe('portfolio_http_request_duration_seconds', metrics['total_ms'] / 1000, **labels)
+    observe('portfolio_db_queries_per_request', metrics['queries'], **labels)
+
+
+def format_labels(labels, extra=()):
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"') for _, value in pairs)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + '}'
+
+
+def format_number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def merge(snapshots):
+    """The summed counters and histograms of process snapshots"""
+    counters, histograms = {}, {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot['counters']:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, values in snapshot['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            merged = histograms.setdefault(key, [0] * len(values))
+            for i, value in enumerate(values):
+                merged[i] += value
+    return counters, histograms
+
+
+def as_snapshot(counters, histograms):
+    return {
+        'counters': [[name, labels, value] for (name, labels), value in counters.items()],
+        'histograms': [[name, labels, values] for (name, labels), values in histograms.items()],
+    }
+
+
+def render(snapshots):
+    """Merge process snapshots and render the Prometheus text exposition format"""
+    counters, histograms = merge(snapshots)
+
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        if kind == 'counter':
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f'{name}{format_labels(labels)} {format_number(value)}')
+            continue
+        for (metric, labels), values in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, count in zip([*buckets, '+Inf'], values[:-1]):
+                cumulative += count
+                le = bound if bound == '+Inf' else format_number(float(bound))
+                lines.append(f'{name}_bucket{format_labels(labels, [("le", le)])} {cumulative}')
+            lines.append(f'{name}_sum{format_labels(labels)} {format_number(values[-1])}')
+            lines.append(f'{name}_count{format_labels(labels)} {cumulative}')
+    return '\n'.join(lines) + '\n'
+
+
+def has_token(request):
+    token = get_setting('TOKEN')
+    scheme, _, credentials = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+    return bool(token) and scheme.lower() == 'bearer' and hmac.compare_digest(credentials.strip(), token)
+
+
+def is_internal(request):
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    return any(address in ipaddress.ip_network(network) for network in get_setting('ALLOWED_NETWORKS'))
+
+
+def metrics_view(request):
+    # Pretend the endpoint does not exist for everybody else
+    if not get_setting('ENABLED') or not (has_token(request) or is_internal(request)):
+        raise Http404()
+    return HttpResponse(render(registry.collect()), content_type='text/plain; version=0.0.4; charset=utf-8')
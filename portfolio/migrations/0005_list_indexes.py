@@ -0,0 +1,73 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0004_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['-created_at', '-id', 'is_read', 'is_replied'], name='contact_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['-created_at', '-id'], name='contact_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(condition=models.Q(('is_replied', False)), fields=['-created_at', '-id'], name='contact_unreplied_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='experience',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', '-start_date'], name='experience_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='experience',
+            index=models.Index(fields=['order', '-start_date', '-id', 'experience_type', 'is_current', 'is_active'], name='experience_admin_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='outboxemail',
+            index=models.Index(fields=['next_attempt_at', '-id'], name='outbox_admin_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='professionalskill',
+            index=models.Index(fields=['order', 'name', '-id', 'is_active'], name='profskill_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-is_featured', 'order', '-created_at'], name='project_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['-is_featured', 'order', '-created_at', '-id', 'is_active'], name='project_admin_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sociallink',
+            index=models.Index(fields=['order', 'name', '-id', 'is_active'], name='sociallink_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='technicalskill',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', '-level', 'name'], name='techskill_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='technicalskill',
+            index=models.Index(fields=['order', 'name', '-id', 'is_active'], name='techskill_admin_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='technicalskill',
+            index=models.Index(fields=['category'], name='techskill_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='technology',
+            index=models.Index(fields=['order', 'name', '-id', 'is_active'], name='technology_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='technology',
+            index=models.Index(fields=['category'], name='technology_category_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0005_list_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='experience',
+            name='experience_active_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='project',
+            name='project_active_idx',
+        ),
+        migrations.AddIndex(
+            model_name='experience',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', '-start_date', '-id'], name='experience_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-is_featured', 'order', '-created_at', '-id'], name='project_active_idx'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+from django.db import migrations
+
+
+# unicode61 folds case and diacritics; the prefix indexes serve two- and
+# three-character prefix queries without a scan of the term list
+CREATE_TABLE = """
+CREATE VIRTUAL TABLE portfolio_search USING fts5(
+    title, body, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+)
+"""
+
+# model -> (title field, body fields), in the order of search.KINDS, whose
+# positions are part of the rowids
+KINDS = [
+    ('Project', 'title', ('description',)),
+    ('Experience', 'title', ('company', 'location', 'description')),
+    ('TechnicalSkill', 'name', ('category',)),
+    ('ProfessionalSkill', 'name', ('description',)),
+    ('Technology', 'name', ('category',)),
+]
+KIND_STRIDE = 8
+
+
+def create_search_table(apps, schema_editor):
+    # FTS5 is SQLite only; elsewhere search is unavailable (see search.py)
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(CREATE_TABLE)
+        index_content(apps, schema_editor)
+
+
+def index_content(apps, schema_editor):
+    """Index the content the database already has, as search.rebuild() does"""
+    Project = apps.get_model('portfolio', 'Project')
+    technologies = {}
+    pairs = Project.technologies.through.objects.using(schema_editor.connection.alias)
+    for project_pk, name in pairs.values_list('project_id', 'technology__name'):
+        technologies.setdefault(project_pk, []).append(name)
+    with schema_editor.connection.cursor() as cursor:
+        for number, (model_name, title, body) in enumerate(KINDS):
+            model = apps.get_model('portfolio', model_name)
+            rows = model.objects.using(schema_editor.connection.alias).filter(is_active=True).values_list('pk', title, *body)
+            extra = technologies if model_name == 'Project' else {}
+            cursor.executemany('INSERT INTO portfolio_search (rowid, title, body) VALUES (%s, %s, %s)', [
+                (pk * KIND_STRIDE + number, title_value, '\n'.join(value for value in (*body_values, *extra.get(pk, ())) if value))
+                for pk, title_value, *body_values in rows
+            ])
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS portfolio_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0006_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:26
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0007_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PortfolioSnapshot',
+            fields=[
+                ('key', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('origin', models.CharField(max_length=200)),
+                ('endpoint', models.CharField(max_length=50)),
+                ('version', models.PositiveBigIntegerField()),
+                ('fingerprint', models.CharField(max_length=40)),
+                ('status', models.PositiveSmallIntegerField(default=200)),
+                ('content_type', models.CharField(max_length=100)),
+                ('content', models.BinaryField()),
+                ('built_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Portfolio Snapshot',
+                'verbose_name_plural': 'Portfolio Snapshots',
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:38
+
+from django.db import migrations, models
+
+
+def copy_outbox_status(apps, schema_editor):
+    """The state of each message's latest email; blank without one"""
+    ContactMessage = apps.get_model('portfolio', 'ContactMessage')
+    OutboxEmail = apps.get_model('portfolio', 'OutboxEmail')
+    statuses = {'pending': 'pending', 'sending': 'pending', 'sent': 'sent', 'failed': 'failed'}
+    latest = {}
+    for message_pk, status in OutboxEmail.objects.exclude(contact_message=None).order_by('pk').values_list(
+            'contact_message', 'status'):
+        latest[message_pk] = statuses[status]
+    ContactMessage.objects.exclude(pk__in=latest).update(notification_status='')
+    for status in set(latest.values()):
+        pks = [pk for pk, value in latest.items() if value == status]
+        ContactMessage.objects.filter(pk__in=pks).update(notification_status=status)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0008_portfolio_snapshot'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='contactmessage',
+            name='contact_created_idx',
+        ),
+        migrations.AddField(
+            model_name='contactmessage',
+            name='notification_status',
+            field=models.CharField(blank=True, choices=[('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['-created_at', '-id', 'is_read', 'is_replied', 'notification_status'], name='contact_created_idx'),
+        ),
+        migrations.RunPython(copy_outbox_status, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+# The journal mode is stored in the database file, so it is set once here
+# rather than on every connection (see portfolio/database.py)
+def enable_wal(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('PRAGMA journal_mode = wal')
+
+
+def disable_wal(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('PRAGMA journal_mode = delete')
+
+
+class Migration(migrations.Migration):
+    # The journal mode cannot change inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('portfolio', '0009_contactmessage_notification_status'),
+    ]
+
+    operations = [
+        migrations.RunPython(enable_wal, disable_wal),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 class Profile(models.Model):
@@ -13,6 +14,7 @@ class Profile(models.Model):
     location = models.CharField(max_length=100)
     experience_years = models.CharField(max_length=20)
     profile_image = models.ImageField(upload_to='profile/', blank=True, null=True)
+    profile_image_variants = models.JSONField(default=dict, blank=True, editable=False)
     resume_file = models.FileField(upload_to='resume/', blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -41,9 +43,20 @@ class TechnicalSkill(models.Model):
     is_active = models.BooleanField(default=True)
     order = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['order', '-level', 'name']
+        # The API reads active rows in Meta.ordering: SQLite cannot seek on a
+        # bare boolean column, so is_active is the condition of a partial
+        # index. The admin changelist reads all rows in its own ordering plus
+        # -pk; its filter columns trail the sort keys so counts stay in the
+        # index.
+        indexes = [
+            models.Index(fields=['order', '-level', 'name'], condition=models.Q(is_active=True), name='techskill_active_idx'),
+            models.Index(fields=['order', 'name', '-id', 'is_active'], name='techskill_admin_order_idx'),
+            models.Index(fields=['category'], name='techskill_category_idx'),
+        ]
         verbose_name = "Technical Skill"
         verbose_name_plural = "Technical Skills"
     
@@ -59,9 +72,12 @@ class ProfessionalSkill(models.Model):
     is_active = models.BooleanField(default=True)
     order = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['order', 'name']
+        # Meta.ordering plus the -pk the admin changelist appends, then its filter
+        indexes = [models.Index(fields=['order', 'name', '-id', 'is_active'], name='profskill_order_idx')]
         verbose_name = "Professional Skill"
         verbose_name_plural = "Professional Skills"
     
@@ -77,9 +93,14 @@ class Technology(models.Model):
     is_active = models.BooleanField(default=True)
     order = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['order', 'name']
+        indexes = [
+            models.Index(fields=['order', 'name', '-id', 'is_active'], name='technology_order_idx'),
+            models.Index(fields=['category'], name='technology_category_idx'),
+        ]
         verbose_name = "Technology"
         verbose_name_plural = "Technologies"
     
@@ -92,6 +113,7 @@ class Project(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
     image = models.ImageField(upload_to='projects/', blank=True, null=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     github_url = models.URLField(blank=True)
     live_url = models.URLField(blank=True)
     is_featured = models.BooleanField(default=False)
@@ -105,6 +127,15 @@ class Project(models.Model):
     
     class Meta:
         ordering = ['-is_featured', 'order', '-created_at']
+        # The API's keyset pagination (pagination.ProjectPagination) seeks
+        # active rows on Meta.ordering plus -pk
+        indexes = [
+            models.Index(
+                fields=['-is_featured', 'order', '-created_at', '-id'], condition=models.Q(is_active=True),
+                name='project_active_idx',
+            ),
+            models.Index(fields=['-is_featured', 'order', '-created_at', '-id', 'is_active'], name='project_admin_order_idx'),
+        ]
         verbose_name = "Project"
         verbose_name_plural = "Projects"
     
@@ -117,6 +148,17 @@ class Project(models.Model):
         return f"https://images.unsplash.com/photo-1556742049-0cfed4f6a45d?w=640&h=360&fit=crop&seed={self.id}"
 
 
+def format_period(start_date, end_date, is_current):
+    """'2020 - Present', '2018 - 2020' or just the start year"""
+    start = start_date.strftime("%Y")
+    if is_current:
+        return f"{start} - Present"
+    elif end_date:
+        end = end_date.strftime("%Y")
+        return f"{start} - {end}"
+    return start
+
+
 class Experience(models.Model):
     """Work experience and education"""
     EXPERIENCE_TYPES = [
@@ -136,9 +178,17 @@ class Experience(models.Model):
     is_active = models.BooleanField(default=True)
     order = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['order', '-start_date']
+        indexes = [
+            models.Index(fields=['order', '-start_date', '-id'], condition=models.Q(is_active=True), name='experience_active_idx'),
+            models.Index(
+                fields=['order', '-start_date', '-id', 'experience_type', 'is_current', 'is_active'],
+                name='experience_admin_order_idx',
+            ),
+        ]
         verbose_name = "Experience"
         verbose_name_plural = "Experience"
     
@@ -147,13 +197,7 @@ class Experience(models.Model):
     
     @property
     def period(self):
-        start = self.start_date.strftime("%Y")
-        if self.is_current:
-            return f"{start} - Present"
-        elif self.end_date:
-            end = self.end_date.strftime("%Y")
-            return f"{start} - {end}"
-        return start
+        return format_period(self.start_date, self.end_date, self.is_current)
 
 
 class SocialLink(models.Model):
@@ -164,9 +208,11 @@ class SocialLink(models.Model):
     is_active = models.BooleanField(default=True)
     order = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['order', 'name']
+        indexes = [models.Index(fields=['order', 'name', '-id', 'is_active'], name='sociallink_order_idx')]
         verbose_name = "Social Link"
         verbose_name_plural = "Social Links"
     
@@ -176,18 +222,92 @@ class SocialLink(models.Model):
 
 class ContactMessage(models.Model):
     """Contact form messages"""
+    NOTIFICATION_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
     name = models.CharField(max_length=100)
     email = models.EmailField()
     subject = models.CharField(max_length=200)
     message = models.TextField()
     is_read = models.BooleanField(default=False)
     is_replied = models.BooleanField(default=False)
+    # Delivery of the notification email, kept in step by the outbox;
+    # blank for messages from before the outbox
+    notification_status = models.CharField(max_length=10, choices=NOTIFICATION_CHOICES, default='pending', blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         ordering = ['-created_at']
+        # The admin's unread and unreplied filters pick out the few messages
+        # still needing attention, so they get partial indexes of their own
+        indexes = [
+            models.Index(fields=['-created_at', '-id', 'is_read', 'is_replied', 'notification_status'], name='contact_created_idx'),
+            models.Index(fields=['-created_at', '-id'], condition=models.Q(is_read=False), name='contact_unread_idx'),
+            models.Index(fields=['-created_at', '-id'], condition=models.Q(is_replied=False), name='contact_unreplied_idx'),
+        ]
         verbose_name = "Contact Message"
         verbose_name_plural = "Contact Messages"
     
     def __str__(self):
-        return f"Message from {self.name} - {self.subject}"
\ No newline at end of file
+        return f"Message from {self.name} - {self.subject}"
+
+class OutboxEmail(models.Model):
+    """Notification emails waiting to be delivered by the outbox worker"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    contact_message = models.ForeignKey(
+        ContactMessage, on_delete=models.CASCADE, related_name='emails', null=True, blank=True
+    )
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    recipients = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now, help_text="When the worker may (re)try this email")
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['next_attempt_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+            models.Index(fields=['next_attempt_at', '-id'], name='outbox_admin_order_idx'),
+        ]
+        verbose_name = "Outbox Email"
+        verbose_name_plural = "Outbox Emails"
+
+    def __str__(self):
+        return f"{self.subject} ({self.get_status_display()})"
+
+
+class PortfolioSnapshot(models.Model):
+    """A rendered API response, rebuilt with every other variant on content changes (snapshot.py)"""
+    # Origin, path and the query parameters that select the variant
+    key = models.CharField(max_length=255, primary_key=True)
+    origin = models.CharField(max_length=200)
+    endpoint = models.CharField(max_length=50)
+    version = models.PositiveBigIntegerField()
+    # conditional.content_state() fingerprint of the content it was rendered from
+    fingerprint = models.CharField(max_length=40)
+    status = models.PositiveSmallIntegerField(default=200)
+    content_type = models.CharField(max_length=100)
+    content = models.BinaryField()
+    built_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Portfolio Snapshot"
+        verbose_name_plural = "Portfolio Snapshots"
+
+    def __str__(self):
+        return f"{self.key} (version {self.version})"
@@ -0,0 +1,208 @@
+"""
+Transactional outbox for contact form notifications.
+
+The contact endpoint only inserts an ``OutboxEmail`` row next to the
+``ContactMessage``; delivery happens afterwards, either on the in-process
+worker thread (woken when the transaction commits) or through the
+``process_outbox`` management command.  Each batch reuses one SMTP
+connection, and failures are retried with exponential backoff until
+``MAX_ATTEMPTS`` is reached.  The message's ``notification_status``
+follows its email: pending until it is sent or given up on.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connections, transaction
+from django.utils import timezone
+
+from . import metrics
+from .models import ContactMessage, OutboxEmail
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'WORKER': True,
+    'BATCH_SIZE': 50,
+    'MAX_ATTEMPTS': 5,
+    'BACKOFF_SECONDS': 30,
+    'MAX_BACKOFF_SECONDS': 60 * 60,
+    'LEASE_SECONDS': 5 * 60,
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'PORTFOLIO_OUTBOX', {}).get(name, DEFAULTS[name])
+
+
+def enqueue_contact_notification(message):
+    """Queue the notification for a saved ContactMessage; call inside its transaction"""
+    email = OutboxEmail.objects.create(
+        contact_message=message,
+        subject=f"Portfolio Contact: {message.subject}",
+        body=(
+            "New message from your portfolio:\n\n"
+            f"Name: {message.name}\n"
+            f"Email: {message.email}\n"
+            f"Subject: {message.subject}\n\n"
+            f"Message:\n{message.message}\n"
+        ),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipients=[settings.CONTACT_EMAIL],
+    )
+    if get_setting('WORKER'):
+        transaction.on_commit(worker.wake)
+    return email
+
+
+def backoff(attempts):
+    """Delay before retry number ``attempts`` (1-based)"""
+    delay = get_setting('BACKOFF_SECONDS') * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, get_setting('MAX_BACKOFF_SECONDS')))
+
+
+def claim_batch(limit):
+    """
+    Lease up to ``limit`` due emails to this worker. A lease that is not
+    released (for example because the process died) expires after
+    ``LEASE_SECONDS`` and the email becomes due again.
+    """
+    now = timezone.now()
+    due = OutboxEmail.objects.filter(
+        status__in=['pending', 'sending'], next_attempt_at__lte=now
+    ).values_list('pk', 'status', 'next_attempt_at')[:limit]
+    lease_until = now + timedelta(seconds=get_setting('LEASE_SECONDS'))
+    claimed = []
+    for pk, status, next_attempt_at in due:
+        # Compare-and-set so concurrent workers never claim the same email
+        won = OutboxEmail.objects.filter(
+            pk=pk, status=status, next_attempt_at=next_attempt_at
+        ).update(status='sending', next_attempt_at=lease_until, updated_at=now)
+        if won:
+            claimed.append(pk)
+    return list(OutboxEmail.objects.filter(pk__in=claimed))
+
+
+def record_notification(email, status):
+    """Show the delivery state of ``email`` on its contact message"""
+    if email.contact_message_id is not None:
+        ContactMessage.objects.filter(pk=email.contact_message_id).update(notification_status=status)
+
+
+def record_failure(email, error):
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= get_setting('MAX_ATTEMPTS'):
+        email.status = 'failed'
+        metrics.inc('portfolio_outbox_emails_total', outcome='failed')
+        logger.error("Giving up on outbox email %s after %s attempts: %s", email.pk, email.attempts, error)
+        record_notification(email, 'failed')
+    else:
+        email.status = 'pending'
+        email.next_attempt_at = timezone.now() + backoff(email.attempts)
+        metrics.inc('portfolio_outbox_emails_total', outcome='retry')
+        logger.warning("Outbox email %s failed (attempt %s): %s", email.pk, email.attempts, error)
+    email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at', 'updated_at'])
+
+
+def deliver_batch(limit=None):
+    """
+    Deliver one batch of due emails over a single mail connection.
+    Returns ``{'sent': n, 'failed': n}``.
+    """
+    batch = claim_batch(limit or get_setting('BATCH_SIZE'))
+    result = {'sent': 0, 'failed': 0}
+    if not batch:
+        return result
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as exc:
+        for email in batch:
+            record_failure(email, exc)
+        result['failed'] = len(batch)
+        return result
+
+    try:
+        for email in batch:
+            message = EmailMessage(
+                email.subject, email.body, email.from_email, email.recipients, connection=connection
+            )
+            try:
+                message.send()
+            except Exception as exc:
+                record_failure(email, exc)
+                result['failed'] += 1
+            else:
+                email.attempts += 1
+                email.status = 'sent'
+                email.sent_at = timezone.now()
+                email.last_error = ''
+                email.save(update_fields=['attempts', 'status', 'sent_at', 'last_error', 'updated_at'])
+                record_notification(email, 'sent')
+                metrics.inc('portfolio_outbox_emails_total', outcome='sent')
+                result['sent'] += 1
+    finally:
+        try:
+            connection.close()
+        except Exception:
+            pass
+    return result
+
+
+def next_due_at():
+    return OutboxEmail.objects.filter(status__in=['pending', 'sending']).order_by(
+        'next_attempt_at'
+    ).values_list('next_attempt_at', flat=True).first()
+
+
+class OutboxWorker:
+    """Single background thread that drains the outbox whenever it is woken"""
+
+    def __init__(self):
+        self._executor = None
+        self._lock = threading.Lock()
+        self._scheduled = False
+        self._timer = None
+
+    def wake(self):
+        with self._lock:
+            if self._scheduled:
+                return
+            self._scheduled = True
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='portfolio-outbox')
+            self._executor.submit(self._drain)
+
+    def _drain(self):
+        with self._lock:
+            self._scheduled = False
+        try:
+            while True:
+                result = deliver_batch()
+                if not result['sent'] and not result['failed']:
+                    break
+            self._schedule_retry(next_due_at())
+        except Exception:
+            logger.exception("Outbox worker failed")
+        finally:
+            connections.close_all()
+
+    def _schedule_retry(self, due_at):
+        if due_at is None:
+            return
+        delay = max((due_at - timezone.now()).total_seconds(), 0) + 0.1
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(delay, self.wake)
+            self._timer.daemon = True
+            self._timer.start()
+
+
+worker = OutboxWorker()
@@ -0,0 +1,154 @@
+"""
+Keyset pagination for the list endpoints.
+
+A page starts after the position (the ordering keys) of the last row of
+the previous one instead of at an OFFSET, and nothing is counted, so a deep
+page costs what the first one does.  ``ordering`` must be total, i.e. end
+with the primary key, and have an index to match (see the models' Meta).
+
+The keys mix sort directions, which a single row-value comparison cannot
+express, so "after this row" becomes one condition per key: equal on the
+keys before it and past the position on that key.  Each condition is a seek
+on the index, limited to a page; the page is then the first ``page_size``
+rows of those few candidates.  Cursors are opaque base64 tokens.
+"""
+import base64
+import binascii
+import datetime
+import json
+from functools import reduce
+from operator import attrgetter, or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def flip(key):
+    return key[1:] if key.startswith('-') else f'-{key}'
+
+
+def encode_value(value):
+    # isoformat() keeps the microseconds the equality conditions need
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return value
+
+
+class KeysetPagination(BasePagination):
+    ordering = ()
+    cursor_query_param = 'cursor'
+    # The old ``?limit=`` slice is now the page size
+    page_size_query_param = 'limit'
+    max_page_size = 100
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return api_settings.PAGE_SIZE
+        return min(size, self.max_page_size) if size > 0 else api_settings.PAGE_SIZE
+
+    def decode_cursor(self, request, model):
+        """``(position, reverse)`` from the cursor parameter; ``(None, False)`` for the first page"""
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            data = json.loads(base64.urlsafe_b64decode(token.encode()))
+            values = data['position']
+            if len(values) != len(self.ordering):
+                raise ValueError(token)
+            position = [
+                model._meta.get_field(key.lstrip('-')).to_python(value) for key, value in zip(self.ordering, values)
+            ]
+            return position, bool(data.get('reverse'))
+        except (ValueError, TypeError, KeyError, ValidationError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position, reverse):
+        data = {'position': [encode_value(value) for value in position], 'reverse': reverse}
+        token = base64.urlsafe_b64encode(json.dumps(data, separators=(',', ':')).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def key_getter(self, queryset):
+        """The queryset, selecting the ordering keys too, and a function from a row to its position"""
+        names = [key.lstrip('-') for key in self.ordering]
+        fields = queryset._fields
+        if not fields:
+            return queryset, lambda row: list(attrgetter(*names)(row))
+        missing = [name for name in names if name not in fields]
+        if missing:
+            queryset = queryset.values_list(*fields, *missing)
+            fields = [*fields, *missing]
+        indexes = [list(fields).index(name) for name in names]
+        return queryset, lambda row: [row[index] for index in indexes]
+
+    def after(self, queryset, ordering, position):
+        """Rows past ``position`` in ``ordering``, as one indexed seek per key"""
+        candidates = []
+        for i, key in enumerate(ordering):
+            name = key.lstrip('-')
+            # __in rather than exact: SQLite renders a boolean exact as a bare
+            # column, which cannot seek an index
+            condition = {f'{k.lstrip("-")}__in': [value] for k, value in zip(ordering[:i], position)}
+            condition[f'{name}__lt' if key.startswith('-') else f'{name}__gt'] = position[i]
+            seek = queryset.filter(**condition).order_by(*ordering).values('pk')[:self.page_size + 1]
+            candidates.append(Q(pk__in=seek))
+        return queryset.filter(reduce(or_, candidates))
+
+    def page_queryset(self, queryset, request):
+        """The rows to fetch for the requested page: one more than a page, to see if there are more"""
+        self.request = request
+        self.base_url = remove_query_param(request.build_absolute_uri(), self.cursor_query_param)
+        self.page_size = self.get_page_size(request)
+        self.position, self.reverse = self.decode_cursor(request, queryset.model)
+        queryset, self.get_key = self.key_getter(queryset)
+        ordering = [flip(key) for key in self.ordering] if self.reverse else list(self.ordering)
+        if self.position is not None:
+            queryset = self.after(queryset, ordering, self.position)
+        return queryset.order_by(*ordering)[:self.page_size + 1]
+
+    def get_page(self, rows):
+        """The page from the rows ``page_queryset`` returned, in display order"""
+        rows = list(rows)
+        more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if self.reverse:
+            rows.reverse()
+            has_next, has_previous = True, more
+        else:
+            has_next, has_previous = more, self.position is not None
+        self.next = self.encode_cursor(self.get_key(rows[-1]), False) if has_next and rows else None
+        self.previous = self.encode_cursor(self.get_key(rows[0]), True) if has_previous and rows else None
+        return rows
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.get_page(self.page_queryset(queryset, request))
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.next, 'previous': self.previous, 'results': data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class ProjectPagination(KeysetPagination):
+    ordering = ('-is_featured', 'order', '-created_at', '-id')
+
+
+class ExperiencePagination(KeysetPagination):
+    ordering = ('order', '-start_date', '-id')
@@ -0,0 +1,198 @@
+"""
+Read-only serialization straight from ``values_list()`` rows.
+
+A ``RowSerializer`` is compiled once from an existing DRF serializer: the
+field order, the columns to select and one converter per field are worked
+out up front, so serializing a row is a tuple lookup plus a conversion only
+where the type needs one (dates, files, related names).  The output is the
+same as the DRF serializer's, byte for byte once rendered, and
+``tests.RowSerializerTests`` keeps it that way.  Views opt in by setting
+``row_serializer``.
+"""
+from operator import itemgetter
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.storage import default_storage
+from django.http import Http404
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .images import variant_sources
+from .models import format_period
+from .serializers import (
+    ExperienceSerializer, ImageVariantsField, ProfileSerializer, ProjectListSerializer, ProjectSerializer
+)
+
+
+# Field types whose representation of a database value is the value itself
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField, serializers.CharField, serializers.ChoiceField, serializers.IntegerField,
+    serializers.JSONField, serializers.ModelField, serializers.PrimaryKeyRelatedField, serializers.ReadOnlyField,
+)
+
+
+def is_default_datetime(field):
+    """Whether DRF would render the field as ISO 8601 in the current time zone"""
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    return (
+        settings.USE_TZ and output_format is not None and output_format.lower() == ISO_8601
+        and not hasattr(field, 'timezone')
+    )
+
+
+def iso_datetime(value):
+    """DateTimeField's ISO 8601 output for an aware datetime"""
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+class RowSerializer:
+    """
+    ``computed`` maps a field name to ``(columns, function)``: the function
+    receives the values of ``columns`` and returns the representation.
+    ``related_labels`` names the column behind ``str()`` of the objects in a
+    ``StringRelatedField(many=True)``.
+    """
+
+    def __init__(self, serializer_class, computed=None, related_labels=None):
+        self.model = serializer_class.Meta.model
+        computed = computed or {}
+        related_labels = related_labels or {}
+        self.columns = [self.model._meta.pk.name]
+        self.fields = []
+        self.related = []
+        for name, field in serializer_class().fields.items():
+            if name in computed:
+                columns, function = computed[name]
+                self.fields.append((name, [self.column(c) for c in columns], function, 'computed'))
+            elif isinstance(field, serializers.ManyRelatedField):
+                self.related.append((name, field.source, related_labels[name]))
+                self.fields.append((name, None, None, 'related'))
+            elif isinstance(field, ImageVariantsField):
+                self.fields.append((name, self.column(field.source), None, 'variants'))
+            elif isinstance(field, serializers.FileField):
+                self.fields.append((name, self.column(field.source), self.model._meta.get_field(field.source).storage, 'file'))
+            elif isinstance(field, serializers.DateTimeField):
+                kind = 'datetime' if is_default_datetime(field) else 'convert'
+                self.fields.append((name, self.column(field.source), field.to_representation, kind))
+            elif isinstance(field, serializers.DateField):
+                kind = 'date' if getattr(field, 'format', api_settings.DATE_FORMAT).lower() == ISO_8601 else 'convert'
+                self.fields.append((name, self.column(field.source), field.to_representation, kind))
+            elif isinstance(field, PASSTHROUGH_FIELDS):
+                self.fields.append((name, self.column(field.source), None, 'value'))
+            else:
+                raise ImproperlyConfigured(f"{serializer_class.__name__}.{name}: {type(field).__name__} has no row converter")
+
+    def column(self, name):
+        if name not in self.columns:
+            self.columns.append(name)
+        return self.columns.index(name)
+
+    def rows(self, queryset):
+        """The queryset reduced to the tuples ``to_data`` expects"""
+        return queryset.prefetch_related(None).values_list(*self.columns)
+
+    def to_data(self, rows, request=None):
+        rows = list(rows)
+        related = {
+            name: group_pairs(self.related_pairs(source, label, rows)) for name, source, label in self.related
+        }
+        return self.build(rows, related, request)
+
+    async def ato_data(self, rows, request=None):
+        """``to_data`` for rows or a queryset of rows, fetched with the async ORM"""
+        rows = [row async for row in rows] if hasattr(rows, '__aiter__') else list(rows)
+        related = {}
+        for name, source, label in self.related:
+            related[name] = group_pairs([pair async for pair in self.related_pairs(source, label, rows)])
+        return self.build(rows, related, request)
+
+    def build(self, rows, related, request):
+        getters = [(name, self.getter(kind, index, extra, related.get(name), request)) for name, index, extra, kind in self.fields]
+        return [{name: get(row) for name, get in getters} for row in rows]
+
+    def getter(self, kind, index, extra, related, request):
+        """A function from a row tuple to the representation of one field"""
+        if kind == 'value':
+            return itemgetter(index)
+        if kind == 'datetime':
+            tz = timezone.get_current_timezone()
+            return lambda row: None if row[index] is None else iso_datetime(row[index].astimezone(tz))
+        if kind == 'date':
+            return lambda row: None if row[index] is None else row[index].isoformat()
+        if kind == 'convert':
+            return lambda row: None if row[index] is None else extra(row[index])
+        if kind == 'file':
+            url = extra.url if request is None else (lambda name: request.build_absolute_uri(extra.url(name)))
+            return lambda row: url(row[index]) if row[index] else None
+        if kind == 'variants':
+            url = None if request is None else (lambda name: request.build_absolute_uri(default_storage.url(name)))
+            return lambda row: variant_sources(row[index], url=url)
+        if kind == 'related':
+            return lambda row: related.get(row[0], [])
+        return lambda row: extra(*(row[i] for i in index))
+
+    def related_pairs(self, source, label, rows):
+        """(pk, label) pairs of a many-to-many field, ordered like the related model"""
+        field = self.model._meta.get_field(source)
+        through = field.remote_field.through
+        source_column = field.m2m_field_name()
+        target = field.m2m_reverse_field_name()
+        ordering = [
+            f'-{target}__{name[1:]}' if name.startswith('-') else f'{target}__{name}'
+            for name in field.related_model._meta.ordering
+        ]
+        pairs = through.objects.filter(**{f'{source_column}__in': [row[0] for row in rows]}).order_by(*ordering)
+        return pairs.values_list(source_column, f'{target}__{label}')
+
+
+def group_pairs(pairs):
+    """{pk: [label, ...]} from ``related_pairs``"""
+    values = {}
+    for pk, value in pairs:
+        values.setdefault(pk, []).append(value)
+    return values
+
+
+class RowListMixin:
+    """``list()`` through ``row_serializer`` when the view sets one"""
+    row_serializer = None
+
+    def list(self, request, *args, **kwargs):
+        if self.row_serializer is None:
+            return super().list(request, *args, **kwargs)
+        rows = self.row_serializer.rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(self.row_serializer.to_data(page, request))
+        return Response(self.row_serializer.to_data(rows, request))
+
+
+class RowRetrieveMixin:
+    """``retrieve()`` through ``row_serializer`` when the view sets one"""
+    row_serializer = None
+
+    def get_row_queryset(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return self.filter_queryset(self.get_queryset()).filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+
+    def retrieve(self, request, *args, **kwargs):
+        if self.row_serializer is None:
+            return super().retrieve(request, *args, **kwargs)
+        data = self.row_serializer.to_data(self.row_serializer.rows(self.get_row_queryset())[:1], request)
+        if not data:
+            raise Http404("No %s matches the given query." % self.row_serializer.model._meta.object_name)
+        return Response(data[0])
+
+
+PROFILE_ROWS = RowSerializer(ProfileSerializer)
+PROJECT_ROWS = RowSerializer(ProjectSerializer, related_labels={'technologies': 'name'})
+PROJECT_LIST_ROWS = RowSerializer(ProjectListSerializer, related_labels={'technologies': 'name'})
+EXPERIENCE_ROWS = RowSerializer(ExperienceSerializer, computed={
+    'period': (('start_date', 'end_date', 'is_current'), format_period),
+})
@@ -0,0 +1,292 @@
+"""
+Full-text search over projects, experience and skills with SQLite FTS5.
+
+``portfolio_search`` (migration 0007) holds one document per active
+project, experience entry, skill and technology: a title and a body.  The
+rowid packs the document's kind and primary key, so keeping a document in
+step is a delete and an insert by rowid.  Single saves and deletes reach
+the index through ``signals.py``; the bulk writers (``bulk.sync_rows``,
+``seed_portfolio``) call ``index_objects`` themselves since they send no
+signals, and ``rebuild_search_index`` reindexes everything, e.g. after
+content was written with the index unavailable.
+
+Every word of the query has to match, the last one as a prefix of a token
+(from two characters on) since it may be half typed.  Results are ranked
+with BM25, titles weighing more than bodies, and carry a highlighted
+snippet and the item in the shape its list endpoint returns.
+"""
+import html
+import re
+import unicodedata
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db import connections, router, transaction
+
+from .models import Experience, ProfessionalSkill, Project, TechnicalSkill, Technology
+from .rows import EXPERIENCE_ROWS, PROJECT_LIST_ROWS
+from .sections import professional_skill_item, technical_skill_item, technology_item
+
+
+TABLE = 'portfolio_search'
+
+DEFAULTS = {
+    'ENABLED': True,
+    'LIMIT': 20,
+    'MAX_LIMIT': 50,
+    # Words of context in a snippet
+    'SNIPPET_WORDS': 16,
+    # BM25 weights of the title and body columns
+    'WEIGHTS': (10.0, 1.0),
+}
+
+# kind -> (model, title column, body columns).  A kind's position is part of
+# its rowids, so new kinds go at the end.
+KINDS = {
+    'project': (Project, 'title', ('description',)),
+    'experience': (Experience, 'title', ('company', 'location', 'description')),
+    'technical_skill': (TechnicalSkill, 'name', ('category',)),
+    'professional_skill': (ProfessionalSkill, 'name', ('description',)),
+    'technology': (Technology, 'name', ('category',)),
+}
+KIND_NAMES = list(KINDS)
+KIND_NUMBERS = {kind: number for number, kind in enumerate(KIND_NAMES)}
+MODEL_KINDS = {model: kind for kind, (model, title, body) in KINDS.items()}
+# rowid = pk * KIND_STRIDE + kind number
+KIND_STRIDE = 8
+
+# Items in the shape of the list endpoints
+ROW_SERIALIZERS = {'project': PROJECT_LIST_ROWS, 'experience': EXPERIENCE_ROWS}
+ITEMS = {
+    'technical_skill': technical_skill_item,
+    'professional_skill': professional_skill_item,
+    'technology': technology_item,
+}
+
+# Primary keys per statement, well under SQLite's variable limit
+CHUNK_SIZE = 500
+
+# Letters and digits, as the unicode61 tokenizer splits words
+WORD = re.compile(r'[^\W_]+')
+
+
+def get_setting(name):
+    return getattr(settings, 'PORTFOLIO_SEARCH', {}).get(name, DEFAULTS[name])
+
+
+def is_available(connection):
+    return get_setting('ENABLED') and connection.vendor == 'sqlite'
+
+
+def rowid(kind, pk):
+    return pk * KIND_STRIDE + KIND_NUMBERS[kind]
+
+
+def chunks(values):
+    values = list(values)
+    for start in range(0, len(values), CHUNK_SIZE):
+        yield values[start:start + CHUNK_SIZE]
+
+
+def technology_names(project_pks):
+    """{project pk: [active technology name, ...]}"""
+    names = {}
+    pairs = Project.technologies.through.objects.filter(project_id__in=project_pks, technology__is_active=True)
+    for project_pk, name in pairs.values_list('project_id', 'technology__name'):
+        names.setdefault(project_pk, []).append(name)
+    return names
+
+
+def documents(kind, pks):
+    """(rowid, title, body) of the active rows of ``kind`` among ``pks``"""
+    model, title, body = KINDS[kind]
+    rows = list(model.objects.filter(is_active=True, pk__in=pks).order_by().values_list('pk', title, *body))
+    # A project is found by the names of its technologies too
+    extra = technology_names([row[0] for row in rows]) if kind == 'project' else {}
+    return [
+        (rowid(kind, pk), title_value, '\n'.join(value for value in (*body_values, *extra.get(pk, ())) if value))
+        for pk, title_value, *body_values in rows
+    ]
+
+
+def write_documents(cursor, kind, pks, replace=True):
+    for chunk in chunks(pks):
+        if replace:
+            placeholders = ', '.join(['%s'] * len(chunk))
+            cursor.execute(f'DELETE FROM {TABLE} WHERE rowid IN ({placeholders})', [rowid(kind, pk) for pk in chunk])
+        rows = documents(kind, chunk)
+        if rows:
+            cursor.executemany(f'INSERT INTO {TABLE} (rowid, title, body) VALUES (%s, %s, %s)', rows)
+
+
+def index_objects(model, pks):
+    """Reindex the given rows of ``model``; inactive and missing rows leave the index"""
+    kind = MODEL_KINDS.get(model)
+    pks = set(pks)
+    connection = connections[router.db_for_write(model)]
+    if kind is None or not pks or not is_available(connection):
+        return
+    with connection.cursor() as cursor:
+        write_documents(cursor, kind, pks)
+    if model is Technology:
+        # Projects carry the names of their technologies
+        projects = Project.technologies.through.objects.filter(technology_id__in=pks)
+        index_objects(Project, projects.values_list('project_id', flat=True))
+
+
+def remove_objects(model, pks):
+    kind = MODEL_KINDS.get(model)
+    connection = connections[router.db_for_write(model)]
+    if kind is None or not is_available(connection):
+        return
+    with connection.cursor() as cursor:
+        for chunk in chunks(pks):
+            placeholders = ', '.join(['%s'] * len(chunk))
+            cursor.execute(f'DELETE FROM {TABLE} WHERE rowid IN ({placeholders})', [rowid(kind, pk) for pk in chunk])
+
+
+def rebuild():
+    """Empty the index and index every active row; returns {kind: documents}"""
+    connection = connections[router.db_for_write(Project)]
+    counts = {}
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE}')
+        for kind, (model, title, body) in KINDS.items():
+            pks = list(model.objects.filter(is_active=True).order_by('pk').values_list('pk', flat=True))
+            write_documents(cursor, kind, pks, replace=False)
+            counts[kind] = len(pks)
+        # Merge the b-trees the inserts left behind into one
+        cursor.execute(f"INSERT INTO {TABLE} ({TABLE}) VALUES ('optimize')")
+    return counts
+
+
+def fold(text):
+    """Lower case without diacritics, as the unicode61 tokenizer indexes words"""
+    return ''.join(char for char in unicodedata.normalize('NFKD', text.lower()) if not unicodedata.combining(char))
+
+
+def query_terms(query):
+    """
+    (word, prefix) for every word of the query.  Only the last word, which
+    may be half typed, is a prefix (from two characters on): FTS5 merges the
+    doclists of every term a prefix covers before it can return a row, so a
+    prefix costs far more than a word for common words.
+    """
+    words = WORD.findall(fold(query))
+    return [(word, i == len(words) - 1 and len(word) > 1) for i, word in enumerate(words)]
+
+
+def match_expression(terms):
+    """
+    The FTS5 query: every term quoted, so that operators and syntax
+    characters are plain text, and all of them required.
+    """
+    return ' '.join(f'"{word}"*' if prefix else f'"{word}"' for word, prefix in terms)
+
+
+def term_index(word, terms):
+    word = word.lower() if word.isascii() else fold(word)
+    for index, (term, prefix) in enumerate(terms):
+        if word == term or prefix and word.startswith(term):
+            return index
+    return None
+
+
+def term_pattern(terms):
+    """A regex for the words that match ``terms``"""
+    alternatives = sorted({re.escape(term) + (r'[^\W_]*' if prefix else '') for term, prefix in terms}, key=len, reverse=True)
+    return re.compile(rf"(?<![^\W_])(?:{'|'.join(alternatives)})(?![^\W_])", re.IGNORECASE)
+
+
+def snippet(text, terms, size):
+    """
+    (terms matched, HTML) for the ``size`` words of ``text`` that match the
+    most terms: content escaped, matches in <mark>
+    """
+    words = list(WORD.finditer(text))
+    if not words:
+        return 0, html.escape(text)
+    # Folding keeps the offsets of accented Latin text; where it would not,
+    # matches are found case-insensitively only
+    searchable = text if text.isascii() else fold(text)
+    if len(searchable) != len(text):
+        searchable = text
+    starts = [word.start() for word in words]
+    # word position -> (term index, match)
+    hits = {
+        bisect_left(starts, match.start()): (term_index(match.group(), terms), match)
+        for match in term_pattern(terms).finditer(searchable)
+    }
+    best, start = 0, 0
+    for position in sorted(hits):
+        # A little context before the first match
+        window = max(0, min(position - size // 4, len(words) - size))
+        found = len({term for at, (term, match) in hits.items() if window <= at < window + size})
+        if found > best:
+            best, start = found, window
+    end = min(start + size, len(words))
+    first, last = words[start].start(), words[end - 1].end()
+    parts = ['…' if start else html.escape(text[:first])]
+    offset = first
+    for position in sorted(at for at in hits if start <= at < end):
+        match = hits[position][1]
+        parts += [html.escape(text[offset:match.start()]), f'<mark>{html.escape(text[match.start():match.end()])}</mark>']
+        offset = match.end()
+    parts += [html.escape(text[offset:last]), '…' if end < len(words) else html.escape(text[last:])]
+    return best, ''.join(parts)
+
+
+def best_snippet(title, body, terms):
+    """The snippet of the body, or of the title when it matches more terms"""
+    size = get_setting('SNIPPET_WORDS')
+    title_found, title_snippet = snippet(title, terms, size)
+    body_found, body_snippet = snippet(body, terms, size)
+    return title_snippet if title_found > body_found else body_snippet
+
+
+def load_items(kind, pks, request=None):
+    """{pk: item} for the active rows of ``kind`` among ``pks``"""
+    model = KINDS[kind][0]
+    # Results are in rank order, not the model's
+    queryset = model.objects.filter(is_active=True, pk__in=pks).order_by()
+    if kind in ROW_SERIALIZERS:
+        row_serializer = ROW_SERIALIZERS[kind]
+        rows = list(row_serializer.rows(queryset))
+        return {row[0]: item for row, item in zip(rows, row_serializer.to_data(rows, request))}
+    return {obj.pk: ITEMS[kind](obj) for obj in queryset}
+
+
+def search(query, kinds=None, limit=None, request=None):
+    """Results for ``query``, best first: ``{'type', 'score', 'snippet', 'item'}``"""
+    terms = query_terms(query)
+    if not terms:
+        return []
+    # Every match is ranked, so the best ones are found however many
+    # documents match; only the top LIMIT leave FTS5
+    ranking = f"SELECT rowid, bm25({TABLE}, %s, %s) AS score FROM {TABLE} WHERE {TABLE} MATCH %s"
+    params = [*get_setting('WEIGHTS'), match_expression(terms)]
+    if kinds:
+        ranking += f" AND rowid %% {KIND_STRIDE} IN ({', '.join(str(KIND_NUMBERS[kind]) for kind in kinds)})"
+    ranking += ' ORDER BY score, rowid DESC LIMIT %s'
+    params.append(limit or get_setting('LIMIT'))
+
+    with connections[router.db_for_read(Project)].cursor() as cursor:
+        cursor.execute(ranking, params)
+        ranked = cursor.fetchall()
+        if not ranked:
+            return []
+        # Snippets come from the stored text: FTS5's snippet() seeks every
+        # matched doclist again, which costs more than the ranking
+        placeholders = ', '.join(['%s'] * len(ranked))
+        cursor.execute(f'SELECT rowid, title, body FROM {TABLE} WHERE rowid IN ({placeholders})', [row[0] for row in ranked])
+        texts = {number: (title, body) for number, title, body in cursor.fetchall()}
+
+    matches = [(number // KIND_STRIDE, KIND_NAMES[number % KIND_STRIDE], score, texts[number]) for number, score in ranked]
+    items = {}
+    for kind in {kind for pk, kind, score, text in matches}:
+        items[kind] = load_items(kind, [pk for pk, match_kind, score, text in matches if match_kind == kind], request)
+    return [
+        # BM25 is lower for better matches; the score is higher
+        {'type': kind, 'score': round(-score, 4), 'snippet': best_snippet(*text, terms), 'item': items[kind][pk]}
+        for pk, kind, score, text in matches if pk in items[kind]
+    ]
@@ -0,0 +1,110 @@
+from .media import media_url
+from .models import (
+    Profile, TechnicalSkill, ProfessionalSkill, Technology,
+    Project, Experience, SocialLink
+)
+from .rows import EXPERIENCE_ROWS, PROJECT_LIST_ROWS
+from .serializers import ProfileSerializer
+
+
+# The home page lists the first active projects, as ``/api/projects/?limit=6``
+HOME_PROJECTS_LIMIT = 6
+
+
+def profile_section(profile, request=None):
+    """Serialized profile, or None when no profile exists"""
+    if profile is None:
+        return None
+    return ProfileSerializer(profile, context={'request': request}).data
+
+
+def skills_querysets():
+    return (
+        TechnicalSkill.objects.filter(is_active=True),
+        ProfessionalSkill.objects.filter(is_active=True),
+        Technology.objects.filter(is_active=True),
+    )
+
+
+def skills_section():
+    """Technical skills, professional skills and technologies"""
+    return skills_data(*skills_querysets())
+
+
+async def askills_section():
+    """``skills_section`` with the async ORM"""
+    results = []
+    for queryset in skills_querysets():
+        results.append([obj async for obj in queryset])
+    return skills_data(*results)
+
+
+def technical_skill_item(skill):
+    return {'name': skill.name, 'level': skill.level, 'category': skill.category}
+
+
+def professional_skill_item(skill):
+    return {'name': skill.name, 'icon': skill.icon, 'description': skill.description}
+
+
+def technology_item(tech):
+    return {'name': tech.name, 'icon': tech.icon_url, 'category': tech.category}
+
+
+def skills_data(technical_skills, professional_skills, technologies):
+    return {
+        'technical': [technical_skill_item(skill) for skill in technical_skills],
+        'professional': [professional_skill_item(skill) for skill in professional_skills],
+        'technologies': [technology_item(tech) for tech in technologies],
+    }
+
+
+def projects_section(request=None, featured=False, limit=HOME_PROJECTS_LIMIT):
+    """Active projects with their technologies loaded in a single extra query"""
+    queryset = Project.objects.filter(is_active=True)
+    if featured:
+        queryset = queryset.filter(is_featured=True)
+    if limit:
+        queryset = queryset[:limit]
+    return PROJECT_LIST_ROWS.to_data(PROJECT_LIST_ROWS.rows(queryset), request)
+
+
+def experience_section(request=None):
+    """Active experience and education entries"""
+    queryset = Experience.objects.filter(is_active=True)
+    return EXPERIENCE_ROWS.to_data(EXPERIENCE_ROWS.rows(queryset), request)
+
+
+def contact_section(profile):
+    """Contact details from the profile plus active social links"""
+    return contact_data(profile, SocialLink.objects.filter(is_active=True))
+
+
+async def acontact_section(profile):
+    """``contact_section`` with the async ORM"""
+    return contact_data(profile, [link async for link in SocialLink.objects.filter(is_active=True)])
+
+
+def contact_data(profile, social_links):
+    social = [{'name': link.name, 'url': link.url, 'icon': link.icon} for link in social_links]
+    if profile is None:
+        return {'email': None, 'phone': None, 'location': None, 'social': social, 'resume_url': None}
+    return {
+        'email': profile.email,
+        'phone': profile.phone or "+1 (234) 567-890",
+        'location': profile.location,
+        'social': social,
+        'resume_url': media_url(profile.resume_file.name) if profile.resume_file else None
+    }
+
+
+def bootstrap_payload(request=None):
+    """Everything the home page renders, assembled with a fixed number of queries"""
+    profile = Profile.objects.first()
+    return {
+        'profile': profile_section(profile, request),
+        'skills': skills_section(),
+        'projects': projects_section(request),
+        'experience': experience_section(request),
+        'contact': contact_section(profile),
+    }
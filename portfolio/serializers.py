@@ -1,11 +1,29 @@
+from django.core.files.storage import default_storage
 from rest_framework import serializers
+from .images import variant_sources
 from .models import (
     Profile, TechnicalSkill, ProfessionalSkill, Technology,
     Project, Experience, SocialLink, ContactMessage
 )
 
 
+class ImageVariantsField(serializers.Field):
+    """Stored derivatives as ``[{'type', 'srcset': [{'url', 'width'}]}]``, best format first"""
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        request = self.context.get('request')
+        if request is None:
+            return variant_sources(value)
+        return variant_sources(value, url=lambda name: request.build_absolute_uri(default_storage.url(name)))
+
+
 class ProfileSerializer(serializers.ModelSerializer):
+    profile_image_variants = ImageVariantsField()
+
     class Meta:
         model = Profile
         fields = '__all__'
@@ -13,6 +31,7 @@ class ProfileSerializer(serializers.ModelSerializer):
 
 class ProjectSerializer(serializers.ModelSerializer):
     technologies = serializers.StringRelatedField(many=True, read_only=True)
+    image_variants = ImageVariantsField()
     
     class Meta:
         model = Project
@@ -21,10 +40,11 @@ class ProjectSerializer(serializers.ModelSerializer):
 
 class ProjectListSerializer(serializers.ModelSerializer):
     technologies = serializers.StringRelatedField(many=True, read_only=True)
+    image_variants = ImageVariantsField()
     
     class Meta:
         model = Project
-        fields = ['id', 'title', 'description', 'image', 'github_url', 'live_url', 'is_featured', 'technologies']
+        fields = ['id', 'title', 'description', 'image', 'image_variants', 'github_url', 'live_url', 'is_featured', 'technologies']
 
 
 class ExperienceSerializer(serializers.ModelSerializer):
@@ -35,13 +55,7 @@ class ExperienceSerializer(serializers.ModelSerializer):
         fields = '__all__'
     
     def get_period(self, obj):
-        from datetime import date
-        if obj.is_current:
-            return f"{obj.start_date.strftime('%Y')} - Present"
-        elif obj.end_date:
-            return f"{obj.start_date.strftime('%Y')} - {obj.end_date.strftime('%Y')}"
-        else:
-            return f"{obj.start_date.strftime('%Y')}"
+        return obj.period
 
 
 class ContactInfoSerializer(serializers.Serializer):
@@ -0,0 +1,135 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import cache, database, facets, images, metrics, search, snapshot, timing
+from .models import (
+    Profile, TechnicalSkill, ProfessionalSkill, Technology,
+    Project, Experience, SocialLink
+)
+
+CONTENT_MODELS = [
+    Profile, TechnicalSkill, ProfessionalSkill, Technology,
+    Project, Experience, SocialLink,
+]
+
+
+@receiver(connection_created)
+def configure_connection(sender, connection, **kwargs):
+    """SQLite pragmas and the read-only flag (see database.py)"""
+    database.configure_connection(connection)
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    """Per-request query counts for the timing middleware"""
+    timing.install_query_recorder(connection)
+
+
+@receiver(timing.request_timed)
+def observe_request(sender, request, measurements, **kwargs):
+    """API request counts and latencies for the metrics endpoint"""
+    if request.path.startswith('/api/'):
+        metrics.observe_request(measurements)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_content(sender, **kwargs):
+    """
+    Drop cached responses that read from the changed model once the write
+    commits: bumped any earlier, a concurrent read would cache the old
+    content under the new version.
+    """
+    if sender in CONTENT_MODELS:
+        transaction.on_commit(lambda: cache.invalidate(sender.__name__))
+
+
+@receiver(m2m_changed, sender=Project.technologies.through)
+def invalidate_project_technologies(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Technology membership is part of a project's representation, so touch
+    ``updated_at`` on the affected projects to keep their validators honest.
+    """
+    if reverse:
+        # pre_clear is the last point at which the cleared projects are known
+        if action == 'pre_clear':
+            instance._cleared_projects = set(instance.project_set.values_list('pk', flat=True))
+            return
+        if action == 'post_clear':
+            pk_set = getattr(instance, '_cleared_projects', set())
+        elif action not in ('post_add', 'post_remove'):
+            return
+    else:
+        if action not in ('post_add', 'post_remove', 'post_clear'):
+            return
+        pk_set = {instance.pk}
+    if pk_set:
+        Project.objects.filter(pk__in=pk_set).update(updated_at=timezone.now())
+    transaction.on_commit(lambda: cache.invalidate('Project'))
+
+
+@receiver(m2m_changed, sender=Project.technologies.through)
+def index_project_technologies(sender, instance, action, reverse, pk_set, **kwargs):
+    """A project's search document carries the names of its technologies"""
+    if reverse and action == 'pre_clear':
+        instance._search_projects = list(instance.project_set.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        search.index_objects(Project, pk_set if reverse else [instance.pk])
+    elif action == 'post_clear':
+        search.index_objects(Project, getattr(instance, '_search_projects', ()) if reverse else [instance.pk])
+
+
+@receiver(cache.content_changed)
+def refresh_facets(sender, model_names, **kwargs):
+    """Rebuild this process's facet index for the new versions once they are committed"""
+    if set(model_names) & set(cache.ENDPOINT_MODELS['projects']):
+        # Built from a transaction's own rows, the index would keep a rolled
+        # back write under the new versions
+        transaction.on_commit(facets.refresh)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def schedule_snapshot(sender, **kwargs):
+    """Rebuild the snapshot of the API responses after the write commits"""
+    if sender in CONTENT_MODELS:
+        snapshot.schedule()
+
+
+@receiver(m2m_changed, sender=Project.technologies.through)
+def schedule_snapshot_relations(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        snapshot.schedule()
+
+
+@receiver(post_save)
+def index_content(sender, instance, raw=False, **kwargs):
+    """Keep the search document of a saved row in step (see search.py)"""
+    if not raw and sender in search.MODEL_KINDS:
+        search.index_objects(sender, [instance.pk])
+
+
+@receiver(pre_delete, sender=Technology)
+def remember_technology_projects(sender, instance, **kwargs):
+    # The relations are gone by post_delete, as after a clear
+    instance._search_projects = list(instance.project_set.values_list('pk', flat=True))
+
+
+@receiver(post_delete)
+def unindex_content(sender, instance, **kwargs):
+    """Drop the search document of a deleted row"""
+    if sender in search.MODEL_KINDS:
+        search.remove_objects(sender, [instance.pk])
+    if sender is Technology:
+        search.index_objects(Project, getattr(instance, '_search_projects', ()))
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_save, sender=Project)
+def schedule_image_variants(sender, instance, raw=False, **kwargs):
+    """Regenerate responsive derivatives when the uploaded image changes"""
+    if not raw and images.needs_variants(instance):
+        images.schedule_variants(instance)
@@ -0,0 +1,320 @@
+"""
+Materialized API responses shared by every worker process.
+
+``PortfolioSnapshot`` holds the rendered response of every public endpoint
+variant (``variants()``): the sections, the first pages of the lists and
+each project's detail, for each of the site's canonical ``ORIGINS``, since
+the bodies carry absolute URLs.  ``snapshot_response`` answers requests
+to those origins with one primary key lookup when the row was rendered
+from the content the endpoint has now (the fingerprint of
+``conditional.content_state``).  Otherwise the request falls through to
+the view and a rebuild is scheduled, so a stale row is never served and a
+missing one fills itself in.  Requests to any other host go to the view.
+
+Content writes schedule a rebuild once they commit (``signals.py``); the
+bulk writers, which send no signals, through the first read that finds a
+row stale.  The worker waits for a burst of writes to settle
+(``DEBOUNCE_SECONDS`` after the last one, ``MAX_DELAY_SECONDS`` after the
+first at most) and rebuilds once.  A rebuild renders every variant with
+the views themselves, outside any transaction so writers are not blocked,
+and publishes them in one transaction under the next version, unless the
+content changed while it rendered; then it starts over.
+``rebuild_snapshot`` builds it from the command line, e.g. after a deploy
+or from cron with ``WORKER`` off.
+"""
+import logging
+import threading
+import time
+from functools import wraps
+from urllib.parse import urlencode
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Max
+from django.http import HttpRequest, HttpResponse, QueryDict
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from . import metrics, views
+from .cache import CONTENT_MODELS, ENDPOINT_MODELS
+from .conditional import acontent_state, content_state, fingerprint_states, model_states
+from .models import Experience, PortfolioSnapshot, Project
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    'WORKER': True,
+    'DEBOUNCE_SECONDS': 0.5,
+    'MAX_DELAY_SECONDS': 5.0,
+    # The site's canonical origins (scheme and host), e.g.
+    # ['https://example.com']; requests to other hosts skip the snapshot
+    'ORIGINS': (),
+    # Renders per rebuild before it gives up on content that keeps changing
+    'ATTEMPTS': 3,
+}
+
+# endpoint -> (URL name, the query strings of its variants)
+ENDPOINTS = {
+    'bootstrap': ('bootstrap', ['']),
+    'profile': ('profile', ['']),
+    'skills': ('skills', ['']),
+    'projects': ('projects', ['', 'featured=true&limit=6']),
+    'project-detail': ('project-detail', ['']),
+    'experience': ('experience', ['', *(f'type={value}' for value, label in Experience.EXPERIENCE_TYPES)]),
+    'contact': ('contact-info', ['']),
+}
+
+# The undecorated views the variants are rendered with
+VIEWS = {
+    'bootstrap': views.bootstrap_view,
+    'profile': views.ProfileView.as_view(),
+    'skills': views.skills_view,
+    'projects': views.ProjectListView.as_view(),
+    'project-detail': views.ProjectDetailView.as_view(),
+    'experience': views.ExperienceListView.as_view(),
+    'contact': views.contact_info_view,
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'PORTFOLIO_SNAPSHOT', {}).get(name, DEFAULTS[name])
+
+
+def variant_query(request, params):
+    """The query string of the parameters in ``params``, in that order"""
+    return urlencode([(name, request.GET[name]) for name in params if name in request.GET])
+
+
+def snapshot_key(origin, path, query=''):
+    return f'{origin}{path}?{query}' if query else f'{origin}{path}'
+
+
+def origins():
+    """The configured ``ORIGINS``, without trailing slashes"""
+    return sorted(origin.rstrip('/') for origin in get_setting('ORIGINS'))
+
+
+def request_origin(request):
+    return f'{request.scheme}://{request.get_host()}'
+
+
+def variants():
+    """(endpoint, path, query) of every response the snapshot holds"""
+    items = []
+    for endpoint, (url_name, queries) in ENDPOINTS.items():
+        if endpoint == 'project-detail':
+            pks = Project.objects.filter(is_active=True).order_by('pk').values_list('pk', flat=True)
+            items += [(endpoint, reverse(url_name, args=[pk]), '') for pk in pks]
+        else:
+            items += [(endpoint, reverse(url_name), query) for query in queries]
+    return items
+
+
+class SnapshotRequest(HttpRequest):
+    """A GET of ``path`` from ``origin``, as the server would pass it to the view"""
+
+    def __init__(self, origin, path, query):
+        super().__init__()
+        self.origin_scheme, host = origin.split('://', 1)
+        self.method = 'GET'
+        self.path = self.path_info = path
+        self.GET = QueryDict(query)
+        self.META.update(REQUEST_METHOD='GET', HTTP_HOST=host, QUERY_STRING=query)
+
+    def _get_scheme(self):
+        return self.origin_scheme
+
+
+def render(endpoint, origin, path, query):
+    """(status, content type, content) of the view's response to a GET from ``origin``"""
+    response = VIEWS[endpoint](SnapshotRequest(origin, path, query), **resolve(path).kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    return response.status_code, response['Content-Type'], response.content
+
+
+def render_all(origins):
+    """Unsaved snapshot rows of every variant for ``origins``, and the content states they reflect"""
+    states = model_states(CONTENT_MODELS)
+    fingerprints = {endpoint: fingerprint_states(ENDPOINT_MODELS[endpoint], states)[0] for endpoint in ENDPOINTS}
+    now = timezone.now()
+    rows = []
+    for endpoint, path, query in variants():
+        for origin in origins:
+            status, content_type, content = render(endpoint, origin, path, query)
+            rows.append(PortfolioSnapshot(
+                key=snapshot_key(origin, path, query), origin=origin, endpoint=endpoint,
+                fingerprint=fingerprints[endpoint], status=status, content_type=content_type,
+                content=content, built_at=now,
+            ))
+    return rows, states
+
+
+def publish(rows, states):
+    """
+    Replace the snapshot with ``rows`` under the next version, in one
+    transaction; None, publishing nothing, when the content is no longer
+    the one they were rendered from
+    """
+    using = router.db_for_write(PortfolioSnapshot)
+    with transaction.atomic(using=using):
+        # Writers wait on this transaction's lock from here on
+        if model_states(CONTENT_MODELS) != states:
+            return None
+        queryset = PortfolioSnapshot.objects.using(using)
+        version = (queryset.aggregate(version=Max('version'))['version'] or 0) + 1
+        for row in rows:
+            row.version = version
+        with connections[using].cursor() as cursor:
+            # Without the delete signals QuerySet.delete() would load every row
+            cursor.execute(f'DELETE FROM {PortfolioSnapshot._meta.db_table}')
+        queryset.bulk_create(rows, batch_size=500)
+    return version
+
+
+def rebuild():
+    """
+    Render and publish every variant for the ``ORIGINS``.  Returns
+    ``{'version', 'origins', 'rows', 'attempts'}``; the version is None when
+    the content kept changing for ``ATTEMPTS`` renders or there is no origin
+    to render for.
+    """
+    result = {'version': None, 'origins': origins(), 'rows': 0, 'attempts': 0}
+    while result['origins'] and result['attempts'] < get_setting('ATTEMPTS'):
+        result['attempts'] += 1
+        rows, states = render_all(result['origins'])
+        result['version'] = publish(rows, states)
+        if result['version'] is not None:
+            result['rows'] = len(rows)
+            metrics.inc('portfolio_snapshot_rebuilds_total', outcome='published')
+            break
+        metrics.inc('portfolio_snapshot_rebuilds_total', outcome='conflict')
+    return result
+
+
+class SnapshotWorker:
+    """Background thread that rebuilds the snapshot once a burst of writes has settled"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._timer = None
+        self._first_write = None
+        self._running = 0
+
+    def schedule(self):
+        """Rebuild after ``DEBOUNCE_SECONDS`` without another call, ``MAX_DELAY_SECONDS`` from the first at most"""
+        with self._lock:
+            now = time.monotonic()
+            if self._first_write is None:
+                self._first_write = now
+            delay = min(get_setting('DEBOUNCE_SECONDS'), self._first_write + get_setting('MAX_DELAY_SECONDS') - now)
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(max(delay, 0), self._run)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _run(self):
+        with self._lock:
+            # A timer replaced just as it fired
+            if self._timer is not threading.current_thread():
+                return
+            self._timer = None
+            self._first_write = None
+            self._running += 1
+        try:
+            # One rebuild at a time; a later one renders the later content
+            with _rebuild_lock:
+                result = rebuild()
+            if result['version'] is None and result['origins']:
+                self.schedule()
+        except Exception:
+            logger.exception("Rebuilding the portfolio snapshot failed")
+        finally:
+            connections.close_all()
+            with self._lock:
+                self._running -= 1
+                self._idle.notify_all()
+
+    def wait(self, timeout=None):
+        """Block until no rebuild is scheduled or running; False on timeout"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._timer is None and not self._running, timeout)
+
+
+_rebuild_lock = threading.Lock()
+worker = SnapshotWorker()
+
+
+def schedule():
+    """Rebuild on the worker once the current transaction commits"""
+    if get_setting('ENABLED') and get_setting('WORKER') and origins():
+        transaction.on_commit(worker.schedule)
+
+
+
+def snapshot_row(key):
+    return PortfolioSnapshot.objects.filter(pk=key).values_list('fingerprint', 'version', 'status', 'content_type', 'content')
+
+
+def snapshot_hit(endpoint, row, fingerprint):
+    """The response for ``row`` if it is current, else None and a rebuild is scheduled"""
+    if row is None or row[0] != fingerprint:
+        # Details of projects that do not exist are never in it
+        if row is not None or endpoint != 'project-detail':
+            schedule()
+        return None
+    fingerprint, version, status, content_type, content = row
+    response = HttpResponse(bytes(content), status=status, content_type=content_type)
+    response['X-Snapshot-Version'] = str(version)
+    return response
+
+
+def snapshot_response(endpoint, params=()):
+    """
+    Serve the GET and HEAD requests of ``endpoint`` that are snapshot variants from
+    the snapshot, and the rest, or any whose row is stale, from the view.
+    ``params`` lists the query parameters that change the response body.
+    """
+    def decorator(view):
+        if endpoint not in ENDPOINTS:
+            return view
+
+        def lookup_key(request):
+            query = variant_query(request, params)
+            if request.method not in ('GET', 'HEAD') or not get_setting('ENABLED') or query not in ENDPOINTS[endpoint][1]:
+                return None
+            # Only the configured origins are rendered: a Host header is
+            # whatever the client sends
+            origin = request_origin(request)
+            if origin not in origins():
+                return None
+            return snapshot_key(origin, request.path, query)
+
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                key = lookup_key(request)
+                if key is not None:
+                    row = await snapshot_row(key).afirst()
+                    fingerprint = (await acontent_state(endpoint))[0]
+                    response = snapshot_hit(endpoint, row, fingerprint)
+                    if response is not None:
+                        return response
+                return await view(request, *args, **kwargs)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            key = lookup_key(request)
+            if key is not None:
+                response = snapshot_hit(endpoint, snapshot_row(key).first(), content_state(endpoint)[0])
+                if response is not None:
+                    return response
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,25 @@
+import os
+
+from django import template
+
+from portfolio.bundle import MANIFEST, OUTPUT_DIR, frontend_dir, read_manifest
+
+
+register = template.Library()
+
+_manifest = {'mtime': None, 'data': {}}
+
+
+@register.simple_tag
+def frontend_bundle():
+    """The build_frontend manifest, or an empty dict when no bundle has been built"""
+    path = frontend_dir() / OUTPUT_DIR / MANIFEST
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return {}
+    # Re-read only after a rebuild
+    if _manifest['mtime'] != mtime:
+        _manifest['data'] = read_manifest(path)
+        _manifest['mtime'] = mtime
+    return _manifest['data']
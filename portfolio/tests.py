@@ -1,3 +1,2315 @@
-from django.test import TestCase
+import gzip
+import json
+import os
+import re
+import shutil
+import socketserver
+import sqlite3
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import ExitStack
+from datetime import date, timedelta
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache, caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import OperationalError, connection, connections, router, transaction
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.urls import reverse
+
+from . import bundle
+from . import cache as response_cache
+from . import compression, database, facets, metrics, search, sections, snapshot, views
+from . import timing as timing_module
+from . import outbox
+from .throttling import ContactIPThrottle
+from .models import (
+    Profile, TechnicalSkill, ProfessionalSkill, Technology,
+    Project, Experience, SocialLink, ContactMessage, OutboxEmail, PortfolioSnapshot
+)
+
+
+def create_profile(**kwargs):
+    data = {
+        'name': 'Test User',
+        'title': 'Developer',
+        'intro': 'Intro',
+        'about_journey': 'Journey',
+        'about_interests': 'Interests',
+        'email': 'test@example.com',
+        'location': 'Nairobi',
+        'experience_years': '3+ Years',
+    }
+    data.update(kwargs)
+    return Profile.objects.create(**data)
+
+
+def create_content(projects=3, technologies_per_project=2):
+    """Populate every section with a little content"""
+    profile = create_profile()
+    TechnicalSkill.objects.create(name='Python', level=90)
+    ProfessionalSkill.objects.create(name='Teamwork', icon='users')
+    techs = [
+        Technology.objects.create(name=f'Tech {i}', icon_url=f'https://example.com/{i}.svg')
+        for i in range(technologies_per_project)
+    ]
+    for i in range(projects):
+        project = Project.objects.create(title=f'Project {i}', description='A project', is_featured=True, order=i)
+        project.technologies.set(techs)
+    Experience.objects.create(title='Developer', company='Acme', start_date=date(2020, 1, 1), is_current=True, description='Work')
+    SocialLink.objects.create(name='GitHub', url='https://github.com/example', icon='github')
+    return profile
+
+
+def create_projects(count, technologies_per_project=3):
+    """Bulk-create ``count`` active projects, each tagged with the same technologies"""
+    techs = Technology.objects.bulk_create(
+        Technology(name=f'Bulk tech {i}', icon_url=f'https://example.com/bulk-{i}.svg')
+        for i in range(technologies_per_project)
+    )
+    projects = Project.objects.bulk_create(
+        Project(title=f'Bulk project {i}', description='Generated', is_featured=i % 2 == 0, order=i)
+        for i in range(count)
+    )
+    Through = Project.technologies.through
+    Through.objects.bulk_create(
+        Through(project_id=project.pk, technology_id=tech.pk)
+        for project in projects for tech in techs
+    )
+    return projects
+
+
+class PortfolioTestCase(TestCase):
+    def setUp(self):
+        for alias in settings.CACHES:
+            caches[alias].clear()
+        response_cache.stats.reset()
+        metrics.registry.reset()
+
+
+class BootstrapViewTests(PortfolioTestCase):
+    def test_returns_every_section(self):
+        create_content()
+        response = self.client.get(reverse('bootstrap'))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(set(data), {'profile', 'skills', 'projects', 'experience', 'contact'})
+        self.assertEqual(data['profile']['name'], 'Test User')
+        self.assertEqual(data['skills']['technical'][0]['name'], 'Python')
+        self.assertEqual(len(data['projects']), 3)
+        self.assertEqual(data['projects'][0]['technologies'], ['Tech 0', 'Tech 1'])
+        self.assertEqual(data['experience'][0]['period'], '2020 - Present')
+        self.assertEqual(data['contact']['social'][0]['name'], 'GitHub')
+
+    def test_query_count_does_not_grow_with_content(self):
+        # One validator query plus one query per table (two for projects)
+        create_content(projects=2)
+        with self.assertNumQueries(9):
+            self.client.get(reverse('bootstrap'))
+        with self.captureOnCommitCallbacks(execute=True):
+            create_content(projects=20, technologies_per_project=5)
+        with self.assertNumQueries(9):
+            self.client.get(reverse('bootstrap'))
+
+    def test_projects_match_the_home_page_list(self):
+        create_content(projects=8)
+        Project.objects.filter(title__in=['Project 0', 'Project 5']).update(is_featured=False)
+        data = self.client.get(reverse('bootstrap')).json()
+        page = self.client.get(reverse('projects') + '?limit=6').json()
+        self.assertEqual(data['projects'], page['results'])
+        self.assertEqual(len(data['projects']), 6)
+
+    def test_empty_database(self):
+        data = self.client.get(reverse('bootstrap')).json()
+        self.assertIsNone(data['profile'])
+        self.assertEqual(data['projects'], [])
+        self.assertIsNone(data['contact']['email'])
+
+
+class ResponseCacheTests(PortfolioTestCase):
+    def test_second_read_is_served_without_queries(self):
+        create_content()
+        first = self.client.get(reverse('projects'))
+        self.assertEqual(first['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            second = self.client.get(reverse('projects'))
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(response_cache.stats.as_dict()['hits'], 1)
+        self.assertEqual(response_cache.stats.as_dict()['misses'], 1)
+
+    def test_query_params_are_part_of_the_key(self):
+        create_content()
+        Project.objects.create(title='Side project', description='Not featured')
+        all_projects = self.client.get(reverse('projects')).json()
+        featured = self.client.get(reverse('projects'), {'featured': 'true'}).json()
+        self.assertEqual(len(all_projects['results']), 4)
+        self.assertEqual(len(featured['results']), 3)
+
+    def test_save_invalidates_dependent_endpoints(self):
+        profile = create_content()
+        self.client.get(reverse('profile'))
+        self.client.get(reverse('skills'))
+        profile.name = 'Renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save()
+        response = self.client.get(reverse('profile'))
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['name'], 'Renamed')
+        self.assertEqual(self.client.get(reverse('skills'))['X-Cache'], 'HIT')
+
+    def test_versions_are_bumped_once_the_write_commits(self):
+        profile = create_content()
+        versions = response_cache.get_versions(['Profile'])
+        with self.captureOnCommitCallbacks() as callbacks:
+            profile.save()
+            # A concurrent read still sees the old row and must not cache it under a new version
+            self.assertEqual(response_cache.get_versions(['Profile']), versions)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(response_cache.get_versions(['Profile']), versions)
+
+    def test_delete_invalidates(self):
+        create_content()
+        self.client.get(reverse('contact-info'))
+        with self.captureOnCommitCallbacks(execute=True):
+            SocialLink.objects.all().delete()
+        response = self.client.get(reverse('contact-info'))
+        self.assertEqual(response.json()['social'], [])
+
+    def test_m2m_change_invalidates_projects(self):
+        create_content(projects=1)
+        self.client.get(reverse('projects'))
+        project = Project.objects.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            project.technologies.clear()
+        response = self.client.get(reverse('projects'))
+        self.assertEqual(response.json()['results'][0]['technologies'], [])
+
+    def test_writes_are_not_cached(self):
+        create_content()
+        response = self.client.put(reverse('contact-info'), {'email': 'new@example.com'}, content_type='application/json')
+        self.assertFalse(response.has_header('X-Cache'))
+        self.assertEqual(self.client.get(reverse('contact-info')).json()['email'], 'new@example.com')
+
+
+class ConditionalGetTests(PortfolioTestCase):
+    def test_validators_and_cache_control(self):
+        create_content()
+        response = self.client.get(reverse('profile'))
+        self.assertTrue(response['ETag'].startswith('"'))
+        self.assertTrue(response.has_header('Last-Modified'))
+        self.assertIn('max-age=300', response['Cache-Control'])
+        self.assertIn('stale-while-revalidate=86400', response['Cache-Control'])
+
+    def test_if_none_match_short_circuits(self):
+        create_content()
+        etag = self.client.get(reverse('projects'))['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('projects'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_if_modified_since(self):
+        create_content()
+        last_modified = self.client.get(reverse('experience'))['Last-Modified']
+        response = self.client.get(reverse('experience'), HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_depends_on_query_params(self):
+        create_content()
+        plain = self.client.get(reverse('projects'))['ETag']
+        featured = self.client.get(reverse('projects'), {'featured': 'true'})['ETag']
+        self.assertNotEqual(plain, featured)
+
+    def test_etag_changes_on_delete_and_m2m_change(self):
+        create_content()
+        etag = self.client.get(reverse('projects'))['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Project.objects.first().technologies.clear()
+        changed = self.client.get(reverse('projects'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            Project.objects.last().delete()
+        response = self.client.get(reverse('projects'), HTTP_IF_NONE_MATCH=changed['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+
+class ProjectQueryBudgetTests(PortfolioTestCase):
+    def count_queries(self, url, **params):
+        cache.clear()
+        # As the commit of the new content would
+        facets.refresh()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def assert_constant_queries(self, url, **params):
+        counts = []
+        for total in (10, 100, 1000):
+            Project.objects.all().delete()
+            create_projects(total)
+            counts.append(self.count_queries(url, **params))
+        self.assertEqual(len(set(counts)), 1, f'query count grew with project count: {counts}')
+        return counts[0]
+
+    def test_list_query_budget(self):
+        self.assertLessEqual(self.assert_constant_queries(reverse('projects')), 5)
+
+    def test_featured_list_query_budget(self):
+        self.assertLessEqual(self.assert_constant_queries(reverse('projects'), featured='true', limit=6), 5)
+
+    def test_technology_filter_query_budget(self):
+        self.assertLessEqual(self.assert_constant_queries(reverse('projects'), tech='Bulk tech 0,Bulk tech 1'), 5)
+
+    def test_bootstrap_query_budget(self):
+        self.assertLessEqual(self.assert_constant_queries(reverse('bootstrap')), 9)
+
+    def test_detail_query_budget(self):
+        project = create_projects(1, technologies_per_project=50)[0]
+        self.assertLessEqual(self.count_queries(reverse('project-detail', args=[project.pk])), 3)
+
+    def test_admin_changelist_query_budget(self):
+        User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.login(username='admin', password='password')
+        counts = []
+        for total in (10, 1000):
+            Project.objects.all().delete()
+            create_projects(total)
+            counts.append(self.count_queries(reverse('admin:portfolio_project_changelist')))
+        self.assertEqual(counts[0], counts[1])
+
+
+class KeysetPaginationTests(PortfolioTestCase):
+    def setUp(self):
+        super().setUp()
+        # Ties on every key but the last, so the pk has to break them
+        Project.objects.bulk_create(
+            Project(title=f'Project {i}', description='Generated', is_featured=i % 3 == 0, order=i % 2)
+            for i in range(7)
+        )
+        self.expected = list(Project.objects.order_by('-is_featured', 'order', '-created_at', '-id').values_list('title', flat=True))
+
+    def walk(self, url, link='next'):
+        titles, pages = [], 0
+        while url:
+            data = self.client.get(url).json()
+            titles += [project['title'] for project in data['results']]
+            pages += 1
+            url = data[link]
+        return titles, pages
+
+    def test_walks_forward_and_back_in_order(self):
+        titles, pages = self.walk(reverse('projects') + '?limit=2')
+        self.assertEqual(titles, self.expected)
+        self.assertEqual(pages, 4)
+
+        last = self.client.get(reverse('projects') + '?limit=2').json()
+        while last['next']:
+            last = self.client.get(last['next']).json()
+        self.assertIsNone(last['next'])
+        pages = [last['results']]
+        url = last['previous']
+        while url:
+            data = self.client.get(url).json()
+            pages.insert(0, data['results'])
+            url = data['previous']
+        self.assertEqual([project['title'] for page in pages for project in page], self.expected)
+
+    def test_first_page_has_no_previous(self):
+        data = self.client.get(reverse('projects'), {'featured': 'true', 'limit': 2}).json()
+        self.assertEqual(len(data['results']), 2)
+        self.assertIsNone(data['previous'])
+        self.assertIn('featured=true', data['next'])
+        self.assertIn('limit=2', data['next'])
+        titles, _ = self.walk(data['next'])
+        self.assertEqual(len(data['results']) + len(titles), Project.objects.filter(is_featured=True).count())
+
+    def test_invalid_cursor_is_404(self):
+        for cursor in ('bogus', 'e30=', 'eyJwb3NpdGlvbiI6WzFdfQ=='):
+            response = self.client.get(reverse('projects'), {'cursor': cursor})
+            self.assertEqual(response.status_code, 404, cursor)
+            self.assertEqual(response.json(), {'detail': 'Invalid cursor'})
+
+    def test_deep_page_costs_the_same_and_counts_nothing(self):
+        Project.objects.all().delete()
+        create_projects(300)
+        url = reverse('projects') + '?limit=10'
+        counts = []
+        for _ in range(20):
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                data = self.client.get(url).json()
+            counts.append(len(queries))
+            # The conditional GET validators count rows too; the page itself must not
+            page_queries = [query['sql'] for query in queries.captured_queries if 'MAX(updated_at)' not in query['sql']]
+            self.assertFalse([sql for sql in page_queries if 'COUNT(' in sql or 'OFFSET' in sql], page_queries)
+            url = data['next']
+        self.assertEqual(len(set(counts[1:])), 1, counts)
+        self.assertLessEqual(counts[-1], counts[0] + 1)
+
+    def test_experience_pages(self):
+        for i in range(5):
+            Experience.objects.create(
+                title=f'Role {i}', company='Acme', start_date=date(2020, 1 + i % 2, 1), description='Work', order=i % 2,
+            )
+        expected = list(Experience.objects.order_by('order', '-start_date', '-id').values_list('title', flat=True))
+        titles, pages = self.walk(reverse('experience') + '?limit=2')
+        self.assertEqual(titles, expected)
+        self.assertEqual(pages, 3)
+
+
+class SeedPortfolioCommandTests(PortfolioTestCase):
+    def test_seeds_empty_sections_once(self):
+        call_command('seed_portfolio', stdout=StringIO())
+        counts = [model.objects.count() for model in (Profile, TechnicalSkill, Project, Experience)]
+        self.assertEqual(counts, [1, 5, 3, 3])
+        call_command('seed_portfolio', stdout=StringIO())
+        self.assertEqual([model.objects.count() for model in (Profile, TechnicalSkill, Project, Experience)], counts)
+
+    def test_keeps_existing_content(self):
+        create_profile(name='Existing')
+        call_command('seed_portfolio', stdout=StringIO())
+        self.assertEqual(list(Profile.objects.values_list('name', flat=True)), ['Existing'])
+        self.assertEqual(TechnicalSkill.objects.count(), 5)
+
+    def test_seeding_invalidates_cached_responses(self):
+        self.assertEqual(self.client.get(reverse('skills')).json()['technical'], [])
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('seed_portfolio', stdout=StringIO())
+        self.assertEqual(len(self.client.get(reverse('skills')).json()['technical']), 5)
+
+
+class ReadPathTests(PortfolioTestCase):
+    def test_reads_never_write(self):
+        for name in ('profile', 'skills', 'projects', 'experience', 'contact-info', 'bootstrap'):
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse(name))
+            self.assertTrue(all(query['sql'].startswith('SELECT') for query in queries), name)
+        self.assertFalse(Profile.objects.exists())
+        self.assertFalse(TechnicalSkill.objects.exists())
+
+    def test_missing_profile_is_404(self):
+        self.assertEqual(self.client.get(reverse('profile')).status_code, 404)
+
+    def test_put_creates_missing_profile(self):
+        data = {
+            'name': 'New', 'title': 'Dev', 'intro': 'Hi', 'about_journey': 'J', 'about_interests': 'I',
+            'email': 'new@example.com', 'location': 'Here', 'experience_years': '1',
+        }
+        response = self.client.put(reverse('profile'), data, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Profile.objects.get().name, 'New')
+
+
+class BulkSyncTests(PortfolioTestCase):
+    def put(self, name, data):
+        return self.client.put(reverse(name), data, content_type='application/json')
+
+    def test_skills_put_keeps_matching_rows(self):
+        python = TechnicalSkill.objects.create(name='Python', level=50)
+        TechnicalSkill.objects.create(name='Cobol', level=10)
+        response = self.put('skills', {'technical': [{'name': 'Python', 'level': 95}, {'name': 'Go', 'level': 60}]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            sorted(TechnicalSkill.objects.values_list('name', 'level')), [('Go', 60), ('Python', 95)]
+        )
+        self.assertEqual(TechnicalSkill.objects.get(name='Python').pk, python.pk)
+
+    def test_projects_put_syncs_technologies(self):
+        create_content(projects=2)
+        project = Project.objects.get(title='Project 0')
+        response = self.put('projects', {'projects': [
+            {'id': project.pk, 'title': 'Renamed', 'description': 'Changed', 'technologies': ['Tech 1']},
+            {'title': 'Project 1', 'description': 'A project', 'technologies': ['Tech 0', 'Tech 1']},
+            {'title': 'Brand new', 'description': 'New', 'technologies': []},
+        ]})
+        self.assertEqual(response.status_code, 200)
+        project.refresh_from_db()
+        self.assertEqual(project.title, 'Renamed')
+        self.assertEqual([tech.name for tech in project.technologies.all()], ['Tech 1'])
+        self.assertEqual(Project.objects.count(), 3)
+        self.assertFalse(Project.objects.get(title='Brand new').technologies.exists())
+
+    def test_unchanged_rows_are_not_written(self):
+        create_content(projects=3)
+        items = [
+            {'title': p.title, 'description': p.description, 'technologies': ['Tech 0', 'Tech 1']}
+            for p in Project.objects.all()
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            self.put('projects', {'projects': items})
+        writes = [q['sql'] for q in queries if not q['sql'].startswith(('SELECT', 'SAVEPOINT', 'RELEASE'))]
+        self.assertEqual(writes, [])
+
+    def test_update_stamps_updated_at_and_invalidates_cache(self):
+        create_content()
+        link = SocialLink.objects.get()
+        self.client.get(reverse('contact-info'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.put('contact-info', {'social': [{'name': 'GitHub', 'url': 'https://github.com/other', 'icon': 'github'}]})
+        self.assertGreater(SocialLink.objects.get().updated_at, link.updated_at)
+        self.assertEqual(self.client.get(reverse('contact-info')).json()['social'][0]['url'], 'https://github.com/other')
+
+    def test_invalid_item_rolls_back(self):
+        TechnicalSkill.objects.create(name='Python', level=50)
+        response = self.put('skills', {'technical': [{'name': 'Go', 'level': 'high'}]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(TechnicalSkill.objects.values_list('name', flat=True)), ['Python'])
+
+    def test_unknown_technology_is_rejected(self):
+        response = self.put('projects', {'projects': [{'title': 'X', 'description': 'Y', 'technologies': ['Nope']}]})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Project.objects.exists())
+
+
+class StubSMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP to accept messages from Django's SMTP backend"""
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply('220 localhost stub ready')
+        while True:
+            line = self.rfile.readline().decode().strip()
+            command = line[:4].upper()
+            if not line or command == 'QUIT':
+                self.reply('221 bye')
+                return
+            if command == 'EHLO':
+                self.reply('250-localhost')
+                self.reply('250 8BITMIME')
+            elif command == 'DATA':
+                self.reply('354 go ahead')
+                lines = []
+                while (data := self.rfile.readline()) not in (b'.\r\n', b''):
+                    lines.append(data)
+                self.server.messages.append(b''.join(lines))
+                self.reply('250 queued')
+            else:
+                self.reply('250 ok')
+
+
+class StubSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubSMTPHandler)
+        self.connections = 0
+        self.messages = []
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+
+def contact_payload(**kwargs):
+    data = {'name': 'Visitor', 'email': 'visitor@example.com', 'subject': 'Hello there', 'message': 'A long enough message'}
+    data.update(kwargs)
+    return data
+
+
+@override_settings(PORTFOLIO_OUTBOX={'WORKER': False, 'MAX_ATTEMPTS': 2, 'BACKOFF_SECONDS': 30})
+class OutboxTests(PortfolioTestCase):
+    def test_post_only_queues_the_email(self):
+        response = self.client.post(reverse('send-message'), contact_payload(), content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(mail.outbox, [])
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.status, 'pending')
+        self.assertEqual(email.contact_message.pk, response.json()['id'])
+        self.assertEqual(email.contact_message.notification_status, 'pending')
+
+    def test_deliver_batch_sends_and_records_state(self):
+        self.client.post(reverse('send-message'), contact_payload(), content_type='application/json')
+        self.assertEqual(outbox.deliver_batch(), {'sent': 1, 'failed': 0})
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, 'Portfolio Contact: Hello there')
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.status, 'sent')
+        self.assertIsNotNone(email.sent_at)
+        self.assertEqual(email.contact_message.notification_status, 'sent')
+        self.assertEqual(outbox.deliver_batch(), {'sent': 0, 'failed': 0})
+
+    def test_batch_reuses_one_smtp_connection(self):
+        for i in range(3):
+            self.client.post(reverse('send-message'), contact_payload(subject=f'Subject {i}'), content_type='application/json')
+        with StubSMTPServer() as server:
+            with self.settings(
+                EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+                EMAIL_HOST='127.0.0.1', EMAIL_PORT=server.server_address[1],
+                EMAIL_USE_TLS=False, EMAIL_HOST_USER='', EMAIL_HOST_PASSWORD='',
+            ):
+                result = outbox.deliver_batch()
+        self.assertEqual(result, {'sent': 3, 'failed': 0})
+        self.assertEqual(server.connections, 1)
+        self.assertEqual(len(server.messages), 3)
+
+    def test_unreachable_server_retries_with_backoff_then_fails(self):
+        self.client.post(reverse('send-message'), contact_payload(), content_type='application/json')
+        with StubSMTPServer() as server:
+            port = server.server_address[1]
+        smtp = {
+            'EMAIL_BACKEND': 'django.core.mail.backends.smtp.EmailBackend',
+            'EMAIL_HOST': '127.0.0.1', 'EMAIL_PORT': port, 'EMAIL_USE_TLS': False, 'EMAIL_TIMEOUT': 1,
+        }
+        with self.settings(**smtp), self.assertLogs('portfolio.outbox', 'WARNING'):
+            self.assertEqual(outbox.deliver_batch(), {'sent': 0, 'failed': 1})
+            email = OutboxEmail.objects.get()
+            self.assertEqual((email.status, email.attempts), ('pending', 1))
+            self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=25))
+            # Not due yet
+            self.assertEqual(outbox.deliver_batch(), {'sent': 0, 'failed': 0})
+            OutboxEmail.objects.update(next_attempt_at=timezone.now())
+            outbox.deliver_batch()
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('failed', 2))
+        self.assertTrue(email.last_error)
+        self.assertEqual(ContactMessage.objects.get().notification_status, 'failed')
+        # Retrying from the admin queues the message again
+        User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.login(username='admin', password='password')
+        self.client.post(reverse('admin:portfolio_outboxemail_changelist'), {
+            'action': 'retry_now', '_selected_action': [email.pk],
+        })
+        self.assertEqual(OutboxEmail.objects.get().status, 'pending')
+        self.assertEqual(ContactMessage.objects.get().notification_status, 'pending')
+
+    def test_expired_lease_is_reclaimed(self):
+        self.client.post(reverse('send-message'), contact_payload(), content_type='application/json')
+        self.assertEqual(len(outbox.claim_batch(10)), 1)
+        self.assertEqual(outbox.claim_batch(10), [])
+        OutboxEmail.objects.update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(len(outbox.claim_batch(10)), 1)
+
+    def test_process_outbox_command(self):
+        self.client.post(reverse('send-message'), contact_payload(), content_type='application/json')
+        out = StringIO()
+        call_command('process_outbox', stdout=out)
+        self.assertIn('Sent 1 email(s)', out.getvalue())
+        self.assertEqual(len(mail.outbox), 1)
+
+
+@override_settings(PORTFOLIO_OUTBOX={'WORKER': True})
+class OutboxWorkerTests(TransactionTestCase):
+    def test_worker_delivers_after_commit(self):
+        response = self.client.post(reverse('send-message'), contact_payload(), content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        deadline = time.monotonic() + 5
+        # The email reaches mail.outbox just before its row is marked sent
+        while time.monotonic() < deadline and OutboxEmail.objects.get().status != 'sent':
+            time.sleep(0.05)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(OutboxEmail.objects.get().status, 'sent')
+
+
+class ThrottleTests(PortfolioTestCase):
+    def post_contact(self, ip='10.0.0.1', **kwargs):
+        return self.client.post(
+            reverse('send-message'), contact_payload(**kwargs), content_type='application/json', REMOTE_ADDR=ip
+        )
+
+    def test_contact_is_limited_per_ip(self):
+        for i in range(5):
+            self.assertEqual(self.post_contact(email=f'user{i}@example.com').status_code, 201)
+        response = self.post_contact(email='other@example.com')
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+        self.assertEqual(self.post_contact(ip='10.0.0.2').status_code, 201)
+        self.assertEqual(ContactMessage.objects.count(), 6)
+
+    def test_contact_is_limited_per_email(self):
+        for i in range(3):
+            self.assertEqual(self.post_contact(ip=f'10.0.1.{i}').status_code, 201)
+        self.assertEqual(self.post_contact(ip='10.0.1.9', email='VISITOR@example.com').status_code, 429)
+
+    def test_reads_are_not_throttled(self):
+        create_content()
+        for _ in range(40):
+            self.assertEqual(self.client.get(reverse('skills')).status_code, 200)
+
+    def test_sliding_window_weights_previous_window(self):
+        throttle = ContactIPThrottle()
+        window = throttle.window
+        start = 1000 * window
+        for _ in range(5):
+            self.assertTrue(throttle.hit('key', start + 0.5 * window)[0])
+        # Halfway through the next window half of the previous count remains
+        allowed = [throttle.hit('key', start + 1.5 * window)[0] for _ in range(3)]
+        self.assertEqual(allowed, [True, True, False])
+        # Retries are rejected without counting, so the window still slides
+        for _ in range(10):
+            self.assertFalse(throttle.hit('key', start + 1.55 * window)[0])
+        self.assertTrue(throttle.hit('key', start + 1.6 * window)[0])
+        self.assertFalse(throttle.hit('key', start + 1.6 * window)[0])
+
+    def test_retry_after_points_at_the_next_free_slot(self):
+        throttle = ContactIPThrottle()
+        window = throttle.window
+        start = 1000 * window
+        for _ in range(5):
+            throttle.hit('key', start)
+        allowed, retry_after = throttle.hit('key', start + 0.5 * window)
+        self.assertFalse(allowed)
+        self.assertTrue(throttle.hit('key', start + 0.5 * window + retry_after + 0.01)[0])
+
+
+class ExportStaticSiteTests(PortfolioTestCase):
+    def setUp(self):
+        super().setUp()
+        self.output = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.output, ignore_errors=True)
+
+    def export(self, *args):
+        out = StringIO()
+        call_command('export_static_site', '--output', str(self.output), *args, stdout=out)
+        return out.getvalue()
+
+    def test_exports_page_api_and_hashed_assets(self):
+        create_content()
+        self.export()
+        html = (self.output / 'index.html').read_text()
+        self.assertIn('id="portfolio-data"', html)
+        self.assertIn('Test User', html)
+        self.assertNotIn('src="/frontend/js/main.js"', html)
+        main_js = list((self.output / 'frontend' / 'js').glob('main.*.js'))
+        self.assertEqual(len(main_js), 1)
+        self.assertIn(f'/frontend/js/{main_js[0].name}', html)
+
+        projects = json.loads((self.output / 'api' / 'projects.json').read_text())
+        self.assertEqual(len(projects['results']), 3)
+        self.assertIsNone(projects['next'])
+        detail = self.output / 'api' / 'projects' / f"{projects['results'][0]['id']}.json"
+        self.assertEqual(json.loads(detail.read_text())['title'], projects['results'][0]['title'])
+        gz = self.output / 'api' / 'skills.json.gz'
+        self.assertEqual(gzip.decompress(gz.read_bytes()), (self.output / 'api' / 'skills.json').read_bytes())
+        self.assertTrue((self.output / 'index.html.gz').exists())
+
+    def test_incremental_rewrites_only_changed_artifacts(self):
+        create_content()
+        self.export()
+        self.assertIn(': 0 written', self.export('--incremental'))
+        SocialLink.objects.update(url='https://github.com/changed')
+        with self.captureOnCommitCallbacks(execute=True):
+            SocialLink.objects.first().save()
+        output = self.export('--incremental')
+        self.assertIn('wrote api/contact.json', output)
+        self.assertIn('wrote api/bootstrap.json', output)
+        self.assertNotIn('wrote api/skills.json', output)
+        self.assertIn('github.com/changed', (self.output / 'api' / 'contact.json').read_text())
+
+    def test_featured_variant(self):
+        create_content()
+        Project.objects.filter(title='Project 0').update(is_featured=False)
+        self.export()
+        featured = json.loads((self.output / 'api' / 'projects.featured-true.json').read_text())
+        self.assertEqual([project['title'] for project in featured['results']], ['Project 1', 'Project 2'])
+        self.assertEqual(featured['facets']['total'], 2)
+        self.assertEqual(len(json.loads((self.output / 'api' / 'projects.json').read_text())['results']), 3)
+
+    def test_earlier_hashed_copies_are_removed(self):
+        media = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, media)
+        (media / 'favicon.ico').write_bytes(b'\x00\x00\x01\x00')
+        with self.settings(MEDIA_ROOT=str(media)):
+            self.export()
+            first = list((self.output / 'media').glob('favicon.*.ico'))
+            self.assertEqual(len(first), 1)
+            # Binary, so neither rewritten nor precompressed
+            self.assertEqual(list((self.output / 'media').glob('*.gz')), [])
+            (media / 'favicon.ico').write_bytes(b'\x00\x00\x01\x00\x01')
+            self.export('--incremental')
+        second = list((self.output / 'media').glob('favicon.*.ico'))
+        self.assertEqual(len(second), 1)
+        self.assertNotEqual(second, first)
+        main_js = list((self.output / 'frontend' / 'js').glob('main.*.js*'))
+        self.assertEqual(len(main_js), 2)
+
+    def test_removed_projects_are_deleted(self):
+        create_content()
+        self.export()
+        project = Project.objects.first()
+        project.delete()
+        self.export('--incremental')
+        self.assertFalse((self.output / 'api' / 'projects' / f'{project.pk}.json').exists())
+
+
+def image_upload(name='photo.png', size=(1000, 600), mode='RGB'):
+    from PIL import Image
+    buffer = BytesIO()
+    Image.new(mode, size, 'red').save(buffer, format='PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+@override_settings(PORTFOLIO_IMAGES={'WORKER': False, 'WIDTHS': (160, 320, 640, 1280)})
+class ImageVariantsTests(PortfolioTestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        override = self.settings(MEDIA_ROOT=media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.media_root = Path(media_root)
+
+    def test_upload_generates_variants_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            project = Project.objects.create(title='Pic', description='d', image=image_upload())
+        # The variants, and the response cache's invalidation
+        self.assertEqual(len(callbacks), 2)
+        # The commit, with the callbacks those register in turn
+        with self.captureOnCommitCallbacks(execute=True):
+            for callback in callbacks:
+                callback()
+        project.refresh_from_db()
+        variants = project.image_variants['variants']
+        self.assertEqual(project.image_variants['source'], project.image.name)
+        # Never upscaled past the 1000px original
+        self.assertEqual(sorted({v['width'] for v in variants}), [160, 320, 640, 1000])
+        self.assertEqual({v['format'] for v in variants}, {'webp', 'jpeg'})
+        for variant in variants:
+            self.assertTrue((self.media_root / variant['name']).exists())
+        self.assertEqual(variants[0]['height'], 96)
+
+    def test_serializer_exposes_srcset_groups(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Project.objects.create(title='Pic', description='d', image=image_upload(), is_featured=True)
+        project = self.client.get(reverse('projects')).json()['results'][0]
+        webp, jpeg = project['image_variants']
+        self.assertEqual(webp['type'], 'image/webp')
+        self.assertEqual(jpeg['type'], 'image/jpeg')
+        self.assertEqual([entry['width'] for entry in jpeg['srcset']], [160, 320, 640, 1000])
+        self.assertTrue(jpeg['srcset'][0]['url'].startswith('http://testserver/media/derivatives/projects/'))
+
+    def test_transparent_images_are_flattened(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            profile = create_profile(profile_image=image_upload(mode='RGBA', size=(200, 200)))
+        profile.refresh_from_db()
+        self.assertEqual([v['width'] for v in profile.profile_image_variants['variants']], [160, 160, 200, 200])
+
+    def test_replacing_image_removes_old_variants(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            project = Project.objects.create(title='Pic', description='d', image=image_upload('first.png'))
+        project.refresh_from_db()
+        old_names = [v['name'] for v in project.image_variants['variants']]
+        with self.captureOnCommitCallbacks(execute=True):
+            project.image = image_upload('second.png', size=(300, 200))
+            project.save()
+        project.refresh_from_db()
+        self.assertIn('second', project.image_variants['source'])
+        for name in old_names:
+            self.assertFalse((self.media_root / name).exists())
+
+    def test_unchanged_image_is_not_regenerated(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            project = Project.objects.create(title='Pic', description='d', image=image_upload())
+        project.refresh_from_db()
+        with self.captureOnCommitCallbacks() as callbacks:
+            project.title = 'Renamed'
+            project.save()
+        # Only the response cache's invalidation
+        self.assertEqual(len(callbacks), 1)
+
+    def test_backfill_command(self):
+        with self.captureOnCommitCallbacks():
+            project = Project.objects.create(title='Pic', description='d', image=image_upload())
+        self.assertEqual(Project.objects.get(pk=project.pk).image_variants, {})
+        out = StringIO()
+        call_command('generate_image_variants', '--workers', '2', stdout=out)
+        self.assertIn('Processed 1 image(s), 0 failed', out.getvalue())
+        self.assertEqual(len(Project.objects.get(pk=project.pk).image_variants['variants']), 8)
+        out = StringIO()
+        call_command('generate_image_variants', stdout=out)
+        self.assertIn('up to date', out.getvalue())
+
+
+class MediaViewTests(PortfolioTestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        override = self.settings(MEDIA_ROOT=media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.content = bytes(range(256)) * 40
+        (Path(media_root) / 'resume').mkdir()
+        (Path(media_root) / 'resume' / 'cv.pdf').write_bytes(self.content)
+        self.url = '/media/resume/cv.pdf'
+
+    def body(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_full_response_with_validators(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), self.content)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response['Content-Length'], str(len(self.content)))
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('ETag', response)
+        self.assertIn('max-age=3600', response['Cache-Control'])
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_range_requests(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 100-199/{len(self.content)}')
+        self.assertEqual(self.body(response), self.content[100:200])
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-10')
+        self.assertEqual(self.body(response), self.content[-10:])
+
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={len(self.content)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.content)}')
+
+    def test_stale_if_range_returns_whole_file(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag)
+        self.assertEqual(response.status_code, 206)
+
+    def test_versioned_urls_are_immutable(self):
+        profile = create_profile(resume_file='resume/cv.pdf')
+        resume_url = self.client.get(reverse('contact-info')).json()['resume_url']
+        self.assertRegex(resume_url, r'^/media/resume/cv\.pdf\?v=[0-9a-f]+$')
+        response = self.client.get(resume_url)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('max-age=31536000', response['Cache-Control'])
+        self.assertEqual(profile.resume_file.name, 'resume/cv.pdf')
+        for url in (self.url + '?v=0', self.url + '?v='):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('immutable', response['Cache-Control'])
+            self.assertIn('max-age=3600', response['Cache-Control'])
+        response = self.client.get(resume_url, HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertIn('immutable', response['Cache-Control'])
+        response = self.client.get(resume_url, HTTP_RANGE=f'bytes={len(self.content)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+    @override_settings(PORTFOLIO_MEDIA={'SENDFILE_HEADER': 'X-Accel-Redirect', 'SENDFILE_URL': '/protected/'})
+    def test_sendfile_offload(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected/resume/cv.pdf')
+        self.assertEqual(response.content, b'')
+        self.assertIn('ETag', response)
+
+    def test_rejects_traversal_and_missing_files(self):
+        self.assertEqual(self.client.get('/media/../settings.py').status_code, 404)
+        self.assertEqual(self.client.get('/media/resume/missing.pdf').status_code, 404)
+        self.assertEqual(self.client.get('/media/resume/').status_code, 404)
+
+
+class BuildFrontendTests(PortfolioTestCase):
+    def setUp(self):
+        super().setUp()
+        base_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, base_dir, ignore_errors=True)
+        shutil.copytree(Path(settings.BASE_DIR) / 'frontend', base_dir / 'frontend', ignore=shutil.ignore_patterns('dist'))
+        override = self.settings(BASE_DIR=base_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.frontend = base_dir / 'frontend'
+
+    def test_purge_css_keeps_only_used_rules(self):
+        css = """
+            /* comment */
+            .used, .unused { color: red; }
+            .unused-only { color: blue; }
+            .md\\:w-80:hover > span { width: 20rem; }
+            @media (max-width: 768px) { .used { margin: 0 } .gone { margin: 1px } }
+            @media print { .gone { display: none } }
+            .spinner { animation: spin 1s linear infinite; }
+            @keyframes spin { from { transform: rotate(0deg) } to { transform: rotate(360deg) } }
+            @keyframes unused-animation { from { opacity: 0 } to { opacity: 1 } }
+        """
+        used = bundle.used_tokens(['<div class="used md:w-80 spinner">'])
+        self.assertEqual(
+            bundle.purge_css(css, used),
+            '.used{color:red}.md\\:w-80:hover>span{width:20rem}'
+            '@media (max-width: 768px){.used{margin:0}}'
+            '.spinner{animation:spin 1s linear infinite}'
+            '@keyframes spin{from{transform:rotate(0deg)}to{transform:rotate(360deg)}}'
+        )
+
+    def test_minify_js_keeps_literals(self):
+        source = (
+            "// leading comment\n"
+            "const url = 'http://example.com/*not a comment*/';  /* block */\n"
+            "const re = /^[^\\s@]+\\/$/;\n"
+            "const ratio = width / 2 / height;\n"
+            "const html = `<a href=\"//x\">${ok ? `  nested // ${ {a: 1}.a }` : ''}</a>`;\n"
+            "    if (x) {\n\n        return y\n    }\n"
+        )
+        self.assertEqual(bundle.minify_js(source), (
+            "const url = 'http://example.com/*not a comment*/';\n"
+            "const re = /^[^\\s@]+\\/$/;\n"
+            "const ratio = width / 2 / height;\n"
+            "const html = `<a href=\"//x\">${ok ? `  nested // ${ {a: 1}.a }` : ''}</a>`;\n"
+            "if (x) {\n"
+            "return y\n"
+            "}\n"
+        ))
+
+    def test_build_writes_hashed_bundle_and_manifest(self):
+        out = StringIO()
+        call_command('build_frontend', stdout=out)
+        manifest = json.loads((self.frontend / 'dist' / 'manifest.json').read_text())
+        self.assertRegex(manifest['css'], r'^/frontend/dist/app\.[0-9a-f]{12}\.css$')
+        self.assertRegex(manifest['js'], r'^/frontend/dist/app\.[0-9a-f]{12}\.js$')
+        js_path = self.frontend / manifest['js'].removeprefix('/frontend/')
+        js = js_path.read_text()
+        self.assertLess(len(js), sum(len((self.frontend / name).read_text()) for name in bundle.JS_SOURCES))
+        self.assertLess(js.index('class PortfolioUI'), js.index('class PortfolioApp'))
+        gz = js_path.with_name(js_path.name + '.gz')
+        self.assertEqual(gzip.decompress(gz.read_bytes()).decode(), js)
+        self.assertIn('Tailwind is still loaded from the CDN', out.getvalue())
+
+        html = self.client.get(reverse('home')).content.decode()
+        self.assertIn(f'<script src="{manifest["js"]}" defer>', html)
+        self.assertIn(f'href="{manifest["css"]}"', html)
+        self.assertNotIn('/frontend/js/main.js', html)
+
+        # Rebuilding after a change replaces the previous files
+        (self.frontend / 'js' / 'main.js').write_text('console.log(1);\n' + (self.frontend / 'js' / 'main.js').read_text())
+        call_command('build_frontend', stdout=StringIO())
+        self.assertFalse(js_path.exists())
+        self.assertFalse(gz.exists())
+
+    def test_tailwind_stylesheet_replaces_cdn(self):
+        tailwind = self.frontend / 'tailwind.css'
+        tailwind.write_text('.text-blue-600 { color: #2563eb } .text-pink-900 { color: #831843 }')
+        call_command('build_frontend', '--tailwind-css', str(tailwind), stdout=StringIO())
+        manifest = json.loads((self.frontend / 'dist' / 'manifest.json').read_text())
+        css = (self.frontend / manifest['css'].removeprefix('/frontend/')).read_text()
+        self.assertIn('.text-blue-600{color:#2563eb}', css)
+        self.assertNotIn('text-pink-900', css)
+        html = self.client.get(reverse('home')).content.decode()
+        self.assertNotIn('cdn.tailwindcss.com', html)
+
+    def test_page_uses_sources_without_a_build(self):
+        html = self.client.get(reverse('home')).content.decode()
+        self.assertIn('<script src="/frontend/js/main.js"></script>', html)
+        self.assertIn('cdn.tailwindcss.com', html)
+
+
+class CompressionTests(PortfolioTestCase):
+    def setUp(self):
+        super().setUp()
+        compression.body_cache.clear()
+        create_content(projects=5)
+
+    def test_gzip_response_round_trips(self):
+        plain = self.client.get(reverse('bootstrap'))
+        response = self.client.get(reverse('bootstrap'), HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertTrue(response['ETag'].startswith('W/"'))
+
+        revalidated = self.client.get(reverse('bootstrap'), HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_identical_bodies_are_compressed_once(self):
+        for _ in range(3):
+            self.client.get(reverse('bootstrap'), HTTP_ACCEPT_ENCODING='gzip')
+        self.client.get(reverse('bootstrap'), HTTP_ACCEPT_ENCODING='deflate')
+        stats = compression.body_cache.as_dict()
+        self.assertEqual((stats['hits'], stats['misses']), (2, 2))
+
+    @override_settings(PORTFOLIO_COMPRESSION={'CACHE_ENTRIES': 2})
+    def test_cache_is_bounded(self):
+        for i in range(5):
+            compression.body_cache.get_or_compress(b'x' * 1000 + str(i).encode(), 'gzip')
+        self.assertEqual(compression.body_cache.as_dict()['entries'], 2)
+
+    def test_negotiation(self):
+        self.assertEqual(compression.negotiate('gzip;q=0.5, deflate'), 'deflate')
+        self.assertEqual(compression.negotiate('gzip;q=0, identity'), None)
+        self.assertEqual(compression.negotiate('*'), 'br' if compression.brotli else 'gzip')
+        self.assertEqual(compression.negotiate(''), None)
+
+    def test_skips_small_and_non_api_responses(self):
+        response = self.client.get(reverse('contact-info'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertLess(len(response.content), 256)
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        Path(media_root, 'notes.txt').write_text('compressible ' * 100)
+        with self.settings(MEDIA_ROOT=media_root):
+            response = self.client.get('/media/notes.txt', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+
+class RowSerializerTests(PortfolioTestCase):
+    """The values()-based fast path must render exactly what the DRF serializers render"""
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        override = self.settings(MEDIA_ROOT=media_root, PORTFOLIO_IMAGES={'WORKER': False, 'WIDTHS': (160, 320)})
+        override.enable()
+        self.addCleanup(override.disable)
+        with self.captureOnCommitCallbacks(execute=True):
+            create_content(projects=4, technologies_per_project=3)
+            Profile.objects.update(resume_file='resume/cv.pdf', phone='')
+            profile = Profile.objects.get()
+            profile.profile_image = image_upload('me.png', size=(400, 400))
+            profile.save()
+            project = Project.objects.first()
+            project.image = image_upload('shot.png')
+            project.github_url = 'https://github.com/example/shot'
+            project.save()
+        Experience.objects.create(title='Student', company='Uni', start_date=date(2014, 9, 1), end_date=date(2018, 6, 30), description='BSc', experience_type='education')
+        Experience.objects.create(title='Course', company='Online', start_date=date(2019, 1, 1), description='Cert', experience_type='certification')
+        Technology.objects.filter(name='Tech 2').update(order=-1)
+
+    def assert_same_output(self, view_class, url):
+        fast = self.client.get(url)
+        self.assertEqual(fast.status_code, 200)
+        for alias in settings.CACHES:
+            caches[alias].clear()
+        with mock.patch.object(view_class, 'row_serializer', None):
+            slow = self.client.get(url)
+        self.assertEqual(fast.content, slow.content)
+        return fast.json()
+
+    def test_project_list(self):
+        data = self.assert_same_output(views.ProjectListView, reverse('projects'))
+        self.assertEqual(data['results'][0]['technologies'], ['Tech 2', 'Tech 0', 'Tech 1'])
+        self.assert_same_output(views.ProjectListView, reverse('projects') + '?featured=true&limit=2')
+
+    def test_project_detail(self):
+        for project in Project.objects.all():
+            self.assert_same_output(views.ProjectDetailView, reverse('project-detail', args=[project.pk]))
+
+    def test_experience(self):
+        data = self.assert_same_output(views.ExperienceListView, reverse('experience'))
+        self.assertEqual({item['period'] for item in data['results']}, {'2020 - Present', '2014 - 2018', '2019'})
+        self.assert_same_output(views.ExperienceListView, reverse('experience') + '?type=education')
+
+    def test_profile(self):
+        data = self.assert_same_output(views.ProfileView, reverse('profile'))
+        self.assertTrue(data['profile_image'].startswith('http://testserver/media/profile/'))
+        self.assertEqual(len(data['profile_image_variants']), 2)
+
+    def test_missing_rows(self):
+        self.assertEqual(self.client.get(reverse('project-detail', args=[999])).status_code, 404)
+        Profile.objects.all().delete()
+        self.assertEqual(self.client.get(reverse('profile')).status_code, 404)
+
+    def test_bootstrap_sections_match_serializers(self):
+        from .serializers import ExperienceSerializer, ProjectListSerializer
+        projects = Project.objects.filter(is_active=True).prefetch_related('technologies')[:6]
+        self.assertEqual(sections.projects_section(), ProjectListSerializer(projects, many=True).data)
+        experience = Experience.objects.filter(is_active=True)
+        self.assertEqual(sections.experience_section(), ExperienceSerializer(experience, many=True).data)
+
+
+class EndpointBenchmarkTests(PortfolioTestCase):
+    def test_small_scale_stays_within_query_budgets(self):
+        from .management.commands.benchmark_endpoints import QUERY_BUDGETS, run_benchmarks
+        report, violations = run_benchmarks(['small'], requests=2)
+        self.assertEqual(violations, [])
+        self.assertEqual(set(report['small']), set(QUERY_BUDGETS))
+        for name, result in report['small'].items():
+            self.assertEqual(result['cold']['count'], 2)
+            if name != 'send-message':
+                # Warm requests are answered from the response cache
+                self.assertLessEqual(result['warm_queries'], 1, name)
+
+
+@override_settings(PORTFOLIO_TIMING={'SERVER_TIMING': True, 'LOG': True})
+class RequestTimingTests(PortfolioTestCase):
+    def test_server_timing_header(self):
+        create_content()
+        response = self.client.get(reverse('projects'))
+        header = response['Server-Timing']
+        for metric in ('total;dur=', 'db;dur=', 'render;dur=', 'app;dur=', 'cache;desc=MISS'):
+            self.assertIn(metric, header)
+        self.assertRegex(header, r'db;dur=[\d.]+;desc="[1-9]\d* queries"')
+        response = self.client.get(reverse('projects'))
+        self.assertIn('cache;desc=HIT', response['Server-Timing'])
+        response = self.client.get(reverse('projects'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertIn('cache;desc=REVALIDATED', response['Server-Timing'])
+
+    def test_structured_log_record(self):
+        create_content()
+        with self.assertLogs('portfolio.timing', 'INFO') as logs:
+            self.client.get(reverse('experience'))
+        timing = logs.records[0].timing
+        self.assertEqual(timing['endpoint'], 'experience')
+        self.assertEqual(timing['status'], 200)
+        self.assertEqual(timing['cache'], 'MISS')
+        self.assertGreater(timing['queries'], 0)
+        self.assertGreater(timing['render_ms'], 0)
+        self.assertGreaterEqual(timing['total_ms'], timing['db_ms'] + timing['render_ms'])
+        line = json.loads(timing_module.JsonFormatter().format(logs.records[0]))
+        self.assertEqual(line['path'], reverse('experience'))
+
+    @override_settings(PORTFOLIO_TIMING={'SERVER_TIMING': False, 'LOG': False})
+    def test_disabled(self):
+        with self.assertNoLogs('portfolio.timing'):
+            response = self.client.get(reverse('skills'))
+        self.assertFalse(response.has_header('Server-Timing'))
+
+
+@override_settings(PORTFOLIO_METRICS={'TOKEN': 'scrape-token'})
+class MetricsTests(PortfolioTestCase):
+    def scrape(self, **kwargs):
+        kwargs.setdefault('HTTP_AUTHORIZATION', 'Bearer scrape-token')
+        response = self.client.get(reverse('metrics'), **kwargs)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        return response.content.decode()
+
+    def test_request_counters_and_histograms(self):
+        create_content()
+        self.client.get(reverse('skills'))
+        self.client.get(reverse('skills'))
+        self.client.get(reverse('project-detail', args=[999]))
+        text = self.scrape()
+        self.assertIn('# TYPE portfolio_http_request_duration_seconds histogram', text)
+        self.assertIn('portfolio_http_requests_total{endpoint="skills",method="GET",status="200"} 2', text)
+        self.assertIn('portfolio_http_requests_total{endpoint="project-detail",method="GET",status="404"} 1', text)
+        self.assertIn('portfolio_http_request_duration_seconds_bucket{endpoint="skills",le="+Inf"} 2', text)
+        self.assertIn('portfolio_http_request_duration_seconds_count{endpoint="skills"} 2', text)
+        # The second request is a cache hit without queries
+        self.assertIn('portfolio_db_queries_per_request_bucket{endpoint="skills",le="0.0"} 1', text)
+        # The scrape itself is not an API request
+        self.assertNotIn('endpoint="metrics"', text)
+
+    def test_histogram_buckets_are_cumulative(self):
+        for value in (0.003, 0.02, 0.02, 7):
+            metrics.observe('portfolio_http_request_duration_seconds', value, endpoint='x')
+        text = metrics.render([metrics.registry.snapshot()])
+        for le, count in (('0.005', 1), ('0.01', 1), ('0.025', 3), ('5.0', 3), ('+Inf', 4)):
+            self.assertIn(f'portfolio_http_request_duration_seconds_bucket{{endpoint="x",le="{le}"}} {count}\n', text)
+        self.assertIn('portfolio_http_request_duration_seconds_sum{endpoint="x"} 7.043', text)
+
+    def test_contact_and_throttle_counters(self):
+        for i in range(6):
+            self.client.post(
+                reverse('send-message'), contact_payload(email=f'user{i}@example.com'),
+                content_type='application/json', REMOTE_ADDR='10.0.0.1',
+            )
+        self.client.post(reverse('send-message'), contact_payload(email='bad'), content_type='application/json')
+        outbox.deliver_batch()
+        text = self.scrape()
+        self.assertIn('portfolio_contact_messages_total{outcome="accepted"} 5', text)
+        self.assertIn('portfolio_contact_messages_total{outcome="rejected"} 1', text)
+        self.assertIn('portfolio_throttled_requests_total{scope="contact_ip"} 1', text)
+        self.assertIn('portfolio_outbox_emails_total{outcome="sent"} 5', text)
+
+    def test_token_or_allowed_networks_only(self):
+        # Loopback is where a local proxy's requests come from
+        for address in ('127.0.0.1', '::1', '203.0.113.5'):
+            self.assertEqual(self.client.get(reverse('metrics'), REMOTE_ADDR=address).status_code, 404)
+        for header in ('Bearer wrong', 'Basic scrape-token', 'Bearer'):
+            self.assertEqual(self.client.get(reverse('metrics'), HTTP_AUTHORIZATION=header).status_code, 404)
+        self.scrape(REMOTE_ADDR='203.0.113.5')
+        with self.settings(PORTFOLIO_METRICS={'ALLOWED_NETWORKS': ('10.1.0.0/16',)}):
+            self.scrape(REMOTE_ADDR='10.1.2.3', HTTP_AUTHORIZATION='')
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+            # Without a configured token none is accepted
+            self.assertEqual(self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer ').status_code, 404)
+
+    def test_processes_are_merged_through_the_directory(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        other = {
+            'counters': [['portfolio_contact_messages_total', [['outcome', 'accepted']], 3]],
+            'histograms': [['portfolio_db_queries_per_request', [['endpoint', 'skills']], [0, 2, 0, 0, 0, 0, 0, 0, 0, 0, 2.0]]],
+        }
+        # A live process and one that has exited
+        with open(Path(directory) / f'metrics-{os.getppid()}.json', 'w') as f:
+            json.dump(other, f)
+        exited = subprocess.Popen(['true'])
+        exited.wait()
+        with open(Path(directory) / f'metrics-{exited.pid}.json', 'w') as f:
+            json.dump(other, f)
+        with self.settings(PORTFOLIO_METRICS={'DIRECTORY': directory, 'FLUSH_SECONDS': 3600, 'TOKEN': 'scrape-token'}):
+            metrics.inc('portfolio_contact_messages_total', outcome='accepted')
+            metrics.observe('portfolio_db_queries_per_request', 1, endpoint='skills')
+            text = self.scrape()
+        self.assertTrue((Path(directory) / f'metrics-{os.getpid()}.json').exists())
+        # The exited process's values live on in the aggregate file
+        self.assertFalse((Path(directory) / f'metrics-{exited.pid}.json').exists())
+        self.assertTrue((Path(directory) / metrics.AGGREGATE_FILE).exists())
+        self.assertIn('portfolio_contact_messages_total{outcome="accepted"} 7', text)
+        self.assertIn('portfolio_db_queries_per_request_bucket{endpoint="skills",le="1.0"} 5', text)
+        self.assertIn('portfolio_db_queries_per_request_sum{endpoint="skills"} 5.0', text)
+
+    def test_totals_stay_the_same_after_a_worker_exits(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        worker = {
+            'counters': [['portfolio_contact_messages_total', [['outcome', 'accepted']], 3]],
+            'histograms': [['portfolio_db_queries_per_request', [['endpoint', 'skills']], [0, 2, 0, 0, 0, 0, 0, 0, 0, 0, 2.0]]],
+        }
+        exited = subprocess.Popen(['true'])
+        exited.wait()
+        with open(Path(directory) / f'metrics-{exited.pid}.json', 'w') as f:
+            json.dump(worker, f)
+        with self.settings(PORTFOLIO_METRICS={'DIRECTORY': directory, 'FLUSH_SECONDS': 3600, 'TOKEN': 'scrape-token'}):
+            metrics.inc('portfolio_contact_messages_total', outcome='accepted')
+            with mock.patch.object(metrics, 'process_alive', return_value=True):
+                running = self.scrape()
+            exited_once = self.scrape()
+            # Folded once, not on every scrape
+            exited_twice = self.scrape()
+        self.assertIn('portfolio_contact_messages_total{outcome="accepted"} 4', running)
+        self.assertEqual(exited_once, running)
+        self.assertEqual(exited_twice, running)
+
+    def test_updates_are_flushed_when_the_process_goes_idle(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = Path(directory) / f'metrics-{os.getpid()}.json'
+        registry = metrics.Registry()
+        with self.settings(PORTFOLIO_METRICS={'DIRECTORY': directory, 'FLUSH_SECONDS': 0.1}):
+            registry.inc('portfolio_contact_messages_total', outcome='accepted')
+            registry.inc('portfolio_contact_messages_total', outcome='accepted')
+            self.assertEqual(json.loads(path.read_text())['counters'][0][2], 1)
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline and json.loads(path.read_text())['counters'][0][2] != 2:
+                time.sleep(0.02)
+        self.assertEqual(json.loads(path.read_text())['counters'][0][2], 2)
+
+
+ACCESS_LOG = '''INFO 2025-09-22 17:07:45,843 autoreload 23572 29148 Watching for file changes with StatReloader
+INFO 2025-09-22 17:07:50,000 basehttp 23572 5072 "GET /admin/ HTTP/1.1" 200 13147
+INFO 2025-09-22 17:07:57,954 basehttp 23572 19496 "OPTIONS /api/skills/ HTTP/1.1" 200 0
+INFO 2025-09-22 17:07:58,149 basehttp 23572 19496 "GET /api/skills/ HTTP/1.1" 200 1009
+INFO 2025-09-22 17:07:58,455 basehttp 23572 19496 "GET /api/projects/?featured=true&limit=6 HTTP/1.1" 200 1144
+INFO 2025-09-22 17:08:00,000 basehttp 23572 19496 "POST /api/contact/send/ HTTP/1.1" 201 50
+INFO 2025-09-22 17:09:58,455 basehttp 23572 19496 "GET /api/contact/ HTTP/1.1" 200 451
+'''
+
+
+class ReplayTrafficTests(TransactionTestCase):
+    def test_parse_and_schedule(self):
+        from .management.commands.replay_traffic import parse_access_log, schedule
+        entries = parse_access_log(ACCESS_LOG.splitlines())
+        # Admin pages and requests whose bodies the log lacks are skipped
+        self.assertEqual([(method, path) for _, method, path in entries], [
+            ('OPTIONS', '/api/skills/'), ('GET', '/api/skills/'),
+            ('GET', '/api/projects/?featured=true&limit=6'), ('GET', '/api/contact/'),
+        ])
+        self.assertAlmostEqual(entries[2][0], 0.501)
+        times = [at for at, _, _ in schedule(entries, rate=2, max_gap=5)]
+        self.assertEqual([round(t, 4) for t in times], [0, 0.0975, 0.2505, 2.7505])
+        self.assertEqual(len(schedule(entries, rate=0, max_gap=5, repeat=3)), 12)
+        self.assertEqual({at for at, _, _ in schedule(entries, rate=0, max_gap=5)}, {0.0})
+
+    def test_replay_reports_per_route(self):
+        from .management.commands.replay_traffic import parse_access_log, replay
+        create_content()
+        entries = parse_access_log(ACCESS_LOG.splitlines())
+        for mode in ('threads', 'asyncio'):
+            report, totals = replay(entries, concurrency=3, mode=mode, rate=0, repeat=2)
+            self.assertEqual(totals['requests'], 8)
+            self.assertEqual(totals['errors'], 0, report)
+            self.assertEqual(set(report), {'OPTIONS skills', 'GET skills', 'GET projects', 'GET contact-info'})
+            self.assertEqual(report['GET projects']['count'], 2)
+            self.assertGreater(report['GET projects']['throughput_rps'], 0)
+            self.assertIn('p99_ms', report['GET skills'])
+
+
+class AsyncViewTests(PortfolioTestCase):
+    def setUp(self):
+        super().setUp()
+        from .management.commands.benchmark_asgi import AsyncUrls, SyncUrls
+        self.async_urls, self.sync_urls = AsyncUrls, SyncUrls
+
+    async def get_both(self, url, **extra):
+        with self.settings(ROOT_URLCONF=self.sync_urls):
+            await cache.aclear()
+            expected = await sync_to_async(self.client.get)(url, **extra)
+        with self.settings(ROOT_URLCONF=self.async_urls):
+            await cache.aclear()
+            response = await self.async_client.get(url, **extra)
+        return expected, response
+
+    async def test_same_responses_as_drf_views(self):
+        await sync_to_async(create_content)(projects=25)
+        project = await Project.objects.afirst()
+        second_page = (await sync_to_async(self.client.get)(reverse('projects'))).json()['next']
+        urls = [
+            reverse('profile'), reverse('skills'), reverse('projects'), second_page,
+            reverse('projects') + '?featured=true&limit=6', reverse('projects') + '?cursor=bogus',
+            reverse('projects') + '?tech=Tech 0,Tech 1&match=any',
+            reverse('project-detail', args=[project.pk]), reverse('project-detail', args=[99999]),
+            reverse('experience'), reverse('experience') + '?type=education', reverse('contact-info'),
+        ]
+        for url in urls:
+            expected, response = await self.get_both(url)
+            self.assertEqual(response.status_code, expected.status_code, url)
+            self.assertEqual(response.content, expected.content, url)
+            for header in ('Content-Type', 'Allow', 'ETag', 'Cache-Control', 'X-Cache'):
+                self.assertEqual(response.get(header), expected.get(header), (url, header))
+
+    async def test_missing_profile(self):
+        expected, response = await self.get_both(reverse('profile'))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.content, expected.content)
+
+    async def test_cache_and_revalidation(self):
+        await sync_to_async(create_content)()
+        with self.settings(ROOT_URLCONF=self.async_urls):
+            first = await self.async_client.get(reverse('skills'))
+            second = await self.async_client.get(reverse('skills'))
+            revalidated = await self.async_client.get(reverse('skills'), headers={'If-None-Match': first['ETag']})
+        self.assertEqual((first['X-Cache'], second['X-Cache']), ('MISS', 'HIT'))
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(revalidated.status_code, 304)
+
+    async def test_other_methods_use_the_drf_views(self):
+        await sync_to_async(create_content)()
+        with self.settings(ROOT_URLCONF=self.async_urls):
+            response = await self.async_client.put(
+                reverse('skills'), {'technical': [{'name': 'Go', 'level': 70}]}, content_type='application/json',
+            )
+            self.assertEqual(response.status_code, 200)
+            skills = await self.async_client.get(reverse('skills'))
+            self.assertEqual([skill['name'] for skill in skills.json()['technical']], ['Go'])
+            # The DRF function view allows no HEAD, and neither does its async counterpart
+            self.assertEqual((await self.async_client.head(reverse('skills'))).status_code, 405)
+            self.assertEqual((await self.async_client.head(reverse('profile'))).status_code, 200)
+
+    async def test_requests_drf_would_answer_differently_go_to_it(self):
+        await sync_to_async(create_content)()
+        url = reverse('skills')
+        for headers in ({'Accept': 'text/html'}, {'Accept': 'application/json; indent=4'}):
+            expected, response = await self.get_both(url, headers=headers)
+            self.assertEqual(response.status_code, expected.status_code, headers)
+            self.assertEqual(response.content, expected.content, headers)
+        # DRF's renderer indented it
+        self.assertIn(b'\n    ', response.content)
+
+    async def test_permissions_and_throttles_of_the_drf_view_apply(self):
+        from rest_framework.permissions import IsAdminUser
+        from rest_framework.throttling import BaseThrottle
+        from .async_views import read_view
+
+        class Closed(BaseThrottle):
+            def allow_request(self, request, view):
+                return False
+
+        async def async_view(request):
+            raise AssertionError("The async view answered")
+
+        request = RequestFactory().get(reverse('profile'))
+        await sync_to_async(create_content)()
+        with mock.patch.object(views.ProfileView, 'permission_classes', [IsAdminUser]):
+            response = await read_view(async_view, views.ProfileView.as_view())(request)
+        self.assertEqual(response.status_code, 403)
+        with mock.patch.object(views.ProfileView, 'throttle_classes', [Closed]):
+            response = await read_view(async_view, views.ProfileView.as_view())(request)
+        self.assertEqual(response.status_code, 429)
+
+    @override_settings(PORTFOLIO_TIMING={'SERVER_TIMING': True, 'LOG': False})
+    async def test_timing_middleware_runs_async(self):
+        await sync_to_async(create_content)()
+        with self.settings(ROOT_URLCONF=self.async_urls):
+            response = await self.async_client.get(reverse('projects'))
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="[1-9]\d* queries"')
+
+
+class DatabaseTests(PortfolioTestCase):
+    def pragma(self, cursor, name):
+        return cursor.execute(f'PRAGMA {name}').fetchone()[0]
+
+    def file_connection(self, directory, alias):
+        """A second connection to an on-disk database, configured like any other"""
+        settings_dict = {**connection.settings_dict, 'NAME': os.path.join(directory, 'db.sqlite3')}
+        wrapper = type(connections['default'])(settings_dict, alias=alias)
+        wrapper.ensure_connection()
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def test_connections_get_the_pragmas(self):
+        with connection.cursor() as cursor:
+            self.assertEqual(self.pragma(cursor, 'busy_timeout'), 5000)
+            self.assertEqual(self.pragma(cursor, 'synchronous'), 1)
+            self.assertEqual(self.pragma(cursor, 'temp_store'), 2)
+            self.assertEqual(self.pragma(cursor, 'cache_size'), -20000)
+            self.assertEqual(self.pragma(cursor, 'query_only'), 0)
+
+    def test_migration_switches_to_wal_and_read_alias_is_query_only(self):
+        from importlib import import_module
+        migration = import_module('portfolio.migrations.0010_sqlite_wal')
+        with tempfile.TemporaryDirectory() as directory:
+            writer = self.file_connection(directory, 'default')
+            with mock.patch.object(database, 'read_alias', return_value='read'):
+                reader = self.file_connection(directory, 'read')
+            with writer.cursor() as cursor:
+                # Connecting alone leaves the file as it is
+                self.assertEqual(self.pragma(cursor, 'journal_mode'), 'delete')
+            with writer.schema_editor(atomic=False) as schema_editor:
+                migration.enable_wal(None, schema_editor)
+            with writer.cursor() as cursor:
+                self.assertEqual(self.pragma(cursor, 'journal_mode'), 'wal')
+                cursor.execute('CREATE TABLE t (x)')
+            with reader.cursor() as cursor:
+                self.assertEqual(self.pragma(cursor, 'query_only'), 1)
+                self.assertEqual(cursor.execute('SELECT COUNT(*) FROM t').fetchone()[0], 0)
+                with self.assertRaises(OperationalError):
+                    cursor.execute('INSERT INTO t VALUES (1)')
+
+    @override_settings(PORTFOLIO_SQLITE={'ENABLED': False})
+    def test_disabled(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with self.file_connection(directory, 'default').cursor() as cursor:
+                self.assertEqual(self.pragma(cursor, 'synchronous'), 2)
+
+    def test_read_requests_use_the_read_alias(self):
+        def get_response(request):
+            return router.db_for_read(Project), router.db_for_write(Project)
+
+        middleware = database.ReadRoutingMiddleware(get_response)
+        factory = RequestFactory()
+        with mock.patch.object(database, 'read_alias', return_value='read'):
+            self.assertEqual(middleware(factory.get('/api/projects/')), ('read', 'default'))
+            self.assertEqual(middleware(factory.head('/api/skills/')), ('read', 'default'))
+            self.assertEqual(middleware(factory.put('/api/projects/')), ('default', 'default'))
+            self.assertEqual(middleware(factory.get('/admin/')), ('default', 'default'))
+            self.assertEqual(router.db_for_read(Project), 'default')
+        # Without the alias everything stays on default
+        self.assertEqual(middleware(factory.get('/api/projects/')), ('default', 'default'))
+
+
+
+class SearchTests(PortfolioTestCase):
+    def setUp(self):
+        super().setUp()
+        self.django = Technology.objects.create(name='Django', icon_url='https://example.com/django.svg', category='Backend')
+        self.dashboard = Project.objects.create(title='Realtime dashboard', description='Charts for <b>metrics</b>', order=1)
+        self.dashboard.technologies.add(self.django)
+        self.shop = Project.objects.create(title='Shop', description='An online shop with a sales dashboard', order=2)
+        self.role = Experience.objects.create(
+            title='Backend developer', company='Acme', start_date=date(2020, 1, 1), description='Built dashboards',
+        )
+        TechnicalSkill.objects.create(name='PostgreSQL', level=80, category='Databases')
+        ProfessionalSkill.objects.create(name='Mentoring', icon='users', description='Coaching juniors')
+
+    def search(self, q, **params):
+        response = self.client.get(reverse('search'), {'q': q, **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()['results']
+
+    def titles(self, q, **params):
+        return [result['item'].get('title') or result['item']['name'] for result in self.search(q, **params)]
+
+    def test_title_matches_rank_first(self):
+        self.assertEqual(self.titles('dashboard', type='project'), ['Realtime dashboard', 'Shop'])
+
+    def test_prefix_and_every_word(self):
+        self.assertEqual(self.titles('dash', type='project'), ['Realtime dashboard', 'Shop'])
+        self.assertEqual(self.titles('sales dash'), ['Shop'])
+        self.assertEqual(self.titles('postgr'), ['PostgreSQL'])
+        self.assertEqual(self.search('zzz'), [])
+
+    def test_query_syntax_is_plain_text(self):
+        for q in ('"', 'dashboard AND', 'NEAR(x', 'title:shop', '*', '-'):
+            response = self.client.get(reverse('search'), {'q': q})
+            self.assertEqual(response.status_code, 200, q)
+        self.assertEqual(self.titles('"shop!'), ['Shop'])
+
+    def test_snippets_are_escaped_and_highlighted(self):
+        snippet = self.search('metrics')[0]['snippet']
+        self.assertIn('<mark>metrics</mark>', snippet)
+        self.assertIn('&lt;b&gt;', snippet)
+        self.assertNotIn('<b>', snippet)
+
+    def test_items_have_the_list_endpoint_shapes(self):
+        projects = self.client.get(reverse('projects')).json()['results']
+        experience = self.client.get(reverse('experience')).json()['results']
+        skills = self.client.get(reverse('skills')).json()
+        results = {result['type']: result['item'] for result in self.search('realtime')}
+        self.assertEqual(results['project'], projects[0])
+        self.assertEqual(self.search('acme')[0]['item'], experience[0])
+        self.assertEqual(self.search('postgresql')[0]['item'], skills['technical'][0])
+        self.assertEqual(self.search('mentoring')[0]['item'], skills['professional'][0])
+        self.assertEqual(self.search('django', type='technology')[0]['item'], skills['technologies'][0])
+
+    def test_type_filter(self):
+        self.assertEqual({result['type'] for result in self.search('dashboard')}, {'project', 'experience'})
+        self.assertEqual([result['type'] for result in self.search('dashboard', type='experience')], ['experience'])
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.client.get(reverse('search')).status_code, 400)
+        self.assertEqual(self.client.get(reverse('search'), {'q': 'x', 'type': 'blog'}).status_code, 400)
+        with override_settings(PORTFOLIO_SEARCH={'ENABLED': False}):
+            self.assertEqual(self.client.get(reverse('search'), {'q': 'shop'}).status_code, 503)
+
+    def test_limit(self):
+        self.assertEqual(len(self.search('dashboard', limit=1)), 1)
+
+    def test_saves_and_deletes_keep_the_index_in_step(self):
+        self.shop.title = 'Bookstore'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.shop.save()
+        self.assertEqual(self.titles('bookstore'), ['Bookstore'])
+        # Still found by its description, under the new title
+        self.assertEqual(self.titles('shop'), ['Bookstore'])
+        self.shop.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.shop.save()
+        self.assertEqual(self.titles('bookstore'), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.role.delete()
+        self.assertEqual(self.titles('acme'), [])
+
+    def test_inactive_technologies_do_not_match_projects(self):
+        self.django.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.django.save()
+        self.assertEqual(self.titles('django'), [])
+        self.django.is_active = True
+        with self.captureOnCommitCallbacks(execute=True):
+            self.django.save()
+        self.assertEqual(self.titles('django', type='project'), ['Realtime dashboard'])
+
+    def test_technology_changes_reach_projects(self):
+        self.assertEqual(self.titles('django', type='project'), ['Realtime dashboard'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.shop.technologies.add(self.django)
+        self.assertEqual(self.titles('django', type='project'), ['Realtime dashboard', 'Shop'])
+        self.django.name = 'Flask'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.django.save()
+        self.assertEqual(self.titles('django'), [])
+        self.assertEqual(self.titles('flask', type='project'), ['Realtime dashboard', 'Shop'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.django.project_set.clear()
+        self.assertEqual(self.titles('flask', type='project'), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dashboard.technologies.add(self.django)
+            self.django.delete()
+        self.assertEqual(self.titles('flask'), [])
+
+    def test_bulk_sync_and_seed_are_indexed(self):
+        response = self.client.put(
+            reverse('skills'), {'technical': [{'name': 'Rust', 'level': 70}]}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.titles('rust'), ['Rust'])
+        self.assertEqual(self.titles('postgresql'), [])
+        Profile.objects.all().delete()
+        ProfessionalSkill.objects.all().delete()
+        call_command('seed_portfolio', stdout=StringIO())
+        self.assertTrue(self.search('communication', type='professional_skill'))
+
+    def test_rebuild_command(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {search.TABLE}')
+        self.assertEqual(self.search('dashboard'), [])
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('Indexed 6 document(s)', out.getvalue())
+        self.assertEqual(self.titles('dashboard', type='project'), ['Realtime dashboard', 'Shop'])
+
+    def test_best_match_is_found_among_many_matches(self):
+        projects = create_projects(1200, technologies_per_project=0)
+        Project.objects.filter(pk__in=[project.pk for project in projects]).update(
+            description='Generated with a long description that mentions a dashboard once among many other words',
+        )
+        search.index_objects(Project, [project.pk for project in projects])
+        # The oldest project, matching in its title, ranks first
+        self.assertEqual(self.titles('dashboard', type='project', limit=1), ['Realtime dashboard'])
+
+    def test_migration_indexes_existing_content(self):
+        from importlib import import_module
+        from django.apps import apps
+        migration = import_module('portfolio.migrations.0007_search_index')
+        with connection.cursor() as cursor:
+            indexed = cursor.execute(f'SELECT rowid, title, body FROM {search.TABLE} ORDER BY rowid').fetchall()
+            cursor.execute(f'DELETE FROM {search.TABLE}')
+        # The schema editor cannot open inside the test's transaction
+        migration.index_content(apps, mock.Mock(connection=connection))
+        with connection.cursor() as cursor:
+            self.assertEqual(cursor.execute(f'SELECT rowid, title, body FROM {search.TABLE} ORDER BY rowid').fetchall(), indexed)
+        self.assertEqual(len(indexed), 6)
+
+    def test_search_query_count_is_constant(self):
+        search.index_objects(Project, [project.pk for project in create_projects(50)])
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            results = self.search('bulk project', limit=50)
+        self.assertEqual(len(results), 50)
+        # validators, the ranking, the texts, the projects and their technologies
+        self.assertLessEqual(len(queries), 5)
+
+
+def query_plan(sql):
+    with connection.cursor() as cursor:
+        return [row[3] for row in cursor.execute('EXPLAIN QUERY PLAN ' + sql).fetchall()]
+
+
+class FacetTests(PortfolioTestCase):
+    def setUp(self):
+        super().setUp()
+        self.django, self.react, self.vue = (
+            Technology.objects.create(name=name, icon_url=f'https://example.com/{name}.svg', order=order)
+            for order, name in enumerate(['Django', 'React', 'Vue'])
+        )
+        self.both = Project.objects.create(title='Both', description='x', is_featured=True, order=1)
+        self.both.technologies.set([self.django, self.react])
+        self.backend = Project.objects.create(title='Backend', description='x', order=2)
+        self.backend.technologies.set([self.django])
+        self.frontend = Project.objects.create(title='Frontend', description='x', order=3)
+        self.frontend.technologies.set([self.react, self.vue])
+        hidden = Project.objects.create(title='Hidden', description='x', is_active=False, order=4)
+        hidden.technologies.set([self.django, self.react])
+
+    def get(self, **params):
+        response = self.client.get(reverse('projects'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def titles(self, **params):
+        return [project['title'] for project in self.get(**params)['results']]
+
+    def counts(self, **params):
+        return {facet['name']: (facet['count'], facet['selected']) for facet in self.get(**params)['facets']['technologies']}
+
+    def test_bitmaps(self):
+        self.assertEqual(facets.bitmap([0, 3, 64]), 1 | 8 | 1 << 64)
+        self.assertEqual(facets.bitmap_pks(facets.bitmap([70, 3, 9])), [3, 9, 70])
+        self.assertEqual(facets.bitmap_pks(0), [])
+
+    def test_match_all_and_any(self):
+        self.assertEqual(self.titles(tech='Django,React'), ['Both'])
+        self.assertEqual(self.titles(tech='Django,React', match='all'), ['Both'])
+        self.assertEqual(self.titles(tech='Django,Vue', match='any'), ['Both', 'Backend', 'Frontend'])
+        self.assertEqual(self.titles(tech='Vue', match='any'), ['Frontend'])
+
+    def test_names_are_case_insensitive_and_unknown_ones_match_nothing(self):
+        self.assertEqual(self.titles(tech=' django , REACT '), ['Both'])
+        self.assertEqual(self.titles(tech='Django,Cobol'), [])
+        self.assertEqual(self.titles(tech='Django,Cobol', match='any'), ['Both', 'Backend'])
+        self.assertEqual(self.counts(tech='Cobol,cobol')['Cobol'], (0, True))
+
+    def test_facet_counts(self):
+        data = self.get()
+        self.assertEqual(data['facets']['total'], 3)
+        self.assertEqual(self.counts(), {'Django': (2, False), 'React': (2, False), 'Vue': (1, False)})
+        # Within the results when every technology has to match
+        self.assertEqual(self.counts(tech='Django'), {'Django': (2, True), 'React': (1, False)})
+        # Within the whole list when any may
+        self.assertEqual(
+            self.counts(tech='Django', match='any'), {'Django': (2, True), 'React': (2, False), 'Vue': (1, False)},
+        )
+        self.assertEqual(self.get(tech='Django,Vue', match='any')['facets']['total'], 3)
+
+    def test_featured_and_pagination_combine(self):
+        self.assertEqual(self.titles(tech='React', featured='true'), ['Both'])
+        self.assertEqual(self.counts(featured='true'), {'Django': (1, False), 'React': (1, False)})
+        first = self.get(tech='Django,React', match='any', limit=2)
+        self.assertEqual([project['title'] for project in first['results']], ['Both', 'Backend'])
+        second = self.client.get(first['next']).json()
+        self.assertEqual([project['title'] for project in second['results']], ['Frontend'])
+        self.assertEqual(second['facets'], first['facets'])
+
+    def test_wide_selections_walk_the_ordering_index(self):
+        with mock.patch.object(facets, 'LOOKUP_LIMIT', 0):
+            # The matches, and the active projects that do not match when fewer
+            self.assertEqual(self.titles(tech='Vue'), ['Frontend'])
+            self.assertEqual(self.titles(tech='Django,Vue', match='any'), ['Both', 'Backend', 'Frontend'])
+            first = self.get(tech='React', match='any', limit=1)
+            self.assertEqual([project['title'] for project in self.client.get(first['next']).json()['results']], ['Frontend'])
+
+    def test_index_follows_changes(self):
+        self.assertEqual(self.titles(tech='Vue'), ['Frontend'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.backend.technologies.add(self.vue)
+        self.assertEqual(self.titles(tech='Vue'), ['Backend', 'Frontend'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.vue.project_set.clear()
+        self.assertEqual(self.titles(tech='Vue'), [])
+        self.frontend.technologies.add(self.vue)
+        # As a bulk writer does
+        Project.objects.filter(pk=self.frontend.pk).update(is_active=False, updated_at=timezone.now())
+        response_cache.invalidate('Project')
+        self.assertEqual(self.titles(tech='Vue'), [])
+        self.assertNotIn('Vue', self.counts())
+
+    def test_relation_changes_rebuild_the_index(self):
+        self.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.backend.technologies.add(self.vue)
+        index = facets._index
+        self.assertEqual(facets.bitmap_pks(index.by_name['vue']), sorted([self.backend.pk, self.frontend.pk]))
+        with self.assertNumQueries(0):
+            self.assertIs(facets.get_index(), index)
+        # Once the relations are gone, not before
+        with self.captureOnCommitCallbacks(execute=True):
+            self.vue.project_set.clear()
+        with self.assertNumQueries(0):
+            self.assertNotIn('vue', facets.get_index().by_name)
+
+    def test_rolled_back_writes_never_reach_the_index(self):
+        self.assertEqual(facets.get_index().select(['Vue']).bit_count(), 1)
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                Project.objects.create(title='Rolled back', description='x').technologies.add(self.vue)
+                # As a writer that invalidates before it commits
+                response_cache.invalidate('Project')
+                raise RuntimeError
+        self.assertEqual(facets.get_index().select(['Vue']).bit_count(), 1)
+        self.assertEqual(self.titles(tech='Vue'), ['Frontend'])
+
+    def test_writes_rebuild_and_reads_only_compare_versions(self):
+        self.get()
+        with mock.patch.object(facets, 'build', wraps=facets.build) as build:
+            with self.captureOnCommitCallbacks(execute=True):
+                for project in (self.both, self.backend, self.frontend):
+                    project.is_featured = True
+                    project.save()
+                self.assertEqual(build.call_count, 0)
+            # Once on commit: the later bumps find the content unchanged
+            self.assertEqual(build.call_count, 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(facets.bitmap_pks(facets.get_index().featured), sorted([self.both.pk, self.backend.pk, self.frontend.pk]))
+
+    def test_inactive_technologies_are_not_facets(self):
+        # As a bulk writer does
+        Technology.objects.filter(pk=self.vue.pk).update(is_active=False, updated_at=timezone.now())
+        response_cache.invalidate('Technology')
+        self.assertNotIn('Vue', self.counts())
+        self.assertEqual(self.titles(tech='Vue'), [])
+
+    def test_export_includes_facets(self):
+        from .export import StaticSiteExporter
+        output = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output)
+        Profile.objects.create(name='Test', title='Dev', intro='i', about_journey='j', about_interests='k', email='a@b.c')
+        StaticSiteExporter(output, compress=False).export()
+        data = json.loads((Path(output) / 'api/projects.json').read_text())
+        self.assertEqual(data['facets'], self.get()['facets'])
+
+
+ORIGIN = 'http://testserver'
+
+
+def snapshot_settings(**options):
+    """The snapshot for the test client's origin, rebuilt by hand"""
+    return override_settings(PORTFOLIO_SNAPSHOT={'WORKER': False, 'ORIGINS': [ORIGIN], **options})
+
+
+@snapshot_settings()
+class SnapshotTests(PortfolioTestCase):
+    def setUp(self):
+        super().setUp()
+        create_content()
+        self.project = Project.objects.first()
+
+    def variant_urls(self):
+        return [
+            reverse('bootstrap'), reverse('profile'), reverse('skills'), reverse('projects'),
+            reverse('projects') + '?featured=true&limit=6', reverse('project-detail', args=[self.project.pk]),
+            reverse('experience'), reverse('experience') + '?type=education', reverse('contact-info'),
+        ]
+
+    def snapshot_queries(self, queries):
+        return [query['sql'] for query in queries if PortfolioSnapshot._meta.db_table in query['sql']]
+
+    def test_responses_match_the_views(self):
+        secure = {'secure': True, 'HTTP_HOST': 'example.com'}
+        with self.settings(PORTFOLIO_SNAPSHOT={'ENABLED': False}):
+            expected = {url: self.client.get(url) for url in self.variant_urls()}
+            expected_secure = {url: self.client.get(url, **secure) for url in self.variant_urls()}
+        with snapshot_settings(ORIGINS=[ORIGIN, 'https://example.com']):
+            result = snapshot.rebuild()
+            self.assertEqual((result['version'], result['origins'], result['attempts']), (1, [ORIGIN, 'https://example.com'], 1))
+            self.assertEqual(result['rows'], 2 * len(snapshot.variants()))
+            cache.clear()
+            for url in self.variant_urls():
+                response = self.client.get(url, **secure)
+                self.assertEqual(response['X-Snapshot-Version'], '1', url)
+                self.assertEqual(response.content, expected_secure[url].content, url)
+        cache.clear()
+        for url in self.variant_urls():
+            response = self.client.get(url)
+            self.assertEqual(response['X-Snapshot-Version'], '1', url)
+            self.assertEqual(response.status_code, expected[url].status_code, url)
+            self.assertEqual(response.content, expected[url].content, url)
+            for header in ('Content-Type', 'ETag'):
+                self.assertEqual(response[header], expected[url][header], (url, header))
+
+    def test_a_hit_is_one_primary_key_fetch(self):
+        snapshot.rebuild()
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('profile'))
+        self.assertIn('X-Snapshot-Version', response)
+        # Besides the content state, which the ETag needs anyway
+        sql = [query['sql'] for query in queries if 'MAX(updated_at)' not in query['sql']]
+        self.assertEqual(len(sql), 1, sql)
+        self.assertIn('"portfolio_portfoliosnapshot"."key" = ', sql[0])
+        plan = query_plan(sql[0])
+        self.assertEqual(len(plan), 1, plan)
+        self.assertRegex(plan[0], r'^SEARCH portfolio_portfoliosnapshot USING INDEX sqlite_autoindex_')
+
+    def test_stale_rows_fall_through_and_schedule_a_rebuild(self):
+        snapshot.rebuild()
+        profile = Profile.objects.get()
+        profile.title = 'Architect'
+        profile.save()
+        with snapshot_settings(WORKER=True), \
+                mock.patch.object(snapshot.worker, 'schedule') as schedule, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get(reverse('profile'))
+            skills = self.client.get(reverse('skills'))
+        self.assertNotIn('X-Snapshot-Version', response)
+        self.assertEqual(response.json()['title'], 'Architect')
+        schedule.assert_called_once_with()
+        # Endpoints that do not show the profile are still current
+        self.assertEqual(skills['X-Snapshot-Version'], '1')
+
+        self.assertEqual(snapshot.rebuild()['version'], 2)
+        # The response cache in front of the snapshot kept the view's
+        cache.clear()
+        response = self.client.get(reverse('profile'))
+        self.assertEqual((response['X-Snapshot-Version'], response.json()['title']), ('2', 'Architect'))
+
+    def test_writes_schedule_a_rebuild_after_commit(self):
+        with snapshot_settings(WORKER=True), \
+                mock.patch.object(snapshot.worker, 'schedule') as schedule:
+            with self.captureOnCommitCallbacks() as callbacks:
+                Profile.objects.update(title='Unsaved')
+                profile = Profile.objects.get()
+                profile.save()
+            schedule.assert_not_called()
+            versions = response_cache.get_versions(['Profile'])
+            for callback in callbacks:
+                callback()
+            schedule.assert_called_with()
+            # Content states memoised before the commit are not addressed again
+            self.assertNotEqual(response_cache.get_versions(['Profile']), versions)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.project.technologies.clear()
+            self.assertEqual(schedule.call_count, 2)
+            # Messages are not content
+            with self.captureOnCommitCallbacks(execute=True):
+                ContactMessage.objects.create(name='A', email='a@example.com', subject='Hi', message='Hello')
+            self.assertEqual(schedule.call_count, 2)
+
+    def test_rebuild_replaces_every_row_under_the_next_version(self):
+        with snapshot_settings(ORIGINS=[ORIGIN, 'https://example.com/']):
+            snapshot.rebuild()
+        detail = reverse('project-detail', args=[self.project.pk])
+        self.assertEqual(PortfolioSnapshot.objects.get(pk=snapshot.snapshot_key('https://example.com', detail)).origin,
+                         'https://example.com')
+        self.project.is_active = False
+        self.project.save()
+        # Origins no longer configured are dropped
+        result = snapshot.rebuild()
+        self.assertEqual((result['version'], result['origins']), (2, [ORIGIN]))
+        self.assertEqual(set(PortfolioSnapshot.objects.values_list('version', flat=True)), {2})
+        self.assertEqual(set(PortfolioSnapshot.objects.values_list('origin', flat=True)), {ORIGIN})
+        self.assertFalse(PortfolioSnapshot.objects.filter(key__endswith=detail).exists())
+        self.assertEqual(PortfolioSnapshot.objects.count(), result['rows'])
+        # A project that does not exist is not a rebuild's business
+        with snapshot_settings(WORKER=True), \
+                mock.patch.object(snapshot.worker, 'schedule') as schedule, \
+                self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.get(detail).status_code, 404)
+        schedule.assert_not_called()
+
+    def test_content_changed_while_rendering_is_not_published(self):
+        snapshot.rebuild()
+        render = snapshot.render
+        rendered = []
+
+        def render_during_write(*args):
+            if not rendered:
+                Profile.objects.update(title='Changed', updated_at=timezone.now())
+            rendered.append(args)
+            return render(*args)
+
+        with mock.patch.object(snapshot, 'render', side_effect=render_during_write):
+            result = snapshot.rebuild()
+        self.assertEqual((result['version'], result['attempts']), (2, 2))
+        self.assertEqual(self.client.get(reverse('profile')).json()['title'], 'Changed')
+        text = metrics.render([metrics.registry.snapshot()])
+        self.assertIn('portfolio_snapshot_rebuilds_total{outcome="conflict"} 1\n', text)
+        self.assertIn('portfolio_snapshot_rebuilds_total{outcome="published"} 2\n', text)
+
+        def write_every_time(*args):
+            Profile.objects.update(title=f'Changed {len(rendered)}', updated_at=timezone.now())
+            rendered.append(args)
+            return render(*args)
+
+        with snapshot_settings(ATTEMPTS=2), \
+                mock.patch.object(snapshot, 'render', side_effect=write_every_time):
+            result = snapshot.rebuild()
+        self.assertEqual((result['version'], result['attempts'], result['rows']), (None, 2, 0))
+        self.assertEqual(set(PortfolioSnapshot.objects.values_list('version', flat=True)), {2})
+        # update() invalidates no cached response
+        cache.clear()
+        response = self.client.get(reverse('profile'))
+        self.assertNotIn('X-Snapshot-Version', response)
+        self.assertEqual(response.json()['title'], f'Changed {len(rendered) - 1}')
+
+    def test_other_requests_skip_the_snapshot(self):
+        snapshot.rebuild()
+        urls = [
+            reverse('projects') + '?limit=2', reverse('projects') + '?tech=Tech 0',
+            reverse('experience') + '?cursor=bogus', reverse('search') + '?q=project',
+        ]
+        for url in urls:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertNotIn('X-Snapshot-Version', response, url)
+            self.assertEqual(self.snapshot_queries(queries), [], url)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.options(reverse('profile'))
+        self.assertEqual(self.snapshot_queries(queries), [])
+
+    def test_other_hosts_skip_the_snapshot(self):
+        snapshot.rebuild()
+        with snapshot_settings(WORKER=True), \
+                mock.patch.object(snapshot.worker, 'schedule') as schedule, \
+                self.captureOnCommitCallbacks(execute=True), \
+                CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('profile'), HTTP_HOST='spoofed.example')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Snapshot-Version', response)
+        self.assertEqual(self.snapshot_queries(queries), [])
+        schedule.assert_not_called()
+        self.assertEqual(set(PortfolioSnapshot.objects.values_list('origin', flat=True)), {ORIGIN})
+
+    async def test_async_views(self):
+        from .management.commands.benchmark_asgi import AsyncUrls
+        await sync_to_async(snapshot.rebuild)()
+        rows = {key: bytes(content) async for key, content in PortfolioSnapshot.objects.values_list('key', 'content')}
+        with self.settings(ROOT_URLCONF=AsyncUrls):
+            for url in self.variant_urls():
+                response = await self.async_client.get(url)
+                self.assertEqual(response['X-Snapshot-Version'], '1', url)
+                self.assertEqual(response.content, rows[ORIGIN + url])
+
+    def test_command(self):
+        with snapshot_settings(ORIGINS=[]), self.assertRaisesMessage(CommandError, "set PORTFOLIO_SNAPSHOT['ORIGINS']"):
+            call_command('rebuild_snapshot', stdout=StringIO())
+        out = StringIO()
+        with snapshot_settings(ORIGINS=['https://example.com/']):
+            call_command('rebuild_snapshot', stdout=out)
+        self.assertRegex(out.getvalue(), r'^Published version 1: \d+ response\(s\) for https://example.com in ')
+        self.assertEqual(set(PortfolioSnapshot.objects.values_list('origin', flat=True)), {'https://example.com'})
+
+
+class SnapshotWorkerTests(SimpleTestCase):
+    def setUp(self):
+        self.worker = snapshot.SnapshotWorker()
+        self.calls = []
+
+    def rebuild(self):
+        self.calls.append(time.monotonic())
+        return {'version': len(self.calls), 'origins': [ORIGIN], 'rows': 1, 'attempts': 1}
+
+    def patch(self, side_effect=None, **options):
+        stack = ExitStack()
+        self.addCleanup(stack.close)
+        stack.enter_context(override_settings(PORTFOLIO_SNAPSHOT={'DEBOUNCE_SECONDS': 0.2, 'MAX_DELAY_SECONDS': 5, **options}))
+        return stack.enter_context(mock.patch.object(snapshot, 'rebuild', side_effect=side_effect or self.rebuild))
+
+    def test_a_burst_rebuilds_once(self):
+        self.patch()
+        for _ in range(20):
+            self.worker.schedule()
+            time.sleep(0.002)
+        self.assertTrue(self.worker.wait(5))
+        self.assertEqual(len(self.calls), 1)
+        self.worker.schedule()
+        self.assertTrue(self.worker.wait(5))
+        self.assertEqual(len(self.calls), 2)
+
+    def test_continuous_writes_rebuild_within_the_maximum_delay(self):
+        self.patch(DEBOUNCE_SECONDS=0.1, MAX_DELAY_SECONDS=0.3)
+        start = time.monotonic()
+        while time.monotonic() - start < 1:
+            self.worker.schedule()
+            time.sleep(0.01)
+        self.assertTrue(self.worker.wait(5))
+        self.assertGreaterEqual(len(self.calls), 2)
+        self.assertLess(self.calls[0] - start, 0.6)
+
+    def test_conflicts_are_retried(self):
+        results = [{'version': None, 'origins': [ORIGIN], 'rows': 0, 'attempts': 3}, None]
+        rebuild = self.patch(side_effect=lambda: results.pop(0) or self.rebuild(), DEBOUNCE_SECONDS=0.01)
+        self.worker.schedule()
+        self.assertTrue(self.worker.wait(5))
+        self.assertEqual(rebuild.call_count, 2)
+        self.assertEqual(len(self.calls), 1)
+
+    def test_failures_are_logged(self):
+        self.patch(side_effect=RuntimeError('boom'), DEBOUNCE_SECONDS=0.01)
+        with self.assertLogs('portfolio.snapshot', 'ERROR'):
+            self.worker.schedule()
+            self.assertTrue(self.worker.wait(5))
+
+
+@override_settings(PORTFOLIO_SNAPSHOT={'ORIGINS': [ORIGIN], 'DEBOUNCE_SECONDS': 0.05, 'MAX_DELAY_SECONDS': 0.5})
+class SnapshotConcurrencyTests(TransactionTestCase):
+    """
+    Writers, readers and the worker on their own threads and connections.
+    The in-memory test database locks per table across them, so they share
+    a file copy of it.
+    """
+    BURSTS = 5
+    WRITES = 8
+
+    def setUp(self):
+        create_content(projects=4)
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'db.sqlite3')
+        connection.ensure_connection()
+        target = sqlite3.connect(path)
+        connection.connection.backup(target)
+        target.close()
+        # Connections opened from here on, on the other threads, use the file
+        name = connection.settings_dict['NAME']
+        connection.settings_dict['NAME'] = path
+        self.addCleanup(connection.settings_dict.__setitem__, 'NAME', name)
+        worker = snapshot.SnapshotWorker()
+        patcher = mock.patch.object(snapshot, 'worker', worker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(worker.wait, 10)
+
+    def in_thread(self, function, *args):
+        result = []
+
+        def target():
+            try:
+                result.append(function(*args))
+            finally:
+                connections.close_all()
+
+        thread = threading.Thread(target=target)
+        thread.start()
+        thread.join()
+        return result[0]
+
+    def test_readers_never_see_content_older_than_the_last_commit(self):
+        project_pk = self.in_thread(lambda: Project.objects.order_by('pk').values_list('pk', flat=True).first())
+        self.in_thread(snapshot.rebuild)
+        # Per endpoint: the last revision committed
+        committed = {'profile': 0, 'project-detail': 0}
+        done = threading.Event()
+        failures, hits, writes = [], [], []
+
+        def write_profile():
+            for burst in range(self.BURSTS):
+                for _ in range(self.WRITES):
+                    revision = committed['profile'] + 1
+                    profile = Profile.objects.get()
+                    profile.title = f'Revision {revision}'
+                    profile.save()
+                    committed['profile'] = revision
+                    writes.append('profile')
+                time.sleep(0.3)
+
+        def write_project():
+            technologies = list(Technology.objects.all())
+            for burst in range(self.BURSTS):
+                for write in range(self.WRITES):
+                    revision = committed['project-detail'] + 1
+                    with transaction.atomic():
+                        project = Project.objects.get(pk=project_pk)
+                        project.title = f'Revision {revision}'
+                        project.save()
+                        project.technologies.set(technologies[:write % len(technologies) + 1])
+                    committed['project-detail'] = revision
+                    writes.append('project-detail')
+                time.sleep(0.3)
+
+        readers = {
+            'profile': (snapshot.snapshot_response('profile')(snapshot.VIEWS['profile']), reverse('profile'), {}),
+            'project-detail': (
+                snapshot.snapshot_response('project-detail')(snapshot.VIEWS['project-detail']),
+                reverse('project-detail', args=[project_pk]), {'pk': project_pk},
+            ),
+        }
+
+        def read():
+            while not done.is_set():
+                for endpoint, (view, path, kwargs) in readers.items():
+                    expected = committed[endpoint]
+                    response = view(RequestFactory().get(path), **kwargs)
+                    if hasattr(response, 'render'):
+                        response.render()
+                    # The titles start without a revision
+                    match = re.fullmatch(r'Revision (\d+)', json.loads(response.content)['title'])
+                    revision = int(match[1]) if match else 0
+                    if revision < expected:
+                        failures.append((endpoint, revision, expected, response.get('X-Snapshot-Version')))
+                    if 'X-Snapshot-Version' in response:
+                        hits.append(endpoint)
+
+        def run(function):
+            try:
+                function()
+            except Exception as exc:
+                failures.append(exc)
+            finally:
+                connections.close_all()
+
+        writers = [threading.Thread(target=run, args=(function,)) for function in (write_profile, write_project)]
+        reading = [threading.Thread(target=run, args=(read,)) for _ in range(3)]
+        for thread in writers + reading:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        done.set()
+        for thread in reading:
+            thread.join()
+        self.assertTrue(snapshot.worker.wait(10))
+
+        self.assertEqual(failures, [])
+        self.assertEqual(set(hits), {'profile', 'project-detail'})
+
+        def published():
+            rows = list(PortfolioSnapshot.objects.values_list('endpoint', 'key', 'version', 'content'))
+            keys = {snapshot.snapshot_key('http://testserver', path, query): (endpoint, path, query)
+                    for endpoint, path, query in snapshot.variants()}
+            return rows, keys, {
+                key: snapshot.render(endpoint, 'http://testserver', path, query)[2] for key, (endpoint, path, query) in keys.items()
+            }
+
+        rows, keys, rendered = self.in_thread(published)
+        self.assertEqual({key for endpoint, key, version, content in rows}, set(keys))
+        versions = {version for endpoint, key, version, content in rows}
+        self.assertEqual(len(versions), 1)
+        # Debounced: a rebuild per burst or so, not per write
+        self.assertLess(versions.pop(), len(writes) / 2)
+        for endpoint, key, version, content in rows:
+            self.assertEqual(bytes(content), rendered[key], key)
+
+
+def plan_problems(sql, plan, tables):
+    """
+    Filtered or sorted full table scans and temp B-tree sorts in ``plan``.
+    Reading a whole table in rowid or index order is fine when the query
+    asks for all of it, and so is sorting rows that were all found by index
+    searches (a page of keys), FTS5 matches and json_each key lists among them.
+    """
+    scans = [step for step in plan if re.fullmatch(r'SCAN (\S+)', step) and step.split()[1] in tables]
+    sorts = [step for step in plan if 'TEMP B-TREE' in step]
+    searched_only = all(
+        not step.startswith('SCAN') or step.startswith(('SCAN (subquery', 'SCAN json_each '))
+        or re.search(r'VIRTUAL TABLE INDEX \d+:\S*M', step)
+        for step in plan if step not in sorts
+    )
+    problems = []
+    if scans and (sorts or ' WHERE ' in sql):
+        problems += scans
+    if sorts and not searched_only:
+        problems += sorts
+    return problems
+
+
+class QueryPlanTests(PortfolioTestCase):
+    """
+    ``EXPLAIN QUERY PLAN`` for every query of the read endpoints and the
+    admin changelists.  Without ANALYZE statistics SQLite plans each table as
+    if it were large, so these are the plans the queries get at scale.
+    """
+
+    def setUp(self):
+        super().setUp()
+        from .management.commands.benchmark_endpoints import seed_dataset
+        self.project_pk = seed_dataset('small')
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        self.tables = set(connection.introspection.table_names())
+
+    def assertIndexedPlans(self, urls):
+        for url in urls:
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            for query in queries.captured_queries:
+                sql = query['sql']
+                if not sql.startswith('SELECT'):
+                    continue
+                plan = query_plan(sql)
+                self.assertEqual(plan_problems(sql, plan, self.tables), [], f"{url}\n{sql}\n" + '\n'.join(plan))
+
+    def test_read_endpoints(self):
+        second_pages = [self.client.get(reverse('projects') + '?limit=5').json()['next']]
+        second_pages.append(self.client.get(reverse('experience') + '?limit=2').json()['next'])
+        self.assertIndexedPlans([
+            reverse('profile'), reverse('skills'), reverse('projects'), *second_pages,
+            reverse('projects') + '?featured=true&limit=6', reverse('project-detail', args=[self.project_pk]),
+            reverse('experience'), reverse('experience') + '?type=education', reverse('contact-info'),
+            reverse('bootstrap'), reverse('search') + '?q=project', reverse('search') + '?q=tech&type=technology,project',
+        ])
+
+    def test_technology_filter(self):
+        urls = [reverse('projects') + '?tech=Tech 1,Tech 2&match=any&limit=5', reverse('projects') + '?tech=Tech 1,Tech 2']
+        self.assertIndexedPlans(urls)
+        with mock.patch.object(facets, 'LOOKUP_LIMIT', 0):
+            self.assertIndexedPlans(urls)
+
+    def test_admin_changelists(self):
+        urls = []
+        for model, model_admin in admin.site._registry.items():
+            if model._meta.app_label != 'portfolio':
+                continue
+            url = reverse(f'admin:portfolio_{model._meta.model_name}_changelist')
+            urls.append(url)
+            # Every boolean and choices filter, alone and combined
+            values = {}
+            for name in model_admin.list_filter:
+                field = model._meta.get_field(name) if isinstance(name, str) else None
+                if field is not None and field.get_internal_type() == 'BooleanField':
+                    values[name] = ['0', '1']
+                elif field is not None and field.choices:
+                    values[name] = [value for value, _ in field.choices]
+            for name, choices in values.items():
+                urls += [f'{url}?{name}__exact={value}' for value in choices]
+            if len(values) > 1:
+                urls.append(url + '?' + '&'.join(f'{name}__exact={choices[0]}' for name, choices in values.items()))
+        self.assertIndexedPlans(urls)
+
+    def test_regressions_are_reported(self):
+        sql = 'SELECT * FROM portfolio_project WHERE description = \'x\' ORDER BY title'
+        problems = plan_problems(sql, query_plan(sql), self.tables)
+        self.assertEqual(problems, ['SCAN portfolio_project', 'USE TEMP B-TREE FOR ORDER BY'])
+        # Sorting a page of rows looked up by key is not a regression
+        sql = 'SELECT * FROM portfolio_project WHERE id IN (1, 2, 3) ORDER BY title'
+        self.assertEqual(plan_problems(sql, query_plan(sql), self.tables), [])
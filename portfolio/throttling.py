@@ -0,0 +1,143 @@
+"""
+Sliding-window throttles for the unauthenticated write endpoints.
+
+DRF's ``SimpleRateThrottle`` keeps a list of request timestamps per client,
+so its memory grows with the rate.  These throttles use the sliding window
+counter approximation instead: two integer counters per key (the current
+and the previous fixed window), with the previous window weighted by how
+much of it still overlaps the sliding window.  Counters expire after two
+windows, and the cache backend's own eviction bounds the number of keys.
+Only allowed requests count, so a client that stops at the limit gets
+back under it as the window slides, however often it retried meanwhile.
+
+The counters live in the ``PORTFOLIO_THROTTLE_CACHE`` cache.  With the
+default local-memory cache each worker process counts on its own, so a
+client can make the advertised rate once per process; point it at a
+shared backend (memcached, Redis, the database cache) to enforce the
+limit across processes.
+"""
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import BaseThrottle
+
+from . import metrics
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """
+    Subclasses set ``scope`` (a key of ``DEFAULT_THROTTLE_RATES``) and
+    implement ``get_identifier``. Returning None skips throttling.
+    """
+    scope = None
+
+    def __init__(self):
+        rates = settings.REST_FRAMEWORK.get('DEFAULT_THROTTLE_RATES', {})
+        self.rate = rates.get(self.scope)
+        self.limit, self.window = self.parse_rate(self.rate)
+        self.retry_after = None
+
+    @staticmethod
+    def parse_rate(rate):
+        """'5/min' -> (5, 60), using DRF's rate syntax"""
+        if rate is None:
+            return None, None
+        count, period = rate.split('/')
+        return int(count), {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[period[0]]
+
+    def get_cache(self):
+        return caches[getattr(settings, 'PORTFOLIO_THROTTLE_CACHE', 'default')]
+
+    def get_identifier(self, request, view):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        if self.limit is None:
+            return True
+        identifier = self.get_identifier(request, view)
+        if identifier is None:
+            return True
+        key = hashlib.sha1(f'{self.scope}:{identifier}'.encode()).hexdigest()
+        allowed, self.retry_after = self.hit(key, time.time())
+        if not allowed:
+            metrics.inc('portfolio_throttled_requests_total', scope=self.scope)
+        return allowed
+
+    def hit(self, key, now):
+        """
+        Count one request for ``key`` at ``now`` and return
+        ``(allowed, retry_after_seconds)``.
+        """
+        cache = self.get_cache()
+        window_index, offset = divmod(now, self.window)
+        window_index = int(window_index)
+        current_key = f'throttle:{key}:{window_index}'
+        previous_key = f'throttle:{key}:{window_index - 1}'
+
+        # Counted up front so concurrent requests cannot all slip under the
+        # limit, and taken back when this one is rejected
+        cache.add(current_key, 0, timeout=2 * self.window)
+        try:
+            current = cache.incr(current_key)
+        except ValueError:
+            cache.set(current_key, 1, timeout=2 * self.window)
+            current = 1
+        previous = cache.get(previous_key, 0)
+
+        weight = 1 - offset / self.window
+        if previous * weight + current <= self.limit:
+            return True, None
+        try:
+            cache.decr(current_key)
+        except ValueError:
+            pass
+        return False, self.time_until_allowed(previous, current - 1, offset)
+
+    def time_until_allowed(self, previous, current, offset):
+        """Seconds until one more request would fit next to the ``current`` counted ones"""
+        window = self.window
+        if current < self.limit and previous:
+            # Wait for enough of the previous window to slide out
+            fraction = 1 - (self.limit - current - 1) / previous
+            return max(fraction * window - offset, 0)
+        # Wait for the current window to become the decaying previous one
+        fraction = 1 - (self.limit - 1) / current
+        return (window - offset) + fraction * window
+
+    def wait(self):
+        if self.retry_after is None:
+            return None
+        return math.ceil(self.retry_after)
+
+
+class IPThrottle(SlidingWindowThrottle):
+    def get_identifier(self, request, view):
+        return self.get_ident(request)
+
+
+class WriteIPThrottle(IPThrottle):
+    """Throttle unsafe methods only, so GETs on the same view are unaffected"""
+    scope = 'write_ip'
+
+    def allow_request(self, request, view):
+        if request.method in SAFE_METHODS:
+            return True
+        return super().allow_request(request, view)
+
+
+class ContactIPThrottle(IPThrottle):
+    scope = 'contact_ip'
+
+
+class ContactEmailThrottle(SlidingWindowThrottle):
+    scope = 'contact_email'
+
+    def get_identifier(self, request, view):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        if not isinstance(email, str) or not email.strip():
+            return None
+        return email.strip().lower()
@@ -0,0 +1,182 @@
+"""
+Per-request timing: total, database, rendering and cache outcome.
+
+``RequestTimingMiddleware`` counts the queries of every request and their
+duration through a database ``execute_wrapper``, collects the
+phases timed with ``measure()`` while the request runs, and reports the
+result as a ``Server-Timing`` header (visible in browser devtools) and as a
+JSON record on the ``portfolio.timing`` logger.  Other consumers of the
+measurements, such as the metrics (``signals.py``), receive them through
+the ``request_timed`` signal.
+"""
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.dispatch import Signal
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'SERVER_TIMING': False,
+    'LOG': True,
+}
+
+# Sent after every request with ``request`` and its ``measurements``
+request_timed = Signal()
+
+_current = ContextVar('portfolio_request_timings', default=None)
+_recorder = ContextVar('portfolio_query_recorder', default=None)
+
+
+def get_setting(name):
+    return getattr(settings, 'PORTFOLIO_TIMING', {}).get(name, DEFAULTS[name])
+
+
+@contextmanager
+def measure(phase):
+    """Add the duration of the block to ``phase`` of the current request, if any"""
+    timings = _current.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings[phase] = timings.get(phase, 0.0) + (time.perf_counter() - start) * 1000
+
+
+class QueryRecorder:
+    """execute_wrapper that counts queries and the time spent in them"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration_ms = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration_ms += (time.perf_counter() - start) * 1000
+
+
+def cache_outcome(response):
+    if response.status_code == 304:
+        return 'REVALIDATED'
+    return response.get('X-Cache')
+
+
+def server_timing(metrics):
+    parts = [
+        f"total;dur={metrics['total_ms']:.1f}",
+        f"db;dur={metrics['db_ms']:.1f};desc=\"{metrics['queries']} queries\"",
+        f"render;dur={metrics['render_ms']:.1f}",
+        f"app;dur={metrics['app_ms']:.1f}",
+    ]
+    if metrics['cache']:
+        parts.append(f"cache;desc={metrics['cache']}")
+    return ', '.join(parts)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; the record's ``timing`` extra is merged in"""
+
+    def format(self, record):
+        data = {'time': self.formatTime(record), 'level': record.levelname, 'logger': record.name, 'message': record.getMessage()}
+        data.update(getattr(record, 'timing', {}))
+        return json.dumps(data)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    execute_wrapper on every connection (see ``signals.py``) that reports to
+    the recorder of the current request.  The recorder travels in a context
+    variable, which reaches the threads the async ORM runs queries in, while
+    connections are per thread.
+    """
+    recorder = _recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_query_recorder(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class RequestTimingMiddleware:
+    """Place first in MIDDLEWARE so the total covers the whole stack"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = {}
+        recorder = QueryRecorder()
+        tokens = _current.set(timings), _recorder.set(recorder)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(tokens[0])
+            _recorder.reset(tokens[1])
+        return self.report(request, response, timings, recorder, start)
+
+    async def __acall__(self, request):
+        timings = {}
+        recorder = QueryRecorder()
+        tokens = _current.set(timings), _recorder.set(recorder)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(tokens[0])
+            _recorder.reset(tokens[1])
+        return self.report(request, response, timings, recorder, start)
+
+    def report(self, request, response, timings, recorder, start):
+        total_ms = (time.perf_counter() - start) * 1000
+        render_ms = timings.get('render', 0.0)
+        metrics = {
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.resolver_match.url_name if request.resolver_match else None,
+            'status': response.status_code,
+            'bytes': None if response.streaming else len(response.content),
+            'total_ms': round(total_ms, 3),
+            'db_ms': round(recorder.duration_ms, 3),
+            'queries': recorder.count,
+            'render_ms': round(render_ms, 3),
+            'app_ms': round(max(total_ms - recorder.duration_ms - render_ms, 0.0), 3),
+            'cache': cache_outcome(response),
+        }
+        if get_setting('SERVER_TIMING'):
+            response['Server-Timing'] = server_timing(metrics)
+        request_timed.send(sender=self.__class__, request=request, measurements=metrics)
+        if get_setting('LOG'):
+            logger.info("%s %s %s %.1fms", request.method, request.path, response.status_code, total_ms, extra={'timing': metrics})
+        return response
+
+    def process_template_response(self, request, response):
+        # Lazily rendered responses (DRF's) render right after this hook
+        timings = _current.get()
+        if timings is not None and not response.is_rendered:
+            start = time.perf_counter()
+
+            def rendered(response):
+                timings['render'] = timings.get('render', 0.0) + (time.perf_counter() - start) * 1000
+            response.add_post_render_callback(rendered)
+        return response
@@ -1,12 +1,47 @@
+from django.conf import settings
 from django.urls import path
-from . import views
-
-urlpatterns = [
-    path('profile/', views.ProfileView.as_view(), name='profile'),
-    path('skills/', views.skills_view, name='skills'),
-    path('projects/', views.ProjectListView.as_view(), name='projects'),
-    path('projects/<int:pk>/', views.ProjectDetailView.as_view(), name='project-detail'),
-    path('experience/', views.ExperienceListView.as_view(), name='experience'),
-    path('contact/', views.contact_info_view, name='contact-info'),
-    path('contact/send/', views.send_message_view, name='send-message'),
-]
\ No newline at end of file
+
+from . import async_views, views
+from .cache import cache_response
+from .conditional import conditional_response
+from .snapshot import snapshot_response
+
+
+def cached(endpoint, view, params=()):
+    """
+    Conditional GET in front of the response cache in front of the snapshot
+    in front of the view.  The response cache is per process, cold after a
+    restart and different in every worker; the snapshot is the copy they
+    all share, so a miss there costs one primary key fetch rather than the
+    queries of the view.
+    """
+    return conditional_response(endpoint, params)(cache_response(endpoint, params)(snapshot_response(endpoint, params)(view)))
+
+
+def api_urlpatterns(asynchronous=False):
+    """The API routes; ``asynchronous`` serves the reads with ``async_views``"""
+    def read(endpoint, view, async_view, params=()):
+        if asynchronous:
+            view = async_views.read_view(async_view, view)
+        return cached(endpoint, view, params)
+
+    return [
+        path('bootstrap/', cached('bootstrap', views.bootstrap_view), name='bootstrap'),
+        path('profile/', read('profile', views.ProfileView.as_view(), async_views.profile), name='profile'),
+        path('skills/', read('skills', views.skills_view, async_views.skills), name='skills'),
+        path('projects/', read(
+            'projects', views.ProjectListView.as_view(), async_views.projects, params=('featured', 'tech', 'match', 'limit', 'cursor'),
+        ), name='projects'),
+        path('projects/<int:pk>/', read(
+            'project-detail', views.ProjectDetailView.as_view(), async_views.project_detail,
+        ), name='project-detail'),
+        path('experience/', read(
+            'experience', views.ExperienceListView.as_view(), async_views.experience, params=('type', 'limit', 'cursor'),
+        ), name='experience'),
+        path('contact/', read('contact', views.contact_info_view, async_views.contact_info), name='contact-info'),
+        path('contact/send/', views.send_message_view, name='send-message'),
+        path('search/', cached('search', views.search_view, params=('q', 'type', 'limit')), name='search'),
+    ]
+
+
+urlpatterns = api_urlpatterns(getattr(settings, 'PORTFOLIO_ASYNC_VIEWS', False))